@@ -0,0 +1,129 @@
+"""Cache of verified access tokens and the user they belong to.
+
+get_current_user runs on almost every API call; with this cache a repeat token
+costs a dictionary lookup instead of a JWT decode plus a users query. Entries
+live for AUTH_CACHE_TTL_SECONDS (never past the token's own expiry), and the
+least recently used are evicted beyond AUTH_CACHE_SIZE.
+
+What is cached is a CachedUser projection of the row, not the ORM object, so it
+can be shared between requests and sessions. Admin changes to a user (block,
+unblock, delete, role) call ``invalidate_user``; other workers are told through
+``on_invalidate`` and otherwise catch up within the TTL. A lookup that was
+loading the user while it was invalidated passes the ``generation`` it started
+with to ``put``, which then skips storing the row it read.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set
+
+from app.core.config import settings
+
+
+class CachedUser:
+    """The user columns routes read from current_user, detached from any session"""
+
+    FIELDS = ("uid", "uemail", "uname", "uavatar", "uactive", "urole", "uisdel", "ucreate_at", "ulast_login", "uupdated_at")
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_model(cls, user) -> "CachedUser":
+        return cls(**{field: getattr(user, field, None) for field in cls.FIELDS})
+
+    def __repr__(self):
+        return f"<CachedUser(uid={self.uid}, uemail={self.uemail}, uname={self.uname})>"
+
+
+class UserCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (expires_at, CachedUser)
+        self.tokens_by_user: Dict[str, Set[str]] = {}  # uid -> cached tokens, for invalidation
+        self.generations: Dict[str, int] = {}  # uid -> times invalidated, to spot lookups that raced an invalidation
+        self.lock = threading.Lock()  # Sync dependencies run on the thread pool
+        self.on_invalidate: Optional[Callable[[str], None]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, token: str) -> Optional[CachedUser]:
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.time():
+                self._remove(token, user)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def generation(self, uid) -> int:
+        """Take before loading a user from the database and pass to put"""
+        with self.lock:
+            return self.generations.get(str(uid), 0)
+
+    def put(self, token: str, user, token_expires: Optional[datetime] = None, generation: Optional[int] = None) -> CachedUser:
+        cached = CachedUser.from_model(user)
+        if not self.enabled:
+            return cached
+        expires_at = time.time() + self.ttl
+        if token_expires is not None:
+            # TokenData.exp is naive UTC
+            expires_at = min(expires_at, (token_expires - datetime(1970, 1, 1)).total_seconds())
+        with self.lock:
+            if generation is not None and self.generations.get(str(cached.uid), 0) != generation:
+                # Invalidated while the row was being read; it may predate the change
+                return cached
+            previous = self.entries.pop(token, None)
+            if previous is not None:
+                self._unindex(token, previous[1])
+            self.entries[token] = (expires_at, cached)
+            self.tokens_by_user.setdefault(str(cached.uid), set()).add(token)
+            while len(self.entries) > self.max_size:
+                old_token, (_, old_user) = self.entries.popitem(last=False)
+                self._unindex(old_token, old_user)
+        return cached
+
+    def invalidate_user(self, uid, notify: bool = True):
+        """Drop every cached token of a user, e.g. after a block or a role change"""
+        uid = str(uid)
+        with self.lock:
+            self.generations[uid] = self.generations.get(uid, 0) + 1
+            for token in self.tokens_by_user.pop(uid, set()):
+                self.entries.pop(token, None)
+        if notify and self.on_invalidate is not None:
+            self.on_invalidate(uid)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.tokens_by_user.clear()
+
+    def _remove(self, token: str, user: CachedUser):
+        self.entries.pop(token, None)
+        self._unindex(token, user)
+
+    def _unindex(self, token: str, user: CachedUser):
+        tokens = self.tokens_by_user.get(str(user.uid))
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self.tokens_by_user[str(user.uid)]
+
+
+user_cache = UserCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
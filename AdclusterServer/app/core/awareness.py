@@ -0,0 +1,76 @@
+"""Ephemeral cursor / selection / typing state for note editors.
+
+Updates are lossy on purpose: each client's latest state overwrites the previous
+one, and each group gets at most one message per WS_AWARENESS_INTERVAL_MS with
+the states that changed in that window. A burst of keystrokes from 20 editors
+therefore becomes at most one small message per tick instead of 20x fan-out per
+keystroke. Nothing here is written to the database or the group history.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+STATE_TTL_SECONDS = 30  # States not refreshed for this long are left out of snapshots
+
+
+class AwarenessChannel:
+    def __init__(
+        self,
+        interval_ms: int,
+        worker_id: Callable[[], str],
+        publish: Callable[[dict], Awaitable[None]],
+        deliver: Callable[[str, dict, Optional[str]], None]
+    ):
+        self.interval = interval_ms / 1000
+        self.worker_id = worker_id
+        self.publish = publish
+        self.deliver = deliver
+        self.pending: Dict[str, Dict[str, Optional[dict]]] = {}  # group -> connection ID -> latest state (None = gone)
+        self.states: Dict[str, Dict[str, tuple]] = {}  # group -> connection ID -> (state, updated_at), all workers
+        self.flush_task: Optional[asyncio.Task] = None
+
+    def update(self, group: str, connection_id: str, state: Optional[dict]):
+        """Record a client's latest state; it goes out on the next tick"""
+        self.pending.setdefault(group, {})[connection_id] = state
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush())
+
+    def forget(self, connection_id: str, groups: Set[str]):
+        """Tell the other editors a client left, without waiting for its state to expire"""
+        for group in groups:
+            if connection_id in self.states.get(group, {}) or connection_id in self.pending.get(group, {}):
+                self.update(group, connection_id, None)
+
+    def snapshot(self, group: str) -> Dict[str, dict]:
+        deadline = time.monotonic() - STATE_TTL_SECONDS
+        return {
+            connection_id: state
+            for connection_id, (state, updated_at) in self.states.get(group, {}).items()
+            if updated_at >= deadline
+        }
+
+    async def _flush(self):
+        # Fixed-rate sampling: everything that arrived during the interval goes out together
+        await asyncio.sleep(self.interval)
+        self.flush_task = None
+        pending, self.pending = self.pending, {}
+        for group, states in pending.items():
+            await self.publish({
+                "kind": "awareness",
+                "worker": self.worker_id(),
+                "group": group,
+                "states": states
+            })
+
+    def handle_backplane_message(self, message: dict):
+        group = message["group"]
+        now = time.monotonic()
+        known = self.states.setdefault(group, {})
+        for connection_id, state in message["states"].items():
+            if state is None:
+                known.pop(connection_id, None)
+            else:
+                known[connection_id] = (state, now)
+        if not known:
+            del self.states[group]
+        self.deliver(group, {"type": "awareness", "group": group, "states": message["states"]}, None)
@@ -0,0 +1,362 @@
+"""Real-time collaborative editing of proNote content.
+
+Editors join the WebSocket group ``note:<noteID>`` and send small text operations
+(see app.core.ot) against the revision they last saw. The server transforms each
+operation past anything committed since then, applies it, and forwards the result
+to the other editors, so nobody overwrites anyone else with a full-document save.
+Only connections authenticated with a token whose user created the note's
+project or is a member of it (prjuser) may open and edit a note.
+
+Operations travel over the WebSocket backplane, and each worker applies them in
+backplane order. That order is the same on every worker, so every worker that
+has the note open ends up with the same text and revision. A worker that opens a
+note another worker is already editing asks that worker for its state. Otherwise
+it loads the text from proNote. Workers without the note answer that they
+have none, so the loading worker stops waiting once every worker it knows of
+(from the backplane's hello/heartbeat roster) has answered, and does not ask at
+all when it knows of no other worker.
+
+Every COLLAB_SNAPSHOT_EVERY revisions the operation log is compacted and a
+snapshot is saved. A snapshot is also saved when a note goes quiet. Saving a
+snapshot writes the text back to proNote and records a row in pnote_history.
+Only the worker that committed the latest operation saves, so each snapshot is
+written once.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from app.core import ot
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+STATE_REQUEST_TIMEOUT = 1.0  # Upper bound on waiting for the other workers' answers before loading from the database
+COMMIT_TIMEOUT = 5.0  # Seconds to wait for our own operation to come back through the backplane
+
+
+NOTE_GROUP_PREFIX = "note:"
+
+
+def note_group(note_id: str) -> str:
+    return f"{NOTE_GROUP_PREFIX}{note_id}"
+
+
+def is_note_group(group_name: str) -> bool:
+    """Note groups are only joined through note_open, which checks project membership"""
+    return str(group_name).startswith(NOTE_GROUP_PREFIX)
+
+
+class CollabError(Exception):
+    pass
+
+
+class NoteDocument:
+    def __init__(self, note_id: str, text: str, revision: int = 0):
+        self.note_id = note_id
+        self.text = text
+        self.revision = revision
+        self.log: List[dict] = []  # Committed operations after the last compaction, oldest first
+        self.log_start = revision  # Revision the first logged operation was applied to
+        self.saved_revision = revision  # Revision last written to the database by this worker
+        self.last_user_id: Optional[str] = None
+        self.last_origin: Optional[str] = None  # Worker that committed the latest operation
+        self.last_change = time.monotonic()
+        self.pending_range = None  # (start, end) touched since the last snapshot
+        self.maintenance_task: Optional[asyncio.Task] = None
+
+    def commit(self, base_revision: int, operation: ot.Operation) -> ot.Operation:
+        """Transform an operation made against base_revision onto the current text and apply it"""
+        if base_revision < self.log_start or base_revision > self.revision:
+            raise CollabError("Revision is no longer available; reload the note")
+        for entry in self.log[base_revision - self.log_start:]:
+            operation = ot.transform(operation, entry["ops"])[0]
+        self.text = ot.apply(self.text, operation)
+        self.revision += 1
+        self.log.append({"revision": self.revision, "ops": operation})
+
+        start, end = ot.changed_range(operation)
+        if self.pending_range is None:
+            self.pending_range = (start, end)
+        else:
+            self.pending_range = (min(self.pending_range[0], start), max(self.pending_range[1], end))
+        return operation
+
+    def compact(self):
+        """Drop log entries older than the last COLLAB_OP_LOG_KEEP operations"""
+        excess = len(self.log) - settings.COLLAB_OP_LOG_KEEP
+        if excess > 0:
+            del self.log[:excess]
+            self.log_start += excess
+
+
+class CollabService:
+    """Keeps the notes open on this worker and applies operations in backplane order"""
+
+    def __init__(
+        self,
+        worker_id: Callable[[], str],
+        publish: Callable[[dict], Awaitable[None]],
+        deliver: Callable[[str, dict, Optional[str]], None],
+        local_members: Callable[[str], int],
+        known_workers: Callable[[], Set[str]]
+    ):
+        self.worker_id = worker_id
+        self.publish = publish
+        self.deliver = deliver  # (group, payload, connection ID to skip) -> queue for local members
+        self.local_members = local_members
+        self.known_workers = known_workers  # Other live workers, from the backplane roster
+        self.documents: Dict[str, NoteDocument] = {}
+        self.loading: Dict[str, asyncio.Future] = {}  # note ID -> future resolved with another worker's state (None if nobody has it)
+        self.awaiting_replies: Dict[str, Set[str]] = {}  # note ID -> workers that have not answered the state request
+        self.load_locks: Dict[str, asyncio.Lock] = {}
+        self.pending_commits: Dict[str, asyncio.Future] = {}  # op ID -> future resolved when committed here
+
+    async def open(self, note_id: str) -> NoteDocument:
+        lock = self.load_locks.setdefault(note_id, asyncio.Lock())
+        try:
+            async with lock:
+                document = self.documents.get(note_id)
+                if document is None:
+                    document = await self._load(note_id)
+                    self.documents[note_id] = document
+                    document.maintenance_task = asyncio.create_task(self._maintain(document))
+        finally:
+            # _maintain drops the lock with the document; a failed load must not leave one behind
+            if note_id not in self.documents and not lock.locked() and self.load_locks.get(note_id) is lock:
+                del self.load_locks[note_id]
+        return document
+
+    async def _load(self, note_id: str) -> NoteDocument:
+        # Another worker may already be editing this note; its copy is newer than the database
+        workers = set(self.known_workers())
+        future = asyncio.get_running_loop().create_future()
+        self.loading[note_id] = future
+        try:
+            if workers:
+                self.awaiting_replies[note_id] = workers
+                await self.publish({"kind": "collab_state_request", "worker": self.worker_id(), "note": note_id})
+                try:
+                    state = await asyncio.wait_for(future, timeout=STATE_REQUEST_TIMEOUT)
+                except asyncio.TimeoutError:
+                    state = None  # A worker that left without a goodbye, or one that never answers
+                if state is not None:
+                    document = NoteDocument(note_id, state["text"], state["revision"])
+                    # Same log window as the other workers, so stale operations are accepted or rejected alike
+                    document.log = state["log"]
+                    document.log_start = state["log_start"]
+                    return document
+            text = await asyncio.get_running_loop().run_in_executor(None, _read_note_text, note_id)
+            return NoteDocument(note_id, text)
+        finally:
+            self.loading.pop(note_id, None)
+            self.awaiting_replies.pop(note_id, None)
+
+    async def submit(self, note_id: str, base_revision: int, operation, user_id: Optional[str], connection_id: str) -> int:
+        """Send an operation to every worker and wait until it is committed; returns the new revision"""
+        document = self.documents.get(note_id)
+        if document is None:
+            raise CollabError("Open the note before editing it")
+        ot.validate(operation)
+        if len(operation) > settings.COLLAB_MAX_OP_COMPONENTS:
+            raise CollabError("Operation is too large; send smaller edits")
+
+        op_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.pending_commits[op_id] = future
+        try:
+            await self.publish({
+                "kind": "collab_op",
+                "worker": self.worker_id(),
+                "note": note_id,
+                "op_id": op_id,
+                "revision": base_revision,
+                "ops": operation,
+                "user_id": user_id,
+                "connection_id": connection_id
+            })
+            return await asyncio.wait_for(future, timeout=COMMIT_TIMEOUT)
+        finally:
+            self.pending_commits.pop(op_id, None)
+
+    def state(self, note_id: str) -> Optional[dict]:
+        document = self.documents.get(note_id)
+        if document is None:
+            return None
+        return {"note": note_id, "text": document.text, "revision": document.revision}
+
+    async def handle_backplane_message(self, message: dict):
+        kind = message["kind"]
+        note_id = message["note"]
+        if kind == "collab_op":
+            self._apply_op(message)
+        elif kind == "collab_state_request" and message["worker"] != self.worker_id():
+            document = self.documents.get(note_id)
+            if document is not None and note_id not in self.loading:
+                await self.publish({
+                    "kind": "collab_state",
+                    "worker": self.worker_id(),
+                    "note": note_id,
+                    "text": document.text,
+                    "revision": document.revision,
+                    "log": document.log,
+                    "log_start": document.log_start
+                })
+            else:
+                # Answer anyway, so the requester need not wait for the timeout
+                await self.publish({"kind": "collab_state", "worker": self.worker_id(), "note": note_id, "missing": True})
+        elif kind == "collab_state":
+            future = self.loading.get(note_id)
+            if future is None or future.done():
+                return
+            if not message.get("missing"):
+                # Operations seen before this message are already part of the state; take the first reply
+                future.set_result(message)
+                return
+            waiting = self.awaiting_replies.get(note_id)
+            if waiting is not None:
+                waiting.discard(message["worker"])
+                if not waiting:
+                    future.set_result(None)
+
+    def _apply_op(self, message: dict):
+        # No awaits in here: every worker must apply operations in exactly backplane order
+        document = self.documents.get(message["note"])
+        future = self.pending_commits.get(message["op_id"])
+        if document is None:
+            if future is not None and not future.done():
+                future.set_exception(CollabError("Note was closed"))
+            return
+        try:
+            operation = document.commit(message["revision"], message["ops"])
+        except (CollabError, ot.OperationError) as e:
+            if future is not None and not future.done():
+                future.set_exception(e if isinstance(e, CollabError) else CollabError(str(e)))
+            return
+
+        document.last_user_id = message.get("user_id")
+        document.last_origin = message["worker"]
+        document.last_change = time.monotonic()
+        self.deliver(note_group(document.note_id), {
+            "type": "note_op",
+            "note": document.note_id,
+            "revision": document.revision,
+            "ops": operation
+        }, message["connection_id"])
+        if future is not None and not future.done():
+            future.set_result(document.revision)
+
+        # Compaction depends only on the revision, so every worker trims its log at the same point
+        if document.revision % settings.COLLAB_SNAPSHOT_EVERY == 0:
+            document.compact()
+            self._save(document)
+
+    def _save(self, document: NoteDocument):
+        """Persist the text if this worker committed the latest operation"""
+        if document.revision == document.saved_revision or document.last_origin != self.worker_id():
+            return
+        start, end = document.pending_range or (0, 0)
+        asyncio.get_running_loop().run_in_executor(
+            None, _save_snapshot, document.note_id, document.text, document.last_user_id, start, end
+        )
+        document.saved_revision = document.revision
+        document.pending_range = None
+
+    async def _maintain(self, document: NoteDocument):
+        """Save notes that went quiet and close them once no local editor is left"""
+        while True:
+            await asyncio.sleep(settings.COLLAB_SAVE_IDLE_SECONDS)
+            if time.monotonic() - document.last_change >= settings.COLLAB_SAVE_IDLE_SECONDS:
+                self._save(document)
+            if not self.local_members(note_group(document.note_id)):
+                self._save(document)
+                self.documents.pop(document.note_id, None)
+                self.load_locks.pop(document.note_id, None)
+                return
+
+
+def _read_note_text(note_id: str) -> str:
+    from app.models.pro_note import ProNote
+
+    db = SessionLocal()
+    try:
+        note = db.query(ProNote).filter(ProNote.noteID == uuid.UUID(note_id)).first()
+        if note is None:
+            raise CollabError("Note not found")
+        return note.note_Descrtion or ""
+    finally:
+        db.close()
+
+
+# The project's creator or one of its members (prjuser); `p` is the projects row
+PROJECT_MEMBER_CONDITION = """(p.crtid = :user_id
+                   OR EXISTS (SELECT 1 FROM prjuser u WHERE u.prjid = p.prjid AND u.uid = :user_id))"""
+
+
+def user_can_open_note(note_id: str, user_id: str) -> bool:
+    """Whether the user created the note's project or is one of its members (prjuser)"""
+    db = SessionLocal()
+    try:
+        row = db.execute(text(f"""
+            SELECT 1
+            FROM pronote n
+            JOIN projects p ON p.prjid = n.prjid
+            WHERE n.noteid = :note_id
+              AND {PROJECT_MEMBER_CONDITION}
+        """), {"note_id": note_id, "user_id": user_id}).first()
+        return row is not None
+    finally:
+        db.close()
+
+
+def user_can_access_project(project_id: str, user_id: str) -> bool:
+    """Same check for a project itself"""
+    db = SessionLocal()
+    try:
+        row = db.execute(text(f"""
+            SELECT 1
+            FROM projects p
+            WHERE p.prjid = :project_id
+              AND {PROJECT_MEMBER_CONDITION}
+        """), {"project_id": project_id, "user_id": user_id}).first()
+        return row is not None
+    finally:
+        db.close()
+
+
+def _save_snapshot(note_id: str, text: str, user_id: Optional[str], start: int, end: int):
+    """Write the note text back to proNote and record the change in pnote_history"""
+    from app.models.pnote_history import PnoteHistory
+    from app.models.pro_note import ProNote
+
+    db = SessionLocal()
+    try:
+        note = db.query(ProNote).filter(ProNote.noteID == uuid.UUID(note_id)).first()
+        if note is None:
+            return
+        now = datetime.utcnow()
+        note.note_Descrtion = text
+        note.update_at = now
+        db.add(PnoteHistory(
+            noteID=note.noteID,
+            nodeID=note.nodeID,
+            prjID=note.prjID,
+            phUserID=uuid.UUID(user_id) if user_id else note.crtID,
+            phModify="collab",
+            phText=text,
+            phModifySRange=start,
+            phModifyERange=end,
+            phModifyDate=now
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to save collaborative snapshot for note %s", note_id)
+    finally:
+        db.close()
@@ -0,0 +1,147 @@
+"""Brotli/gzip compression of HTTP responses.
+
+Like Starlette's GZipMiddleware, but picks brotli when the client accepts it
+and the optional ``brotli`` package is installed, and only compresses text-like
+bodies (JSON, text, JavaScript, XML, SVG) of at least COMPRESSION_MINIMUM_SIZE
+bytes. Uploaded images and PDFs served from /uploads are already compressed
+and event streams must not be buffered, so those pass through untouched, as
+does any response that already has a Content-Encoding.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is used instead
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+def accepted_encodings(header: str) -> set:
+    """Codings listed in Accept-Encoding, without those refused with q=0"""
+    codings = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            codings.add(coding)
+    return codings
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    codings = accepted_encodings(header)
+    if brotli is not None and "br" in codings:
+        return "br"
+    if "gzip" in codings:
+        return "gzip"
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(UNCOMPRESSIBLE_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._compress, self._finish = self.compressor.process, self.compressor.finish
+        else:
+            # wbits 31: zlib stream with a gzip header and trailer
+            self.compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress, self._finish = self.compressor.compress, self.compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None) -> None:
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+            if encoding is not None:
+                await CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body chunk tells whether to compress
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or not is_compressible(headers.get("content-type", ""))
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                message["body"] = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        # Remaining chunks of a streamed response
+        message["body"] = self.compressor.compress(body) + (b"" if more_body else self.compressor.finish())
+        await self.send(message)
@@ -10,8 +10,75 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24시간으로 증가 (60분 * 24)
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "10000"))  # 검증된 토큰 → 사용자 캐시 최대 항목 수
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))  # 캐시된 사용자 정보 유지 시간 (0이면 캐시 사용 안 함)
+
+    # Database connection pool settings (PostgreSQL)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))  # 엔진별로 유지하는 연결 수
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # 풀이 가득 찼을 때 추가로 여는 연결 수
+    DB_POOL_TIMEOUT_SECONDS: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))  # 풀에서 연결을 기다리는 최대 시간
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))  # 이 시간보다 오래된 연결은 다시 연결 (-1이면 사용 안 함)
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # 연결을 꺼낼 때 살아 있는지 확인
+    DB_POOL_WARMUP: int = int(os.getenv("DB_POOL_WARMUP", "5"))  # 서버 시작 시 미리 열어 두는 연결 수 (0이면 사용 안 함)
+    DB_REPLICA_URLS: str = os.getenv("DB_REPLICA_URLS", "")  # 읽기 전용 복제본 URL 목록 (쉼표로 구분, 비어 있으면 사용 안 함)
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))  # 지연이 이보다 큰 복제본은 사용하지 않음
+    DB_REPLICA_CHECK_SECONDS: float = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "2"))  # 복제 지연 확인 주기
+    API_PAGE_SIZE_MAX: int = int(os.getenv("API_PAGE_SIZE_MAX", "1000"))  # 목록 API 한 페이지의 최대 행 수
+    SQL_STATS_ENABLED: bool = os.getenv("SQL_STATS_ENABLED", "true").lower() == "true"  # 요청별 SQL 실행 횟수/시간 집계
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))  # 이보다 오래 걸린 쿼리는 로그에 기록
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))  # 한 요청에서 같은 형태의 쿼리가 이 횟수 이상이면 N+1 의심
+    DB_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "10"))  # 쓰기 후 이 시간 동안 같은 사용자의 읽기는 주 DB 사용
+
+    # HTTP response compression settings
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))  # 이보다 작은 응답은 압축하지 않음 (바이트)
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))  # gzip 압축 수준 (1-9, 낮을수록 빠름)
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # brotli 압축 품질 (0-11, brotli 패키지가 있을 때만 사용)
+
+    # WebSocket settings
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))  # 연결별 송신 큐 최대 길이
+    WS_SLOW_CONSUMER_POLICY: str = os.getenv("WS_SLOW_CONSUMER_POLICY", "disconnect")  # 큐 초과 시 "drop" 또는 "disconnect"
+    WS_PRESENCE_DEBOUNCE_MS: int = int(os.getenv("WS_PRESENCE_DEBOUNCE_MS", "100"))  # 접속 변경 이벤트를 모아서 보내는 간격
+    WS_PRESENCE_SNAPSHOT_THRESHOLD: int = int(os.getenv("WS_PRESENCE_SNAPSHOT_THRESHOLD", "200"))  # 이벤트가 이보다 많으면 전체 목록 전송
+    WS_BACKPLANE: str = os.getenv("WS_BACKPLANE", "memory")  # 워커 간 메시지 전달 방식: "memory" 또는 "redis"
+    WS_BACKPLANE_URL: str = os.getenv("WS_BACKPLANE_URL", "redis://localhost:6379/0")
+    WS_BACKPLANE_CHANNEL: str = os.getenv("WS_BACKPLANE_CHANNEL", "adcluster:ws")
+    WS_BACKPLANE_HEARTBEAT_SECONDS: int = int(os.getenv("WS_BACKPLANE_HEARTBEAT_SECONDS", "10"))
+    WS_HISTORY_SIZE: int = int(os.getenv("WS_HISTORY_SIZE", "500"))  # 그룹별로 메모리에 보관할 메시지 수
+    WS_HISTORY_MAX_GROUPS: int = int(os.getenv("WS_HISTORY_MAX_GROUPS", "1000"))  # 기록을 보관할 최대 그룹 수
+    WS_HISTORY_SPILL_DIR: str = os.getenv("WS_HISTORY_SPILL_DIR", "")  # 비어 있으면 디스크에 저장하지 않음
+    WS_HISTORY_SPILL_MAX_BYTES: int = int(os.getenv("WS_HISTORY_SPILL_MAX_BYTES", str(10 * 1024 * 1024)))  # 그룹별 파일 최대 크기
+    WS_PING_INTERVAL_SECONDS: float = float(os.getenv("WS_PING_INTERVAL_SECONDS", "30"))  # 이 시간 동안 수신이 없으면 {"type": "ping"} 전송 (0이면 사용 안 함, python main.py 실행 시 uvicorn 프로토콜 ping에도 사용)
+    WS_PING_TIMEOUT_SECONDS: float = float(os.getenv("WS_PING_TIMEOUT_SECONDS", "30"))  # ping 후 이 시간 안에 pong(또는 다른 메시지)이 없으면 연결 종료
+    WS_IDLE_TIMEOUT_SECONDS: int = int(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "600"))  # 클라이언트 메시지(pong 포함)가 없을 때 연결 종료 (0이면 사용 안 함)
+    WS_SEND_TIMEOUT_SECONDS: int = int(os.getenv("WS_SEND_TIMEOUT_SECONDS", "30"))  # 전송이 이 시간 이상 멈추면 끊어진 연결로 간주
+    WS_REAP_INTERVAL_SECONDS: int = int(os.getenv("WS_REAP_INTERVAL_SECONDS", "5"))  # 유휴/정지 연결 검사 주기
+    WS_RESUME_MAX_MESSAGES: int = int(os.getenv("WS_RESUME_MAX_MESSAGES", "1000"))  # 재접속 시 한 번에 보내는 최대 메시지 수
+    WS_MAX_FRAME_BYTES: int = int(os.getenv("WS_MAX_FRAME_BYTES", "65536"))  # 클라이언트가 보내는 프레임 하나의 최대 크기
+    WS_INBOUND_MESSAGES_PER_SECOND: float = float(os.getenv("WS_INBOUND_MESSAGES_PER_SECOND", "20"))  # 연결별 수신 메시지 속도 제한 (0이면 사용 안 함)
+    WS_INBOUND_MESSAGE_BURST: int = int(os.getenv("WS_INBOUND_MESSAGE_BURST", "40"))  # 순간적으로 허용하는 메시지 수
+    WS_INBOUND_BYTES_PER_SECOND: int = int(os.getenv("WS_INBOUND_BYTES_PER_SECOND", "131072"))  # 연결별 수신 바이트 속도 제한 (0이면 사용 안 함)
+    WS_INBOUND_BYTE_BURST: int = int(os.getenv("WS_INBOUND_BYTE_BURST", "262144"))  # 순간적으로 허용하는 바이트 수
+    WS_HTTP_BATCH_MAX: int = int(os.getenv("WS_HTTP_BATCH_MAX", "1000"))  # HTTP 일괄 전송 요청 하나에 담을 수 있는 최대 메시지 수
+    WS_DB_TARGETS: str = os.getenv("WS_DB_TARGETS", f"{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'adcluster_db')}")  # /ws/db 콘솔이 접속할 수 있는 DB 목록 (host:port/database, 쉼표로 구분, 비어 있으면 사용 안 함)
+    WS_DB_WORKERS: int = int(os.getenv("WS_DB_WORKERS", "8"))  # /ws/db 쿼리를 실행하는 스레드 수
+    WS_DB_POOL_MAX: int = int(os.getenv("WS_DB_POOL_MAX", "5"))  # /ws/db 대상 DB별 최대 연결 수
+    WS_DB_MAX_POOLS: int = int(os.getenv("WS_DB_MAX_POOLS", "8"))  # 동시에 유지하는 대상 DB 연결 풀 수
+    WS_DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("WS_DB_STATEMENT_TIMEOUT_MS", "30000"))  # /ws/db 쿼리 최대 실행 시간
+    WS_DB_CHUNK_ROWS: int = int(os.getenv("WS_DB_CHUNK_ROWS", "500"))  # 스트리밍 시 한 번에 보내는 행 수
+    WS_DB_MAX_ROWS: int = int(os.getenv("WS_DB_MAX_ROWS", "10000"))  # 스트리밍하지 않는 쿼리가 반환하는 최대 행 수
+    WS_INBOUND_LIMIT_POLICY: str = os.getenv("WS_INBOUND_LIMIT_POLICY", "throttle")  # 제한 초과 시 "drop", "throttle" 또는 "disconnect"
+
+    # Collaborative note editing settings
+    COLLAB_SNAPSHOT_EVERY: int = int(os.getenv("COLLAB_SNAPSHOT_EVERY", "100"))  # 이 리비전마다 로그 정리 및 DB 저장
+    COLLAB_OP_LOG_KEEP: int = int(os.getenv("COLLAB_OP_LOG_KEEP", "200"))  # 늦게 도착한 편집을 변환하기 위해 남겨 둘 연산 수
+    COLLAB_SAVE_IDLE_SECONDS: int = int(os.getenv("COLLAB_SAVE_IDLE_SECONDS", "5"))  # 편집이 멈추면 저장하기까지의 시간
+    DB_EVENTS_ENABLED: bool = os.getenv("DB_EVENTS_ENABLED", "true").lower() == "true"  # DB 변경 알림(LISTEN/NOTIFY)을 토픽으로 전달
+    WS_MAX_SUBSCRIPTIONS: int = int(os.getenv("WS_MAX_SUBSCRIPTIONS", "500"))  # 연결 하나가 구독할 수 있는 토픽 패턴 수
+    WS_AWARENESS_INTERVAL_MS: int = int(os.getenv("WS_AWARENESS_INTERVAL_MS", "100"))  # 커서/선택 상태를 그룹에 보내는 주기
+    WS_AWARENESS_MAX_BYTES: int = int(os.getenv("WS_AWARENESS_MAX_BYTES", "1024"))  # 클라이언트 상태 하나의 최대 크기
+    COLLAB_MAX_OP_COMPONENTS: int = int(os.getenv("COLLAB_MAX_OP_COMPONENTS", "1000"))  # 연산 하나의 최대 구성 요소 수
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
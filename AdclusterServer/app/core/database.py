@@ -1,20 +1,36 @@
 import os
+import logging
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Connection pool options for the PostgreSQL engines (primary and replicas)
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
 # Check if we should use SQLite for development
 USE_SQLITE = os.getenv("USE_SQLITE", "false").lower() == "true"
 
 if USE_SQLITE:
     # Use SQLite for development
     DATABASE_URL = "sqlite:///./test.db"
+    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
     
     # Custom UUID type for SQLite
@@ -67,16 +83,10 @@ else:
 
     # Construct database URL
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
     # Create SQLAlchemy engine
-    engine = create_engine(DATABASE_URL)
-
-    # Enable ltree extension
-    @event.listens_for(engine, "connect")
-    def set_search_path(dbapi_connection, connection_record):
-        with dbapi_connection.cursor() as cursor:
-            cursor.execute("CREATE EXTENSION IF NOT EXISTS ltree")
-        dbapi_connection.commit()
+    engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
 
     # Create Base class for models
     Base = declarative_base()
@@ -90,4 +100,61 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async engine for routers that must not block the event loop (asyncpg / aiosqlite)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **({} if USE_SQLITE else POOL_OPTIONS))
+
+# expire_on_commit=False: attributes can't be lazy-loaded after commit in async code
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+async def get_async_db():
+    """Dependency to get an async DB session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Extensions the models rely on; created once at boot instead of on every new connection
+REQUIRED_EXTENSIONS = ["ltree"]
+
+def bootstrap_database():
+    """Create required extensions and report missing tables, once per process start"""
+    if USE_SQLITE:
+        return
+    with engine.begin() as connection:
+        for extension in REQUIRED_EXTENSIONS:
+            connection.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+        existing = set(inspect(connection).get_table_names())
+    missing = sorted(set(Base.metadata.tables) - existing)
+    if missing:
+        logger.warning(f"Tables missing from the database (run the migrations): {', '.join(missing)}")
+
+def warm_up_pool(count: int = settings.DB_POOL_WARMUP):
+    """Open `count` connections up front so the first requests don't pay for the handshakes"""
+    if USE_SQLITE or count <= 0:
+        return
+    connections = []
+    try:
+        for _ in range(min(count, settings.DB_POOL_SIZE)):
+            connections.append(engine.connect())
+    finally:
+        # Returned connections stay open in the pool
+        for connection in connections:
+            connection.close()
+
+async def warm_up_async_pool(count: int = settings.DB_POOL_WARMUP):
+    """Same as warm_up_pool for the async engine"""
+    if USE_SQLITE or count <= 0:
+        return
+    connections = []
+    try:
+        for _ in range(min(count, settings.DB_POOL_SIZE)):
+            connections.append(await async_engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
@@ -0,0 +1,189 @@
+"""Query execution for the /ws/db admin console.
+
+Everything that touches psycopg2 here blocks, so the endpoint runs it on a
+dedicated thread pool (``run_blocking``); a long admin query then only occupies
+one of those threads instead of freezing the event loop for every user.
+
+Only admins reach the console (the endpoint checks the token before accepting
+the socket), and only the databases listed in WS_DB_TARGETS can be targeted.
+
+Connections come from one ThreadedConnectionPool per target database (host,
+port, database, user), kept in a small LRU so the console does not open a new
+connection for every session or query. Each query runs in its own transaction
+with ``SET LOCAL statement_timeout``. Row-returning statements are read through
+a server-side (named) cursor, ``fetch`` pulling one chunk at a time, so the
+server never holds a full result set in memory.
+"""
+import asyncio
+import functools
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+
+from app.core.config import settings
+
+# Statements a named cursor (DECLARE ... CURSOR FOR) accepts. WITH is left out
+# because a data-modifying WITH cannot be declared as a cursor.
+STREAMABLE_KEYWORDS = ("select", "values", "table")
+
+_executor = ThreadPoolExecutor(max_workers=settings.WS_DB_WORKERS, thread_name_prefix="ws-db")
+
+
+async def run_blocking(function, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(function, *args, **kwargs))
+
+
+def allowed_targets() -> set:
+    """(host, port, database) triples from WS_DB_TARGETS"""
+    targets = set()
+    for entry in settings.WS_DB_TARGETS.split(","):
+        address, _, database = entry.strip().partition("/")
+        host, _, port = address.partition(":")
+        if host and database:
+            targets.add((host.lower(), port or "5432", database))
+    return targets
+
+
+def is_allowed_target(params: dict) -> bool:
+    return (str(params.get("host", "")).lower(), str(params.get("port", "")), params.get("database")) in allowed_targets()
+
+
+class CountingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that counts its checked-out connections"""
+
+    def __init__(self, *args, **kwargs):
+        self.in_use = 0
+        self.count_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def getconn(self, key=None):
+        connection = super().getconn(key)
+        with self.count_lock:
+            self.in_use += 1
+        return connection
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        with self.count_lock:
+            self.in_use -= 1
+
+
+class ConsolePools:
+    """One pool per target database, least recently used pools closed first"""
+
+    def __init__(self, max_pools: int, max_connections: int):
+        self.max_pools = max_pools
+        self.max_connections = max_connections
+        self.pools: "OrderedDict[tuple, CountingConnectionPool]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, params: dict) -> CountingConnectionPool:
+        key = tuple(sorted(params.items()))
+        with self.lock:
+            pool = self.pools.get(key)
+            if pool is not None:
+                self.pools.move_to_end(key)
+                return pool
+            pool = CountingConnectionPool(0, self.max_connections, **params)
+            self.pools[key] = pool
+            if len(self.pools) > self.max_pools:
+                # closeall() would also close checked-out connections, so skip pools with a query running
+                for old_key, old_pool in list(self.pools.items()):
+                    if old_key != key and not old_pool.in_use:
+                        del self.pools[old_key]
+                        old_pool.closeall()
+                        break
+            return pool
+
+    def close_all(self):
+        with self.lock:
+            for pool in self.pools.values():
+                pool.closeall()
+            self.pools.clear()
+
+
+console_pools = ConsolePools(settings.WS_DB_MAX_POOLS, settings.WS_DB_POOL_MAX)
+
+
+def check_connection(pool: psycopg2.pool.ThreadedConnectionPool):
+    """Borrow and return one connection, so bad credentials fail on the connect action"""
+    connection = pool.getconn()
+    pool.putconn(connection)
+
+
+def is_streamable(query: str) -> bool:
+    words = query.lstrip(" \t\r\n(").split(None, 1)
+    return bool(words) and words[0].lower() in STREAMABLE_KEYWORDS
+
+
+class ConsoleQuery:
+    """One query on a pooled connection; every method blocks and runs on the console thread pool"""
+
+    def __init__(self, pool: psycopg2.pool.ThreadedConnectionPool, query: str, timeout_ms: int, query_id: Optional[str] = None):
+        self.pool = pool
+        self.query = query
+        self.timeout_ms = timeout_ms
+        self.query_id = query_id or str(uuid.uuid4())
+        self.connection = None
+        self.cursor = None
+        self.cancelled = False
+
+    def execute(self) -> Tuple[Optional[List[str]], int]:
+        """Run the query; returns (columns, rowcount) with columns None for statements without rows"""
+        self.connection = self.pool.getconn()
+        with self.connection.cursor() as settings_cursor:
+            # Applies to this transaction only, so the pooled connection is left as it was
+            settings_cursor.execute("SET LOCAL statement_timeout = %s", (self.timeout_ms,))
+        if is_streamable(self.query):
+            self.cursor = self.connection.cursor(
+                name=f"ws_db_{uuid.uuid4().hex}",
+                cursor_factory=psycopg2.extras.RealDictCursor
+            )
+            self.cursor.itersize = settings.WS_DB_CHUNK_ROWS
+        else:
+            self.cursor = self.connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        self.cursor.execute(self.query)
+        if self.cursor.name is not None:
+            # DECLARE returns no description; the first fetch fills it in
+            return [], -1
+        if self.cursor.description is None:
+            return None, self.cursor.rowcount
+        return [column[0] for column in self.cursor.description], self.cursor.rowcount
+
+    def fetch(self, size: int) -> Tuple[List[str], List[dict]]:
+        rows = self.cursor.fetchmany(size)
+        columns = [column[0] for column in self.cursor.description] if self.cursor.description else []
+        return columns, rows
+
+    def cancel(self):
+        """Ask the server to abort the running statement; safe to call from another thread"""
+        self.cancelled = True
+        if self.connection is not None:
+            self.connection.cancel()
+
+    def finish(self, commit: bool):
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        broken = False
+        try:
+            if commit:
+                self.cursor.close()
+                connection.commit()
+            else:
+                # Rolling back also discards the server-side cursor
+                connection.rollback()
+        except psycopg2.Error:
+            broken = True
+        try:
+            self.pool.putconn(connection, close=broken or bool(connection.closed))
+        except psycopg2.pool.PoolError:
+            # The pool was closed while the query ran
+            connection.close()
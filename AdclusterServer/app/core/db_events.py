@@ -0,0 +1,184 @@
+"""Push database changes to WebSocket topic subscribers.
+
+Triggers from migrations/20251019_add_change_notify_triggers.sql send a NOTIFY on
+``adcluster_changes`` for every insert, update and delete on pronote, pronodes,
+folders, clbcomments and mylibitems. Each worker LISTENs on its own connection
+and hands the events to its local subscribers. The events are not republished
+on the backplane, because every worker already receives every NOTIFY.
+
+Topics (subscribe with e.g. ``project/<prjID>/#``):
+
+- pronote      -> project/<prjID>/note/<noteID>
+- pronodes     -> project/<prjID>/node/<nodeID>
+- folders      -> project/<projectID>/folder/<folderID>
+- clbcomments  -> project/<prjID>/note/<noteID>/comment/<id>
+- mylibitems   -> mylib/<mlid>/item/<item_id>
+
+These namespaces are reserved for the listener: only members of the project
+(or the owner of the library) may subscribe to them, one project or library
+per pattern, and nothing else may publish into them.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from typing import Callable, Optional
+
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import text
+
+from app.core.collab import user_can_access_project
+from app.core.database import SessionLocal
+from app.core.topics import TopicError, split_pattern
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "adcluster_changes"
+RESERVED_NAMESPACES = ("project", "mylib")  # First topic segments only this listener publishes to
+WILDCARDS = ("+", "#")
+
+
+def is_reserved_topic(topic: str) -> bool:
+    return topic.split("/", 1)[0] in RESERVED_NAMESPACES
+
+
+def user_owns_mylib(mlid: str, user_id: str) -> bool:
+    """Whether the library belongs to the user (mylib.author holds the owner's name, as in /api/resources)"""
+    db = SessionLocal()
+    try:
+        row = db.execute(text("""
+            SELECT 1
+            FROM mylib m
+            JOIN users u ON u.uname = m.author
+            WHERE m.mlid = :mlid AND u.uid = :user_id
+        """), {"mlid": mlid, "user_id": user_id}).first()
+        return row is not None
+    finally:
+        db.close()
+
+
+def check_subscription(pattern: str, user_id: str):
+    """Raise TopicError unless the user may receive the events a pattern matches
+
+    Blocking (database lookups); call it from the thread pool.
+    """
+    segments = split_pattern(pattern)
+    if segments[0] in WILDCARDS:
+        raise TopicError("The first segment of a topic pattern cannot be a wildcard")
+    namespace = segments[0]
+    if namespace not in RESERVED_NAMESPACES:
+        return
+    if len(segments) < 2 or segments[1] in WILDCARDS:
+        raise TopicError(f"Subscribe to one {namespace} at a time: {namespace}/<id>/...")
+    try:
+        scope_id = str(uuid.UUID(segments[1]))
+    except ValueError:
+        raise TopicError(f"Invalid {namespace} ID in topic pattern: {segments[1]}")
+    if namespace == "project":
+        if not user_can_access_project(scope_id, user_id):
+            raise TopicError("Project not found or you are not a member of it")
+    elif not user_owns_mylib(scope_id, user_id):
+        raise TopicError("Library not found or it is not yours")
+
+
+def change_topic(event: dict) -> Optional[str]:
+    table = event.get("table")
+    project = event.get("project")
+    if table == "pronote" and project:
+        return f"project/{project}/note/{event['id']}"
+    if table == "pronodes" and project:
+        return f"project/{project}/node/{event['id']}"
+    if table == "folders" and project:
+        return f"project/{project}/folder/{event['id']}"
+    if table == "clbcomments" and project and event.get("note"):
+        return f"project/{project}/note/{event['note']}/comment/{event['id']}"
+    if table == "mylibitems" and event.get("mlid"):
+        return f"mylib/{event['mlid']}/item/{event['id']}"
+    return None
+
+
+class DatabaseEventListener:
+    """LISTEN on a dedicated autocommit connection, driven by the event loop's reader callbacks"""
+
+    def __init__(self, dsn: str, deliver: Callable[[str, dict], None]):
+        self.dsn = dsn
+        self.deliver = deliver  # (topic, event) -> queue for local subscribers
+        self.connection = None
+        self.reconnect_task: Optional[asyncio.Task] = None
+        self.stopped = False
+
+    async def start(self):
+        self.stopped = False
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.warning("Database event listener could not connect: %s; retrying in the background", e)
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self.stopped = True
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+            self.reconnect_task = None
+        self._close()
+
+    async def _connect(self):
+        loop = asyncio.get_running_loop()
+        # Connecting blocks; keep it off the event loop
+        connection = await loop.run_in_executor(None, psycopg2.connect, self.dsn)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        self.connection = connection
+        loop.add_reader(connection.fileno(), self._on_readable)
+        logger.info("Listening for database change events on %s", CHANNEL)
+
+    def _on_readable(self):
+        try:
+            self.connection.poll()
+        except Exception as e:
+            logger.warning("Database event listener lost its connection: %s", e)
+            self._close()
+            self._schedule_reconnect()
+            return
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+            topic = change_topic(event)
+            if topic is not None:
+                self.deliver(topic, event)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self.connection.fileno())
+        except Exception:
+            pass
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+
+    def _schedule_reconnect(self):
+        if not self.stopped and self.reconnect_task is None:
+            self.reconnect_task = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        delay = 1
+        try:
+            while not self.stopped:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                    return
+                except Exception as e:
+                    logger.warning("Database event listener reconnect failed: %s", e)
+                    delay = min(delay * 2, 30)
+        finally:
+            self.reconnect_task = None
@@ -0,0 +1,191 @@
+"""Routing of read-only requests to PostgreSQL read replicas.
+
+List endpoints opt in with ``Depends(get_read_db)`` (or ``get_read_engine`` for
+code that uses the sync engine directly). A request then reads from a replica
+when all of these hold:
+
+- it is a GET or HEAD request;
+- the caller has not written anything in the last DB_READ_YOUR_WRITES_SECONDS,
+  so a user who just saved a folder sees it in the tree they fetch next;
+- a replica is reachable, streaming WAL from the primary and its replay lag
+  is at most DB_REPLICA_MAX_LAG_SECONDS.
+
+Otherwise the primary is used. Replica lag is measured in the background every
+DB_REPLICA_CHECK_SECONDS. Callers are told apart by their Authorization header
+(or client address). The recent-writer table is per process, so with several
+workers and no sticky sessions, read-your-writes only holds for requests that
+reach the worker that took the write.
+"""
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ("GET", "HEAD")
+
+# Whether the replica is connected to the primary, and its lag: 0 when it has
+# replayed everything it received, otherwise the age of the last replayed
+# transaction. A disconnected replica has nothing left to replay and would
+# report 0, so it must be checked for streaming first. Roles without
+# pg_read_all_stats only see the pid of the WAL receiver, not its status.
+# On the primary both LSN functions are NULL and reads are always fresh.
+LAG_QUERY = text(
+    "SELECT NOT pg_is_in_recovery() OR EXISTS ("
+    "SELECT 1 FROM pg_stat_wal_receiver WHERE pid IS NOT NULL AND COALESCE(status, 'streaming') = 'streaming'"
+    ") AS streaming, "
+    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END AS lag"
+)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.name = url.rsplit("@", 1)[-1]  # host:port/db, without credentials
+        self.engine = create_engine(url, **database.POOL_OPTIONS)
+        self.async_engine = create_async_engine(
+            url.replace("postgresql://", "postgresql+asyncpg://", 1), **database.POOL_OPTIONS
+        )
+        self.session_maker = sessionmaker(
+            bind=self.async_engine,
+            class_=AsyncSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        self.lag_seconds: Optional[float] = None  # None until the first successful check
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+        self.reads = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.error is None and self.lag_seconds is not None and self.lag_seconds <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+    async def check_lag(self):
+        try:
+            async with self.async_engine.connect() as connection:
+                result = await asyncio.wait_for(connection.execute(LAG_QUERY), timeout=settings.DB_REPLICA_CHECK_SECONDS)
+                streaming, lag = result.one()
+            if not streaming:
+                raise ConnectionError("not streaming WAL from the primary")
+            self.lag_seconds = float(lag or 0)
+            self.error = None
+        except Exception as e:
+            if self.error is None:
+                logger.warning(f"Replica {self.name} unavailable: {e}")
+            self.error = str(e)
+        self.checked_at = time.time()
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "usable": self.usable,
+            "lag_seconds": self.lag_seconds,
+            "error": self.error,
+            "reads": self.reads,
+        }
+
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._round_robin = itertools.count()
+        self.recent_writers: Dict[str, float] = {}  # caller key -> pinned to primary until
+        self.primary_reads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    @staticmethod
+    def caller_key(request: Request) -> str:
+        credentials = request.headers.get("authorization")
+        if credentials:
+            return hashlib.sha1(credentials.encode()).hexdigest()
+        return request.client.host if request.client else ""
+
+    def note_write(self, request: Request):
+        """Keep this caller's reads on the primary for DB_READ_YOUR_WRITES_SECONDS"""
+        now = time.time()
+        self.recent_writers[self.caller_key(request)] = now + settings.DB_READ_YOUR_WRITES_SECONDS
+        if len(self.recent_writers) > 10000:
+            self.recent_writers = {key: until for key, until in self.recent_writers.items() if until > now}
+
+    def choose(self, request: Request) -> Optional[Replica]:
+        """The replica to read from, or None for the primary"""
+        if not self.enabled or request.method not in READ_METHODS:
+            return None
+        if self.recent_writers.get(self.caller_key(request), 0) > time.time():
+            self.primary_reads += 1
+            return None
+        usable = [replica for replica in self.replicas if replica.usable]
+        if not usable:
+            self.primary_reads += 1
+            return None
+        replica = usable[next(self._round_robin) % len(usable)]
+        replica.reads += 1
+        return replica
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            await self.check_all()
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+    async def check_all(self):
+        await asyncio.gather(*(replica.check_lag() for replica in self.replicas))
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_SECONDS)
+            await self.check_all()
+
+    def status(self) -> dict:
+        return {
+            "replicas": [replica.status() for replica in self.replicas],
+            "primary_reads": self.primary_reads,
+        }
+
+
+def _replica_urls() -> List[str]:
+    if database.USE_SQLITE:
+        return []
+    return [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+
+
+replica_router = ReplicaRouter(_replica_urls())
+
+
+async def get_read_db(request: Request):
+    """Dependency to get an async DB session for read-only endpoints"""
+    replica = replica_router.choose(request)
+    session_maker = replica.session_maker if replica else database.AsyncSessionLocal
+    async with session_maker() as db:
+        yield db
+
+
+def get_read_engine(request: Request):
+    """Dependency to get the sync engine a read-only endpoint should use"""
+    replica = replica_router.choose(request)
+    return replica.engine if replica else database.engine
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from jose import JWTError
 from app.core.database import get_db
 from app.core.jwt import verify_token
+from app.core.auth_cache import user_cache
 from app.models.user import User as UserModel
 from typing import Optional
 import uuid
@@ -21,16 +22,23 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    # 이미 검증한 토큰이면 JWT 디코딩과 DB 조회를 건너뜀
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     token_data = verify_token(token, credentials_exception)
     
     # 수정: uid 필드 사용 (UUID 타입)
     if token_data.user_id is not None:
+        # 조회 중에 사용자가 무효화되면(차단, 권한 변경) 읽은 행을 캐시에 넣지 않음
+        generation = user_cache.generation(token_data.user_id)
         # Ensure we're comparing UUIDs properly
         user = db.query(UserModel).filter(UserModel.uid == token_data.user_id).first()
         if user is None:
             raise credentials_exception
         
-        return user
+        return user_cache.put(token, user, token_data.exp, generation)
     else:
         raise credentials_exception
 
@@ -0,0 +1,52 @@
+"""Conditional GET for listings that rarely change.
+
+The editor re-fetches the project list, folder trees and node trees on every
+navigation although they rarely change. Such an endpoint first runs a cheap
+aggregate over the rows it would return (row count and newest update
+timestamp), hashes it together with anything else the body depends on (query
+string, current date) into a weak ETag, and answers a matching If-None-Match
+with 304 Not Modified before the list query runs. Otherwise the rows are
+loaded as before and the ETag is sent with them.
+
+The count catches deletes, the newest timestamp catches inserts and updates,
+so writers must bump the timestamp column they change (folderupdated,
+updated_at). Lists over whole tables (the project list) would have to scan
+them for that aggregate, so they read a counter in list_versions instead,
+which statement triggers bump on every change to the tables behind the list.
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# Clients may keep the body but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists `etag` (weak comparison, as RFC 7232 requires for If-None-Match)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(",")}
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
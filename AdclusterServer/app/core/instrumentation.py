@@ -0,0 +1,57 @@
+"""Per-request bookkeeping for HTTP requests, as one pure ASGI middleware.
+
+For every HTTP request it:
+
+- attributes the SQL statements run while serving it to its route
+  (app/core/sql_stats.py, when SQL_STATS_ENABLED);
+- records the request count, latency and errors per route (/metrics);
+- keeps a caller who just wrote something on the primary database for
+  DB_READ_YOUR_WRITES_SECONDS (app/core/db_routing.py).
+
+Starlette's ``@app.middleware("http")`` wraps each layer in a task and a
+response stream per request, so these run in a single layer instead, like
+CompressionMiddleware.
+"""
+import time
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db_routing import replica_router, READ_METHODS
+from app.core.metrics import record_request
+from app.core.runtime_stats import route_template
+from app.core.sql_stats import sql_stats
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        stats = sql_stats.begin_request(request.url.path) if settings.SQL_STATS_ENABLED else None
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Pin before the client sees the response, so its next read can't reach a stale replica
+                if replica_router.enabled and request.method not in READ_METHODS and status_code < 400:
+                    replica_router.note_write(request)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router has stored the matched endpoint in the scope by now
+            route = route_template(request)
+            record_request(request.method, route, status_code, time.perf_counter() - started)
+            if stats is not None and stats.statements:
+                sql_stats.end_request(f"{request.method} {route}", stats)
@@ -40,7 +40,13 @@ def verify_token(token: str, credentials_exception):
             raise credentials_exception
             
         # 토큰 데이터 생성
-        token_data = TokenData(user_id=user_id, uname=username, uemail=email)
+        expires = payload.get("exp")
+        token_data = TokenData(
+            user_id=user_id,
+            uname=username,
+            uemail=email,
+            exp=datetime.utcfromtimestamp(expires) if expires is not None else None
+        )
         
     except JWTError:
         raise credentials_exception
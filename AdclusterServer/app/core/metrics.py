@@ -0,0 +1,167 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain dictionaries keyed by label values, updated
+by InstrumentationMiddleware (app/core/instrumentation.py) and by the
+upstream hooks below, so recording costs a couple of dictionary operations.
+Gauges (WebSocket connections, DB pools, event-loop lag) are not stored;
+registered collector functions read them from their owners when /metrics is
+scraped. Counters kept by other objects (WebSocket drops) are collected the
+same way and described as counters.
+
+Metrics are per worker process: with several uvicorn workers each scrape
+reaches one worker, so scrape each worker separately or run one per host.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds; suits both API routes and upstream literature searches
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)  # Non-cumulative; summed when rendered
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.descriptions: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.collectors: List[Callable[[], Iterable[Sample]]] = []
+        self.lock = threading.Lock()  # requests-based upstream calls run on the thread pool
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self.descriptions[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(labels.items())
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS, **labels):
+        key = tuple(labels.items())
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Add a function that returns (name, labels, value) samples at scrape time; gauges unless described otherwise"""
+        self.collectors.append(collector)
+
+    def _header(self, lines: List[str], name: str, default_kind: str):
+        kind, help_text = self.descriptions.get(name, (default_kind, ""))
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for name, series in self.counters.items():
+                self._header(lines, name, "counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in self.histograms.items():
+                self._header(lines, name, "histogram")
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(float(bound))),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        gauges: Dict[str, List[Tuple[Labels, float]]] = {}
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                gauges.setdefault(name, []).append((tuple(labels.items()), value))
+        for name, samples in gauges.items():
+            self._header(lines, name, "gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("http_requests_total", "counter", "HTTP requests by method, route template and status code")
+metrics.describe("http_request_errors_total", "counter", "HTTP requests that failed with a 5xx status or an exception")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by method and route template")
+metrics.describe("upstream_requests_total", "counter", "Requests to external literature providers by status")
+metrics.describe("upstream_request_duration_seconds", "histogram", "Latency of requests to external literature providers")
+
+
+def record_request(method: str, route: str, status: int, duration: float):
+    metrics.inc("http_requests_total", method=method, route=route, status=str(status))
+    metrics.observe("http_request_duration_seconds", duration, method=method, route=route)
+    if status >= 500:
+        metrics.inc("http_request_errors_total", method=method, route=route)
+
+
+def record_upstream(provider: str, status: str, duration: float):
+    metrics.inc("upstream_requests_total", provider=provider, status=status)
+    metrics.observe("upstream_request_duration_seconds", duration, provider=provider)
+
+
+def upstream_hooks(provider: str) -> dict:
+    """httpx event hooks that time every request a client sends to `provider` (until the response headers)
+
+    Only requests that get a response are recorded; timeouts and connection
+    errors raise before the response hook runs.
+    """
+
+    async def on_request(request):
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    async def on_response(response):
+        started = response.request.extensions.get("metrics_started")
+        if started is not None:
+            record_upstream(provider, str(response.status_code), time.perf_counter() - started)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def requests_hooks(provider: str) -> dict:
+    """The same for the blocking requests library; Response.elapsed is also the time until the headers"""
+
+    def on_response(response, *args, **kwargs):
+        record_upstream(provider, str(response.status_code), response.elapsed.total_seconds())
+
+    return {"response": on_response}
@@ -0,0 +1,137 @@
+"""Operational transformation for plain-text documents.
+
+An operation is a list of components walked over the document from the start:
+
+- positive int ``n``: keep the next n characters
+- negative int ``-n``: delete the next n characters
+- str ``s``: insert s at the current position
+
+This is the format used by ot.js, so browser editors can use that library as-is.
+Positions count Unicode code points (Python string indexes).
+"""
+from typing import List, Tuple, Union
+
+Component = Union[int, str]
+Operation = List[Component]
+
+
+class OperationError(ValueError):
+    pass
+
+
+def validate(operation) -> Operation:
+    if not isinstance(operation, list):
+        raise OperationError("Operation must be a list")
+    for component in operation:
+        if isinstance(component, bool) or not isinstance(component, (int, str)) or component == 0 or component == "":
+            raise OperationError(f"Invalid operation component: {component!r}")
+    return operation
+
+
+def base_length(operation: Operation) -> int:
+    return sum(abs(c) for c in operation if isinstance(c, int))
+
+
+def _push(result: Operation, component: Component):
+    """Append a component, merging it with the previous one of the same kind"""
+    if not result:
+        result.append(component)
+        return
+    last = result[-1]
+    if isinstance(component, str) and isinstance(last, str):
+        result[-1] = last + component
+    elif isinstance(component, int) and isinstance(last, int) and (component > 0) == (last > 0):
+        result[-1] = last + component
+    else:
+        result.append(component)
+
+
+def apply(document: str, operation: Operation) -> str:
+    if base_length(operation) != len(document):
+        raise OperationError("Operation does not match the document length")
+    parts = []
+    position = 0
+    for component in operation:
+        if isinstance(component, str):
+            parts.append(component)
+        elif component > 0:
+            parts.append(document[position:position + component])
+            position += component
+        else:
+            position -= component
+    return "".join(parts)
+
+
+def transform(a: Operation, b: Operation) -> Tuple[Operation, Operation]:
+    """Transform concurrent operations a and b (same base document).
+
+    Returns (a', b') such that apply(apply(doc, a), b') == apply(apply(doc, b), a').
+    When both insert at the same position, a's insert goes first.
+    """
+    if base_length(a) != base_length(b):
+        raise OperationError("Concurrent operations must share a base document")
+    a_prime: Operation = []
+    b_prime: Operation = []
+    ia = ib = 0
+    ca = a[0] if a else None
+    cb = b[0] if b else None
+
+    def next_a():
+        nonlocal ia, ca
+        ia += 1
+        ca = a[ia] if ia < len(a) else None
+
+    def next_b():
+        nonlocal ib, cb
+        ib += 1
+        cb = b[ib] if ib < len(b) else None
+
+    while ca is not None or cb is not None:
+        if isinstance(ca, str):
+            _push(a_prime, ca)
+            _push(b_prime, len(ca))
+            next_a()
+            continue
+        if isinstance(cb, str):
+            _push(a_prime, len(cb))
+            _push(b_prime, cb)
+            next_b()
+            continue
+        if ca is None or cb is None:
+            raise OperationError("Operations have different lengths")
+
+        length = min(abs(ca), abs(cb))
+        if ca > 0 and cb > 0:
+            _push(a_prime, length)
+            _push(b_prime, length)
+        elif ca < 0 and cb > 0:
+            _push(a_prime, -length)
+        elif ca > 0 and cb < 0:
+            _push(b_prime, -length)
+        # Both delete the same text: nothing left to do for either side
+
+        ca = ca - length if ca > 0 else ca + length
+        cb = cb - length if cb > 0 else cb + length
+        if ca == 0:
+            next_a()
+        if cb == 0:
+            next_b()
+    return a_prime, b_prime
+
+
+def changed_range(operation: Operation) -> Tuple[int, int]:
+    """Return the (start, end) span the operation touched, in the resulting document"""
+    position = 0
+    start = end = None
+    for component in operation:
+        if isinstance(component, int) and component > 0:
+            position += component
+            continue
+        if start is None:
+            start = position
+        if isinstance(component, str):
+            position += len(component)
+        end = position
+    if start is None:
+        return 0, 0
+    return start, end
@@ -0,0 +1,82 @@
+"""Opaque cursors for keyset pagination.
+
+A list endpoint orders by a unique, indexed key (for example created_at plus
+the primary key) and, instead of OFFSET, continues after the last row of the
+previous page: ``WHERE (created_at, prjid) < (:created_at, :prjid)``. Page 100
+then costs the same index range scan as page 1 and rows inserted meanwhile do
+not shift later pages.
+
+The cursor is the sort key of that last row, JSON encoded and base64url'd.
+Clients treat it as opaque: they read it from the X-Next-Cursor response
+header and send it back as ``?cursor=``. The header is absent on the last page.
+"""
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["uuid", str(value)]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    return ["v", value]
+
+
+def _decode_value(kind: str, value: Any) -> Any:
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    if kind == "uuid":
+        return uuid.UUID(value)
+    if kind == "dec":
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """The sort key values in a cursor; 400 if it was not made by encode_cursor for `size` keys"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(kind, value) for kind, value in json.loads(payload)]
+    except (binascii.Error, ValueError, TypeError):
+        values = None
+    if values is None or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 페이지 커서입니다")
+    return values
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, settings.API_PAGE_SIZE_MAX))
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, key) -> Optional[str]:
+    """Put the cursor after the last row in X-Next-Cursor when the page is full
+
+    `key` returns the sort key values of a row, in ORDER BY order.
+    """
+    if len(rows) < limit:
+        return None
+    cursor = encode_cursor(key(rows[-1]))
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
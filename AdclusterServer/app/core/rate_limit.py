@@ -0,0 +1,109 @@
+"""Inbound limits for WebSocket connections.
+
+Each connection gets two token buckets, one counting frames and one counting
+bytes, plus a hard cap on the size of a single frame. When a frame does not fit
+the policy decides what happens:
+
+- ``drop``: the frame is discarded and the client gets an error reply
+- ``throttle``: the receive loop sleeps until the buckets have refilled, so the
+  client is slowed down by TCP backpressure instead of losing messages
+- ``disconnect``: the connection is closed with 1008 (policy violation)
+
+Frames larger than the cap are never throttled (waiting would not make them
+fit): they are dropped, or the connection is closed with 1009 (message too big)
+under the ``disconnect`` policy.
+"""
+import time
+from typing import Optional, Tuple
+
+POLICY_DROP = "drop"
+POLICY_THROTTLE = "throttle"
+POLICY_DISCONNECT = "disconnect"
+POLICIES = (POLICY_DROP, POLICY_THROTTLE, POLICY_DISCONNECT)
+
+ALLOW = "allow"
+DROP = "drop"
+THROTTLE = "throttle"
+DISCONNECT = "disconnect"
+TOO_LARGE = "too_large"
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``; a rate of 0 means unlimited"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: Optional[float] = None) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they are now)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(time.monotonic() if now is None else now)
+        # A single request bigger than the bucket only has to wait for a full bucket
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, amount: float, now: Optional[float] = None):
+        """Take the tokens, going into debt if needed so a throttled sender pays for the frame"""
+        if self.unlimited:
+            return
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= amount
+
+
+class InboundLimiter:
+    def __init__(
+        self,
+        messages_per_second: float,
+        message_burst: float,
+        bytes_per_second: float,
+        byte_burst: float,
+        max_frame_bytes: int,
+        policy: str = POLICY_THROTTLE
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown inbound limit policy: {policy}")
+        self.messages = TokenBucket(messages_per_second, message_burst)
+        self.bytes = TokenBucket(bytes_per_second, byte_burst)
+        self.max_frame_bytes = max_frame_bytes
+        self.policy = policy
+        self.limited = 0  # Frames that did not fit, whatever the policy did with them
+        self.noticed_at = 0.0
+
+    def check(self, size: int) -> Tuple[str, float]:
+        """Decide what to do with a frame of ``size`` bytes; returns (decision, seconds to wait)"""
+        if self.max_frame_bytes and size > self.max_frame_bytes:
+            self.limited += 1
+            return TOO_LARGE, 0.0
+
+        now = time.monotonic()
+        wait = max(self.messages.wait_time(1, now), self.bytes.wait_time(size, now))
+        if wait > 0:
+            self.limited += 1
+            if self.policy == POLICY_DROP:
+                return DROP, 0.0
+            if self.policy == POLICY_DISCONNECT:
+                return DISCONNECT, 0.0
+        # Throttled frames are charged now and processed after the wait
+        self.messages.consume(1, now)
+        self.bytes.consume(size, now)
+        return (THROTTLE, wait) if wait > 0 else (ALLOW, 0.0)
+
+    def notice_due(self, interval: float = 1.0) -> bool:
+        """Tell a dropped client about it at most once per interval, so the notices can't be a flood of their own"""
+        now = time.monotonic()
+        if now - self.noticed_at < interval:
+            return False
+        self.noticed_at = now
+        return True
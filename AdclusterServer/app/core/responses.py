@@ -0,0 +1,18 @@
+"""Default JSON response class for the API.
+
+orjson encodes the large list bodies (literature searches, /api/files, the
+/ws list endpoints, table browser pages) several times faster than the
+standard library. It is optional: without it the standard JSONResponse is
+used and responses are identical apart from whitespace.
+"""
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as JSONResponse
+else:
+    from fastapi.responses import JSONResponse
+
+__all__ = ["JSONResponse"]
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import resource
+import sys
+import time
+from collections import deque
+from typing import Optional
+
+from starlette.routing import Match
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No /proc (macOS): fall back to the peak RSS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+_routes_by_endpoint = {}
+
+
+def route_template(request) -> str:
+    """The path template of the route that served a request (/api/projects/{project_id}), for grouping stats"""
+    routes = request.app.router.routes
+    if not _routes_by_endpoint:
+        for route in routes:
+            # Mounts (static files) store their app as the endpoint
+            endpoint = getattr(route, "endpoint", None) or getattr(route, "app", None)
+            _routes_by_endpoint.setdefault(endpoint, []).append(route)
+    # The router stores the matched endpoint in the scope; only its routes need matching
+    candidates = _routes_by_endpoint.get(request.scope.get("endpoint"))
+    if candidates and len(candidates) == 1:
+        return candidates[0].path or "/"
+    for route in candidates or routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None) or "/"
+    return "unmatched"
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a task that asked to sleep for a fixed interval"""
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)  # Recent lag samples in seconds
+        self.max_lag = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def snapshot(self) -> dict:
+        samples = sorted(self.samples)
+        if not samples:
+            return {"last_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {
+            "last_ms": round(self.samples[-1] * 1000, 3),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+            "max_ms": round(self.max_lag * 1000, 3)
+        }
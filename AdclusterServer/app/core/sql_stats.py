@@ -0,0 +1,179 @@
+"""Per-request SQL instrumentation.
+
+Cursor execute events on every SQLAlchemy engine (sync, async and replicas)
+are attributed to the HTTP request being served through a context variable
+that ``InstrumentationMiddleware`` (app/core/instrumentation.py) sets. Each
+request records how many statements it ran, the total time spent in the
+database and its slowest statement; the same statement shape (literals
+stripped) run SQL_N_PLUS_ONE_THRESHOLD times or more in one request is flagged
+as an N+1 suspect. Results are aggregated per route template for /api/admin/perf/sql,
+and statements slower than SQL_SLOW_QUERY_MS are logged.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Literals are replaced so queries that only differ in values share a shape
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestSqlStats:
+    """Statements run while serving one request"""
+
+    __slots__ = ("path", "statements", "total_time", "slowest_time", "slowest_statement", "shapes")
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.statements = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.statements += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one_suspects(self) -> Dict[str, int]:
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+class RouteSqlStats:
+    """Aggregate of RequestSqlStats for one route template"""
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.total_time = 0.0
+        self.max_statements = 0
+        self.max_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.n_plus_one_requests = 0
+        self.n_plus_one_shapes: Counter = Counter()  # shape -> requests it was flagged in
+
+    def add(self, stats: RequestSqlStats):
+        self.requests += 1
+        self.statements += stats.statements
+        self.total_time += stats.total_time
+        self.max_statements = max(self.max_statements, stats.statements)
+        self.max_time = max(self.max_time, stats.total_time)
+        if stats.slowest_time > self.slowest_time:
+            self.slowest_time = stats.slowest_time
+            self.slowest_statement = stats.slowest_statement
+        suspects = stats.n_plus_one_suspects()
+        if suspects:
+            self.n_plus_one_requests += 1
+            self.n_plus_one_shapes.update(suspects.keys())
+
+    def report(self) -> dict:
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": round(self.statements / self.requests, 2) if self.requests else 0,
+            "max_statements": self.max_statements,
+            "db_time_ms": round(self.total_time * 1000, 2),
+            "avg_db_time_ms": round(self.total_time * 1000 / self.requests, 2) if self.requests else 0,
+            "max_db_time_ms": round(self.max_time * 1000, 2),
+            "slowest_statement_ms": round(self.slowest_time * 1000, 2),
+            "slowest_statement": self.slowest_statement,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "n_plus_one_suspects": [
+                {"shape": shape, "requests": count} for shape, count in self.n_plus_one_shapes.most_common(5)
+            ],
+        }
+
+
+class SqlStatsCollector:
+    def __init__(self, slow_log_size: int = 100):
+        self.routes: Dict[str, RouteSqlStats] = {}
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self.lock = threading.Lock()  # Sync routes finish on the thread pool
+        self.current: ContextVar[Optional[RequestSqlStats]] = ContextVar("sql_request_stats", default=None)
+
+    def begin_request(self, path: str) -> RequestSqlStats:
+        stats = RequestSqlStats(path)
+        self.current.set(stats)
+        return stats
+
+    def end_request(self, route: str, stats: RequestSqlStats):
+        if not stats.statements:
+            return
+        with self.lock:
+            route_stats = self.routes.get(route)
+            if route_stats is None:
+                route_stats = self.routes[route] = RouteSqlStats()
+            route_stats.add(stats)
+
+    def record(self, statement: str, duration: float):
+        stats = self.current.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            self.slow_queries.append({
+                "at": time.time(),
+                "duration_ms": round(duration * 1000, 2),
+                "path": stats.path if stats is not None else None,
+                "statement": statement,
+            })
+            logger.warning(f"Slow query ({duration * 1000:.1f} ms) on {stats.path if stats is not None else '-'}: {_WHITESPACE.sub(' ', statement)[:500]}")
+
+    def report(self, limit: int = 50) -> dict:
+        with self.lock:
+            routes = sorted(self.routes.items(), key=lambda item: item[1].total_time, reverse=True)[:limit]
+            return {
+                "routes": {route: stats.report() for route, stats in routes},
+                "slow_queries": list(self.slow_queries),
+                "slow_query_ms": settings.SQL_SLOW_QUERY_MS,
+                "n_plus_one_threshold": settings.SQL_N_PLUS_ONE_THRESHOLD,
+            }
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+            self.slow_queries.clear()
+
+
+sql_stats = SqlStatsCollector()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["sql_stats_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("sql_stats_started", None)
+    if started is not None:
+        sql_stats.record(statement, time.perf_counter() - started)
+
+
+if settings.SQL_STATS_ENABLED:
+    # Listening on the Engine class covers every engine, including the async and replica ones
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,121 @@
+"""Topic subscriptions for WebSocket connections.
+
+Topics are "/"-separated paths such as ``project/<prjID>/folder/<folderID>`` or
+``note/<noteID>/comments``. Subscription patterns may use MQTT-style wildcards:
+``+`` matches exactly one segment and ``#`` (last segment only) matches any
+number of remaining segments, e.g. ``project/<prjID>/#``.
+
+Patterns are stored in a trie keyed by segment, so finding the subscribers of a
+published topic costs one walk down the topic's segments instead of a scan over
+every subscription.
+"""
+from typing import Dict, Set
+
+
+class TopicError(ValueError):
+    pass
+
+
+def split_pattern(pattern: str):
+    if not isinstance(pattern, str) or not pattern:
+        raise TopicError("Topic pattern must be a non-empty string")
+    segments = pattern.split("/")
+    for index, segment in enumerate(segments):
+        if segment == "":
+            raise TopicError(f"Empty segment in topic pattern: {pattern}")
+        if segment == "#" and index != len(segments) - 1:
+            raise TopicError("'#' is only allowed as the last segment")
+        if segment not in ("+", "#") and ("+" in segment or "#" in segment):
+            raise TopicError("Wildcards must be whole segments")
+    return segments
+
+
+def split_topic(topic: str):
+    segments = split_pattern(topic)
+    if "+" in segments or "#" in segments:
+        raise TopicError("Published topics cannot contain wildcards")
+    return segments
+
+
+class _Node:
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.subscribers: Set[str] = set()
+
+
+class TopicIndex:
+    def __init__(self):
+        self.root = _Node()
+        self.subscriptions: Dict[str, Set[str]] = {}  # connection ID -> patterns
+
+    def subscribe(self, connection_id: str, pattern: str) -> bool:
+        """Add a subscription; returns False if the connection already had it"""
+        segments = split_pattern(pattern)
+        patterns = self.subscriptions.setdefault(connection_id, set())
+        if pattern in patterns:
+            return False
+        node = self.root
+        for segment in segments:
+            node = node.children.setdefault(segment, _Node())
+        node.subscribers.add(connection_id)
+        patterns.add(pattern)
+        return True
+
+    def unsubscribe(self, connection_id: str, pattern: str) -> bool:
+        patterns = self.subscriptions.get(connection_id)
+        if not patterns or pattern not in patterns:
+            return False
+        patterns.discard(pattern)
+        if not patterns:
+            del self.subscriptions[connection_id]
+
+        # Walk down remembering the path so empty branches can be pruned
+        path = []
+        node = self.root
+        for segment in pattern.split("/"):
+            path.append((node, segment))
+            node = node.children[segment]
+        node.subscribers.discard(connection_id)
+        for parent, segment in reversed(path):
+            child = parent.children[segment]
+            if child.subscribers or child.children:
+                break
+            del parent.children[segment]
+        return True
+
+    def unsubscribe_all(self, connection_id: str):
+        for pattern in list(self.subscriptions.get(connection_id, ())):
+            self.unsubscribe(connection_id, pattern)
+
+    def patterns(self, connection_id: str) -> Set[str]:
+        return self.subscriptions.get(connection_id, set())
+
+    def match(self, topic: str) -> Set[str]:
+        """Return the connection IDs with a pattern matching the topic"""
+        segments = split_topic(topic)
+        matched: Set[str] = set()
+        nodes = [self.root]
+        for segment in segments:
+            next_nodes = []
+            for node in nodes:
+                multi = node.children.get("#")
+                if multi is not None:
+                    matched |= multi.subscribers
+                exact = node.children.get(segment)
+                if exact is not None:
+                    next_nodes.append(exact)
+                single = node.children.get("+")
+                if single is not None:
+                    next_nodes.append(single)
+            nodes = next_nodes
+            if not nodes:
+                return matched
+        for node in nodes:
+            matched |= node.subscribers
+            # "a/#" also matches "a" itself
+            multi = node.children.get("#")
+            if multi is not None:
+                matched |= multi.subscribers
+        return matched
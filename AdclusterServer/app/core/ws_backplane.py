@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[dict], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """Delivers WebSocket routing messages to every worker, including the sender.
+
+    Each worker publishes group messages, private messages and presence changes
+    here instead of writing to sockets directly; the handler registered by the
+    ConnectionManager then delivers them to the clients connected to that worker.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.handler: Optional[MessageHandler] = None
+        self.on_ready: Optional[Callable[[], Awaitable[None]]] = None
+
+    def set_handler(self, handler: MessageHandler):
+        self.handler = handler
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, message: dict):
+        ...
+
+    @abstractmethod
+    async def next_sequence(self, group: str) -> int:
+        """Return the next message sequence number for a group, shared by all workers"""
+
+    async def _dispatch(self, message: dict):
+        if self.handler is None:
+            return
+        try:
+            await self.handler(message)
+        except Exception:
+            logger.exception("Backplane handler failed for message kind %s", message.get("kind"))
+
+    async def _ready(self):
+        if self.on_ready is not None:
+            try:
+                await self.on_ready()
+            except Exception:
+                logger.exception("Backplane ready callback failed")
+
+
+class InProcessBackplane(Backplane):
+    """Single-worker backplane: published messages loop straight back to this process"""
+
+    def __init__(self):
+        super().__init__()
+        self.sequences: Dict[str, int] = {}
+
+    async def start(self):
+        await self._ready()
+
+    async def publish(self, message: dict):
+        await self._dispatch(message)
+
+    async def next_sequence(self, group: str) -> int:
+        self.sequences[group] = self.sequences.get(group, 0) + 1
+        return self.sequences[group]
+
+
+class RedisError(Exception):
+    pass
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Read one RESP reply; error replies are returned as RedisError instances"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Redis connection closed")
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body.decode()
+    if prefix == b"-":
+        return RedisError(body.decode())
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        count = int(body)
+        if count == -1:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+
+class RedisConnection:
+    """Minimal pipelined RESP client covering the few commands the backplane uses"""
+
+    def __init__(self, host: str, port: int, password: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: deque = deque()  # Futures waiting for replies, in command order
+        self.reply_task: Optional[asyncio.Task] = None
+        self.connect_lock = asyncio.Lock()
+
+    async def open(self):
+        """Open a raw connection; used directly by the subscriber"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(encode_command("AUTH", self.password))
+            await writer.drain()
+            reply = await read_reply(reader)
+            if isinstance(reply, RedisError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    async def execute(self, *args):
+        async with self.connect_lock:
+            if self.writer is None:
+                self.reader, self.writer = await self.open()
+                self.reply_task = asyncio.create_task(self._read_replies())
+            # Queue the reply and write without yielding, so a concurrent reset can't
+            # clear the writer in between; the reset fails the future instead
+            writer = self.writer
+            future = asyncio.get_running_loop().create_future()
+            self.pending.append(future)
+            writer.write(encode_command(*args))
+        try:
+            await writer.drain()
+        except Exception:
+            future.cancel()
+            if not future.cancelled():
+                future.exception()  # Already failed by the reset; mark it retrieved
+            raise
+        reply = await future
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    async def _read_replies(self):
+        try:
+            while True:
+                reply = await read_reply(self.reader)
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            self._reset(ConnectionError(f"Redis connection lost: {e}"))
+
+    def _reset(self, error: Exception):
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    def close(self):
+        if self.reply_task is not None:
+            self.reply_task.cancel()
+            self.reply_task = None
+        self._reset(ConnectionError("Redis connection closed"))
+
+
+class RedisBackplane(Backplane):
+    """Backplane over Redis pub/sub; any server speaking the Redis protocol works"""
+
+    def __init__(self, url: str, channel: str):
+        super().__init__()
+        parsed = urlparse(url)
+        self.channel = channel
+        self.connection = RedisConnection(parsed.hostname or "localhost", parsed.port or 6379, parsed.password)
+        self.subscriber_task: Optional[asyncio.Task] = None
+        self.subscribed = asyncio.Event()
+
+    async def start(self):
+        self.subscriber_task = asyncio.create_task(self._subscribe_loop())
+        # Don't accept traffic before we can hear other workers
+        try:
+            await asyncio.wait_for(self.subscribed.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("Backplane not subscribed yet; continuing and retrying in the background")
+
+    async def stop(self):
+        if self.subscriber_task is not None:
+            self.subscriber_task.cancel()
+            try:
+                await self.subscriber_task
+            except asyncio.CancelledError:
+                pass
+            self.subscriber_task = None
+        self.connection.close()
+
+    async def publish(self, message: dict):
+        payload = json.dumps(message)
+        for attempt in range(2):
+            try:
+                await self.connection.execute("PUBLISH", self.channel, payload)
+                return
+            except (ConnectionError, OSError) as e:
+                self.connection.close()
+                if attempt:
+                    logger.warning("Backplane publish failed, message dropped: %s", e)
+
+    async def next_sequence(self, group: str) -> int:
+        try:
+            return await self.connection.execute("INCR", f"{self.channel}:seq:{group}")
+        except (ConnectionError, OSError):
+            # Retry once on a fresh connection
+            self.connection.close()
+            return await self.connection.execute("INCR", f"{self.channel}:seq:{group}")
+
+    async def _subscribe_loop(self):
+        delay = 0.5
+        while True:
+            writer = None
+            try:
+                reader, writer = await self.connection.open()
+                writer.write(encode_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                await read_reply(reader)  # Subscription confirmation
+                delay = 0.5
+                self.subscribed.set()
+                # Re-announce after every (re)subscribe so peers resend their state
+                await self._ready()
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        await self._dispatch(json.loads(reply[2]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Backplane subscriber error: %s; reconnecting in %.1fs", e, delay)
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10)
+
+
+def create_backplane() -> Backplane:
+    """Build the backplane selected by WS_BACKPLANE ("memory" or "redis")"""
+    if settings.WS_BACKPLANE == "redis":
+        return RedisBackplane(settings.WS_BACKPLANE_URL, settings.WS_BACKPLANE_CHANNEL)
+    return InProcessBackplane()
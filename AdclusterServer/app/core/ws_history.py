@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SPILL_BATCH_SIZE = 64  # Evicted messages written to disk in one go
+SPILL_STALE_SECONDS = 24 * 3600  # Spill directories of earlier runs untouched this long are deleted at startup
+MAX_TRACKED_SEQUENCES = 100_000  # Groups whose last sequence number is remembered after their ring is evicted
+
+
+class GroupHistory:
+    """Bounded per-group message history used to replay gaps after a reconnect.
+
+    Each group keeps its last ``size`` messages in memory, keyed by the sequence
+    number the backplane assigned. Messages pushed out of the ring can be
+    appended to a per-group JSON-lines file so a client that was away longer
+    can still catch up from disk.
+
+    Spill files live in a directory of their own per process run: sequence
+    numbers of the in-process backplane restart at 1, so files from an earlier
+    run must never be replayed, and several workers may share WS_HISTORY_SPILL_DIR.
+    All file access goes through one thread, so appends never interleave and a
+    read sees every write queued before it.
+    """
+
+    def __init__(self, size: int, max_groups: int, spill_dir: str = "", spill_max_bytes: int = 0):
+        self.size = size
+        self.max_groups = max_groups
+        self.spill_max_bytes = spill_max_bytes
+        self.rings: "OrderedDict[str, Deque[Tuple[int, str]]]" = OrderedDict()  # Least recently used group first
+        self.last_sequences: "OrderedDict[str, int]" = OrderedDict()  # Outlives the rings, so resume works after eviction
+        self.spill_buffers: Dict[str, List[Tuple[int, str]]] = {}
+        self.spill_dir = ""
+        self.spill_executor: Optional[ThreadPoolExecutor] = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            _remove_stale_runs(spill_dir)
+            self.spill_dir = os.path.join(spill_dir, f"run-{uuid.uuid4().hex}")
+            os.makedirs(self.spill_dir)
+            self.spill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ws-history")
+
+    def append(self, group: str, seq: int, message: str):
+        ring = self.rings.get(group)
+        if ring is None:
+            ring = self.rings[group] = deque()
+            if len(self.rings) > self.max_groups:
+                # Forget the group that has been quiet the longest
+                old_group, old_ring = self.rings.popitem(last=False)
+                self._spill(old_group, list(old_ring))
+        else:
+            self.rings.move_to_end(group)
+
+        if ring and seq < ring[-1][0]:
+            # Publishes from different workers can arrive slightly out of order
+            entries = sorted([*ring, (seq, message)])
+            ring.clear()
+            ring.extend(entries)
+        else:
+            ring.append((seq, message))
+        evicted = []
+        while len(ring) > self.size:
+            evicted.append(ring.popleft())
+        if evicted:
+            self._spill(group, evicted)
+
+        if seq > self.last_sequences.get(group, 0):
+            self.last_sequences[group] = seq
+        self.last_sequences.move_to_end(group)
+        if len(self.last_sequences) > MAX_TRACKED_SEQUENCES:
+            self.last_sequences.popitem(last=False)
+
+    def last_sequence(self, group: str) -> int:
+        return self.last_sequences.get(group, 0)
+
+    async def since(self, group: str, after: int, limit: int) -> Tuple[List[dict], bool]:
+        """Return messages with seq > after (oldest first) and whether some were lost"""
+        ring = self.rings.get(group, ())
+        messages = [(seq, message) for seq, message in ring if seq > after]
+        oldest_in_memory = ring[0][0] if ring else None
+        if self.spill_dir and (oldest_in_memory is None or oldest_in_memory > after + 1):
+            spilled = await asyncio.get_running_loop().run_in_executor(self.spill_executor, self._read_spill, group, after)
+            spilled.extend(seq_message for seq_message in self.spill_buffers.get(group, ()) if seq_message[0] > after)
+            known = {seq for seq, _ in messages}
+            messages = sorted([seq_message for seq_message in spilled if seq_message[0] not in known] + messages)
+
+        truncated = bool(messages) and messages[0][0] > after + 1
+        if len(messages) > limit:
+            # Hand back the newest part of the gap; the client re-fetches the rest over HTTP
+            messages = messages[-limit:]
+            truncated = True
+        return [{"seq": seq, "message": message} for seq, message in messages], truncated
+
+    def _spill_path(self, group: str) -> str:
+        # Hashed: any readable escaping of names like 개발팀 or a/b would let groups share a file
+        return os.path.join(self.spill_dir, hashlib.sha256(group.encode()).hexdigest() + ".jsonl")
+
+    def _spill(self, group: str, entries: List[Tuple[int, str]]):
+        if not self.spill_dir or not entries:
+            return
+        buffer = self.spill_buffers.setdefault(group, [])
+        buffer.extend(entries)
+        if len(buffer) >= SPILL_BATCH_SIZE or group not in self.rings:
+            self.spill_buffers.pop(group, None)
+            asyncio.get_running_loop().run_in_executor(self.spill_executor, self._write_spill, group, buffer)
+
+    def _write_spill(self, group: str, entries: List[Tuple[int, str]]):
+        path = self._spill_path(group)
+        try:
+            if self.spill_max_bytes and os.path.exists(path) and os.path.getsize(path) > self.spill_max_bytes:
+                # Keep one rotated file so disk usage per group stays bounded
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as spill_file:
+                for seq, message in entries:
+                    spill_file.write(json.dumps({"seq": seq, "message": message}) + "\n")
+        except OSError as e:
+            logger.warning("Failed to spill history for group %s: %s", group, e)
+
+    def _read_spill(self, group: str, after: int) -> List[Tuple[int, str]]:
+        path = self._spill_path(group)
+        entries = []
+        for file_path in (path + ".1", path):
+            try:
+                with open(file_path, encoding="utf-8") as spill_file:
+                    for line in spill_file:
+                        entry = json.loads(line)
+                        if entry["seq"] > after:
+                            entries.append((entry["seq"], entry["message"]))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+
+def _remove_stale_runs(spill_dir: str):
+    """Delete spill directories of earlier runs that nobody has written to for SPILL_STALE_SECONDS"""
+    deadline = time.time() - SPILL_STALE_SECONDS
+    for name in os.listdir(spill_dir):
+        path = os.path.join(spill_dir, name)
+        try:
+            if name.endswith(".jsonl") or name.endswith(".jsonl.1"):
+                # Files of the old layout, written before spills were kept per run
+                os.remove(path)
+            elif name.startswith("run-") and os.path.isdir(path):
+                newest = max([os.path.getmtime(path)] + [os.path.getmtime(os.path.join(path, entry)) for entry in os.listdir(path)])
+                if newest < deadline:
+                    shutil.rmtree(path, ignore_errors=True)
+        except OSError as e:
+            logger.warning("Failed to clean up history spill %s: %s", path, e)
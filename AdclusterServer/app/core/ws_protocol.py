@@ -0,0 +1,142 @@
+"""Wire format for the /ws/{client_id} command protocol.
+
+Clients can talk to the server in three ways:
+
+- legacy text commands such as ``/send_to bob hello`` (what the frontend sends today)
+- JSON text frames holding one envelope ``{"op": "send_to", "target": "bob", "message": "hello"}``
+  or a list of envelopes to pipeline several commands in one frame
+- binary MessagePack frames with the same envelopes, when ``msgpack`` is installed
+
+JSON envelopes are only parsed on connections that negotiated ``?format=json``
+(or ``msgpack``); on legacy connections every text frame is a slash command or
+chat, even chat that happens to look like JSON. Every form is parsed into the
+same ``Command`` objects so the endpoints share one dispatch table, and replies
+go back in the format the command arrived in.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:  # MessagePack frames are optional
+    msgpack = None
+
+WIRE_TEXT = "text"
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+
+MAX_BATCH_SIZE = 100  # Commands accepted in a single frame
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+@dataclass
+class Command:
+    op: str
+    args: dict = field(default_factory=dict)
+    id: Optional[Any] = None  # Echoed back in the reply so clients can match pipelined commands
+
+
+@dataclass
+class Reply:
+    ok: bool
+    text: Optional[str]  # Human readable reply, sent as-is to legacy text clients
+    data: Optional[Any] = None
+
+
+# Legacy text commands: prefix -> (op, name of the argument holding the rest of the line)
+TEXT_COMMANDS = {
+    "/join ": ("join", "group"),
+    "/leave ": ("leave", "group"),
+    "/group_members ": ("group_members", "group"),
+    "/group ": ("group", "message"),
+    "/subscribe ": ("subscribe", "topic"),
+    "/unsubscribe ": ("unsubscribe", "topic"),
+}
+BARE_TEXT_COMMANDS = {
+    "/leave_all": "leave_all",
+    "/my_groups": "my_groups",
+    "/clients": "clients",
+    "/groups": "groups",
+    "/ping": "ping",
+    "/subscriptions": "subscriptions",
+}
+
+
+def parse_text_command(data: str) -> Command:
+    """Translate one legacy slash command (or plain chat text) into a Command"""
+    if data in BARE_TEXT_COMMANDS:
+        return Command(BARE_TEXT_COMMANDS[data])
+    if data.startswith("/send_to "):
+        parts = data.split(" ", 2)
+        if len(parts) < 3:
+            return Command("send_to")
+        return Command("send_to", {"target": parts[1], "message": parts[2]})
+    for prefix, (op, arg_name) in TEXT_COMMANDS.items():
+        if data.startswith(prefix):
+            value = data[len(prefix):]
+            return Command(op, {arg_name: value} if value else {})
+    return Command("message", {"message": data})
+
+
+def _to_command(envelope: Any) -> Command:
+    if not isinstance(envelope, dict) or not isinstance(envelope.get("op"), str):
+        raise ProtocolError("Each command must be an object with an 'op' field")
+    args = {key: value for key, value in envelope.items() if key not in ("op", "id")}
+    return Command(envelope["op"], args, envelope.get("id"))
+
+
+def _to_commands(payload: Any) -> List[Command]:
+    if isinstance(payload, list):
+        if not payload:
+            raise ProtocolError("Empty command batch")
+        if len(payload) > MAX_BATCH_SIZE:
+            raise ProtocolError(f"Too many commands in one frame (max {MAX_BATCH_SIZE})")
+        return [_to_command(envelope) for envelope in payload]
+    return [_to_command(payload)]
+
+
+def decode_frame(message: dict, negotiated_format: str) -> Tuple[List[Command], str, bool]:
+    """Parse a received ASGI websocket message into commands, the wire format used
+    and whether the client sent a batch (and so expects a list of replies)
+
+    `negotiated_format` is the ``?format=`` the connection was opened with.
+    """
+    data = message.get("bytes")
+    if data is not None:
+        if msgpack is None:
+            raise ProtocolError("MessagePack frames are not supported by this server")
+        try:
+            payload = msgpack.unpackb(data, raw=False)
+        except Exception as e:
+            raise ProtocolError(f"Invalid MessagePack frame: {e}")
+        return _to_commands(payload), WIRE_MSGPACK, isinstance(payload, list)
+
+    text = message.get("text") or ""
+    # Structured clients may still send slash commands; those get text replies
+    if negotiated_format != WIRE_TEXT and text[:1] in ("{", "["):
+        try:
+            payload = json.loads(text)
+        except ValueError as e:
+            raise ProtocolError(f"Invalid JSON frame: {e}")
+        return _to_commands(payload), WIRE_JSON, isinstance(payload, list)
+    return [parse_text_command(text)], WIRE_TEXT, False
+
+
+def reply_payload(command: Command, reply: Reply) -> dict:
+    payload = {"type": "reply", "op": command.op, "ok": reply.ok, "message": reply.text}
+    if command.id is not None:
+        payload["id"] = command.id
+    if reply.data is not None:
+        payload["data"] = reply.data
+    return payload
+
+
+def encode(payload: Any, wire_format: str) -> Union[str, bytes]:
+    """Encode a structured payload for a JSON or MessagePack client"""
+    if wire_format == WIRE_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload)
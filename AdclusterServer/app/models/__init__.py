@@ -28,4 +28,6 @@ from .my_lib import MyLib
 from .my_lib_items import MyLibItem
 from .note_lib import NoteLib
 from .my_todolist import MyTodolist
-from .gen_settings import GenSetting
\ No newline at end of file
+from .gen_settings import GenSetting
+from .project_stats import ProjectStats
+from .list_version import ListVersion
\ No newline at end of file
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, Text
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from app.core.database import Base
+from datetime import datetime
+
+class ListVersion(Base):
+    """Change counter per cached list (e.g. 'projects'), bumped by statement triggers on the tables it reads"""
+    __tablename__ = "list_versions"
+
+    name = Column('name', Text, primary_key=True)
+    version = Column('version', BigInteger, nullable=False, default=0)
+    updated_at = Column('updated_at', TIMESTAMP(timezone=True), default=datetime.utcnow)
@@ -13,5 +13,5 @@ class MyLibItem(Base):
     title = Column("title", String(255), nullable=False)
     url = Column("url", Text)
     content = Column("content", Text)
-    created_at = Column("created_at", DateTime, default=datetime.utcnow)
+    created_at = Column("created_at", DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -21,7 +21,7 @@ class Project(Base):
     status = Column('status', String(50))
     start_date = Column('start_date', Date)
     end_date = Column('end_date', Date)
-    created_at = Column('created_at', TIMESTAMP(timezone=True), default=datetime.utcnow)
+    created_at = Column('created_at', TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow)
     update_at = Column('update_at', TIMESTAMP(timezone=True), default=datetime.utcnow)
     
     # Relationships
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
+from app.core.database import Base
+from datetime import datetime
+
+class ProjectStats(Base):
+    """Note and member counts per project, maintained by triggers on pronote and prjuser"""
+    __tablename__ = "project_stats"
+
+    prjid = Column('prjid', UUID(as_uuid=True), ForeignKey('projects.prjid', ondelete='CASCADE'), primary_key=True)
+    notes = Column('notes', Integer, nullable=False, default=0)
+    users = Column('users', Integer, nullable=False, default=0)
+    updated_at = Column('updated_at', TIMESTAMP(timezone=True), default=datetime.utcnow)
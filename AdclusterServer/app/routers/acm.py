@@ -7,6 +7,7 @@ import time
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User as UserModel
+from app.core.metrics import upstream_hooks
 from app.schemas.acm import (
     ACMSearchResult, ACMSearchResponse, ACMQuery, ACMError,
     ACMAuthor, ACMDate, ACMJournal
@@ -204,7 +205,7 @@ async def search_acm(
             )
         
         # CrossRef API 호출
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("acm")) as client:
             response = await client.get(base_url, params=params)
             response.raise_for_status()
             
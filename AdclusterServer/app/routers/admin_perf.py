@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_admin_user
+from app.core.sql_stats import sql_stats
+
+router = APIRouter(
+    prefix="/api/admin/perf",
+    tags=["admin performance"],
+    dependencies=[Depends(get_current_admin_user)],
+)
+
+@router.get("/sql")
+async def get_sql_report(limit: int = 50):
+    """라우트별 SQL 실행 횟수, DB 시간, 느린 쿼리 및 N+1 의심 쿼리를 조회합니다."""
+    return sql_stats.report(limit)
+
+@router.delete("/sql")
+async def reset_sql_report():
+    """SQL 통계를 초기화합니다."""
+    sql_stats.reset()
+    return {"message": "SQL statistics reset"}
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User as UserModel
+from app.core.metrics import upstream_hooks
 
 router = APIRouter(
     prefix="/api/arxiv",
@@ -69,7 +70,7 @@ async def search_arxiv(
             "max_results": max_results
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("arxiv")) as client:
             response = await client.get(arxiv_url, params=params)
             
         if response.status_code != 200:
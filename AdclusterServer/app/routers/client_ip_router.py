@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from app.core.database import get_db
 from app.models.client_ip import ClientIP
+from app.core.pagination import clamp_limit, decode_cursor, set_next_cursor
 from pydantic import BaseModel
 import json
 import os
@@ -71,12 +72,19 @@ async def record_client_ip(request: Request):
             db.close()
 
 @router.get("/list", response_model=List[dict])
-async def get_client_ips():
-    """데이터베이스에 저장된 모든 클라이언트 IP 목록 조회"""
+async def get_client_ips(response: Response, limit: int = 100, cursor: Optional[str] = None):
+    """데이터베이스에 저장된 클라이언트 IP 목록 조회 (최근 접속 순, 다음 페이지는 X-Next-Cursor 헤더 값을 cursor로 전달)"""
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor, 2) if cursor else None
     db = None
     try:
         db = next(get_db())
-        ips = db.query(ClientIP).order_by(ClientIP.last_seen.desc()).all()
+        query = db.query(ClientIP).order_by(ClientIP.last_seen.desc(), ClientIP.id.desc())
+        if after:
+            # last_seen은 접속 시 갱신되므로 페이지를 넘기는 동안 다시 접속한 IP는 순서가 바뀔 수 있음
+            query = query.filter(tuple_(ClientIP.last_seen, ClientIP.id) < tuple_(*after))
+        ips = query.limit(limit).all()
+        set_next_cursor(response, ips, limit, lambda ip: (ip.last_seen, ip.id))
         return [ip.to_dict() for ip in ips]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
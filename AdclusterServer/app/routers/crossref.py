@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional, Dict, Any
 import httpx
+from app.core.metrics import upstream_hooks
 import asyncio
 from datetime import datetime
 import logging
@@ -152,7 +153,7 @@ async def search_crossref_api(
     logger.info(f"Crossref API 요청: {CROSSREF_BASE_URL}, 파라미터: {params}")
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("crossref")) as client:
             response = await client.get(CROSSREF_BASE_URL, params=params)
             response.raise_for_status()
             
@@ -242,7 +243,7 @@ async def search_crossref(
 async def health_check():
     """Crossref API 서비스 상태 확인"""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, event_hooks=upstream_hooks("crossref")) as client:
             response = await client.get(f"{CROSSREF_BASE_URL}?rows=1")
             response.raise_for_status()
             return {"status": "healthy", "crossref_api": "accessible"}
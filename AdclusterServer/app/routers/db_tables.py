@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import inspect, text
 from typing import List, Dict, Any, Optional
@@ -6,6 +6,8 @@ from pydantic import BaseModel
 import json
 
 from ..core.database import engine, get_db
+from ..core.db_routing import get_read_engine
+from ..core.pagination import clamp_limit, decode_cursor, set_next_cursor
 from ..core.dependencies import get_current_active_user, get_current_admin_user
 from ..models.user import User
 
@@ -36,14 +38,14 @@ class TableRecord(BaseModel):
 
 
 @router.get("/tables", response_model=List[str])
-async def get_tables(current_user: User = Depends(get_current_admin_user)):
+async def get_tables(current_user: User = Depends(get_current_admin_user), engine=Depends(get_read_engine)):
     """모든 데이터베이스 테이블 목록을 조회합니다."""
     inspector = inspect(engine)
     return inspector.get_table_names()
 
 
 @router.get("/tables/{table_name}", response_model=TableSchema)
-async def get_table_schema(table_name: str, current_user: User = Depends(get_current_admin_user)):
+async def get_table_schema(table_name: str, current_user: User = Depends(get_current_admin_user), engine=Depends(get_read_engine)):
     """특정 테이블의 구조(스키마)를 조회합니다."""
     inspector = inspect(engine)
     
@@ -70,11 +72,19 @@ async def get_table_schema(table_name: str, current_user: User = Depends(get_cur
 @router.get("/tables/{table_name}/data", response_model=TableData)
 async def get_table_data(
     table_name: str, 
+    response: Response,
     limit: int = 100, 
     offset: int = 0,
-    current_user: User = Depends(get_current_admin_user)
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_admin_user),
+    engine=Depends(get_read_engine)
 ):
-    """특정 테이블의 데이터를 조회합니다."""
+    """특정 테이블의 데이터를 조회합니다.
+
+    기본 키가 있는 테이블은 기본 키 순으로 정렬되며, 응답의 X-Next-Cursor 헤더 값을
+    cursor로 전달하면 다음 페이지를 조회합니다 (cursor가 없을 때만 offset 사용).
+    """
+    limit = clamp_limit(limit)
     inspector = inspect(engine)
     
     # 테이블이 존재하는지 확인
@@ -87,11 +97,34 @@ async def get_table_data(
     # 테이블 컬럼 정보 가져오기
     columns = [column["name"] for column in inspector.get_columns(table_name)]
     
+    # 키셋 페이지네이션에 사용할 기본 키 컬럼
+    primary_key = inspector.get_pk_constraint(table_name).get("constrained_columns") or []
+    quote = engine.dialect.identifier_preparer.quote
+    params = {"limit": limit, "offset": offset}
+    where = order_by = ""
+    if primary_key:
+        key_columns = ", ".join(quote(column) for column in primary_key)
+        order_by = f"ORDER BY {key_columns}"
+        if cursor:
+            values = decode_cursor(cursor, len(primary_key))
+            placeholders = ", ".join(f":cursor_{i}" for i in range(len(values)))
+            params.update({f"cursor_{i}": value for i, value in enumerate(values)})
+            params["offset"] = 0
+            where = f"WHERE ({key_columns}) > ({placeholders})"
+    elif cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Table '{table_name}' has no primary key; use offset"
+        )
+    
     # 데이터 쿼리 실행
     with engine.connect() as connection:
-        query = text(f"SELECT * FROM {table_name} LIMIT :limit OFFSET :offset")
-        result = connection.execute(query, {"limit": limit, "offset": offset})
+        query = text(f"SELECT * FROM {quote(table_name)} {where} {order_by} LIMIT :limit OFFSET :offset")
+        result = connection.execute(query, params)
         rows = result.fetchall()
+        if primary_key:
+            key_indexes = [columns.index(column) for column in primary_key]
+            set_next_cursor(response, rows, limit, lambda row: [row[i] for i in key_indexes])
         
         # 결과를 딕셔너리 리스트로 변환
         data = []
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.db_routing import get_read_db
 from app.core.dependencies import get_current_user
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
 from app.models.user import User as UserModel
 from app.models.project import Project as ProjectModel
 from app.models.folder import Folder as FolderModel
 from app.schemas.folder import FolderCreate, FolderUpdate, FolderResponse, FolderTreeResponse
+from datetime import datetime
 import uuid
 
 router = APIRouter(
@@ -19,13 +22,13 @@ router = APIRouter(
 @router.post("/", response_model=FolderResponse, status_code=status.HTTP_201_CREATED)
 async def create_folder(
     folder: FolderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Create a new folder"""
     try:
         # Check if project exists and user has access
-        project = db.query(ProjectModel).filter(ProjectModel.prjid == folder.project_id).first()
+        project = (await db.execute(select(ProjectModel).where(ProjectModel.prjid == folder.project_id))).scalars().first()
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -34,13 +37,13 @@ async def create_folder(
         
         # Check if parent folder exists (if specified)
         if folder.parent_id:
-            parent_folder = db.query(FolderModel).filter(
+            parent_folder = (await db.execute(select(FolderModel).where(
                 and_(
                     FolderModel.id == folder.parent_id,
                     FolderModel.project_id == folder.project_id,
                     FolderModel.is_active == True
                 )
-            ).first()
+            ))).scalars().first()
             if not parent_folder:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -57,12 +60,12 @@ async def create_folder(
         )
         
         db.add(db_folder)
-        db.commit()
-        db.refresh(db_folder)
+        await db.commit()
+        await db.refresh(db_folder)
         
         return db_folder
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"폴더 생성 중 오류 발생: {str(e)}"
@@ -71,23 +74,39 @@ async def create_folder(
 @router.get("/project/{project_id}", response_model=List[FolderTreeResponse])
 async def get_project_folders(
     project_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    """Get all folders for a project in tree structure"""
+    """Get all folders for a project in tree structure
+
+    Answers If-None-Match with 304 while the project's folders are unchanged.
+    """
     try:
         # Check if project exists and user has access
-        project = db.query(ProjectModel).filter(ProjectModel.prjid == project_id).first()
+        project = (await db.execute(select(ProjectModel).where(ProjectModel.prjid == project_id))).scalars().first()
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="프로젝트를 찾을 수 없습니다."
             )
         
-        # Get all folders for the project
-        folders = db.query(FolderModel).filter(
-            FolderModel.projectid == project_id
-        ).order_by(FolderModel.foldername).all()
+        # Count and newest change of the active folders decide the ETag
+        version = (await db.execute(select(func.count(), func.max(FolderModel.folderupdated)).where(
+            FolderModel.projectid == project_id,
+            FolderModel.is_active == True
+        ))).one()
+        etag = make_etag("folders", str(project_id), *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        # Get all folders for the project (soft-deleted folders are left out)
+        folders = (await db.execute(select(FolderModel).where(
+            FolderModel.projectid == project_id,
+            FolderModel.is_active == True
+        ).order_by(FolderModel.foldername))).scalars().all()
         
         # Convert to response format
         folder_responses = []
@@ -117,18 +136,18 @@ async def get_project_folders(
 async def update_folder(
     folder_id: uuid.UUID,
     folder_update: FolderUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Update a folder"""
     try:
         # Get folder
-        db_folder = db.query(FolderModel).filter(
+        db_folder = (await db.execute(select(FolderModel).where(
             and_(
                 FolderModel.id == folder_id,
                 FolderModel.is_active == True
             )
-        ).first()
+        ))).scalars().first()
         
         if not db_folder:
             raise HTTPException(
@@ -138,13 +157,13 @@ async def update_folder(
         
         # Check if parent folder exists (if specified)
         if folder_update.parent_id:
-            parent_folder = db.query(FolderModel).filter(
+            parent_folder = (await db.execute(select(FolderModel).where(
                 and_(
                     FolderModel.id == folder_update.parent_id,
                     FolderModel.project_id == db_folder.project_id,
                     FolderModel.is_active == True
                 )
-            ).first()
+            ))).scalars().first()
             if not parent_folder:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -162,13 +181,14 @@ async def update_folder(
         update_data = folder_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_folder, field, value)
+        db_folder.folderupdated = datetime.utcnow()
         
-        db.commit()
-        db.refresh(db_folder)
+        await db.commit()
+        await db.refresh(db_folder)
         
         return db_folder
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"폴더 수정 중 오류 발생: {str(e)}"
@@ -177,18 +197,18 @@ async def update_folder(
 @router.delete("/{folder_id}")
 async def delete_folder(
     folder_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Delete a folder (soft delete)"""
     try:
         # Get folder
-        db_folder = db.query(FolderModel).filter(
+        db_folder = (await db.execute(select(FolderModel).where(
             and_(
                 FolderModel.id == folder_id,
                 FolderModel.is_active == True
             )
-        ).first()
+        ))).scalars().first()
         
         if not db_folder:
             raise HTTPException(
@@ -197,12 +217,12 @@ async def delete_folder(
             )
         
         # Check if folder has children
-        children = db.query(FolderModel).filter(
+        children = (await db.execute(select(FolderModel).where(
             and_(
                 FolderModel.parent_id == folder_id,
                 FolderModel.is_active == True
             )
-        ).first()
+        ))).scalars().first()
         
         if children:
             raise HTTPException(
@@ -212,11 +232,12 @@ async def delete_folder(
         
         # Soft delete
         db_folder.is_active = False
-        db.commit()
+        db_folder.folderupdated = datetime.utcnow()
+        await db.commit()
         
         return {"message": "폴더가 성공적으로 삭제되었습니다."}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"폴더 삭제 중 오류 발생: {str(e)}"
@@ -225,17 +246,17 @@ async def delete_folder(
 @router.get("/{folder_id}", response_model=FolderResponse)
 async def get_folder(
     folder_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get a specific folder"""
     try:
-        folder = db.query(FolderModel).filter(
+        folder = (await db.execute(select(FolderModel).where(
             and_(
                 FolderModel.id == folder_id,
                 FolderModel.is_active == True
             )
-        ).first()
+        ))).scalars().first()
         
         if not folder:
             raise HTTPException(
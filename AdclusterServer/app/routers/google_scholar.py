@@ -6,6 +6,7 @@ import os
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User as UserModel
+from app.core.metrics import upstream_hooks
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -84,7 +85,7 @@ async def search_google_scholar(
         }
         
         # Make request to SERP API
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=upstream_hooks("google_scholar")) as client:
             response = await client.get(serp_api_url, params=params)
             
         if response.status_code != 200:
@@ -167,7 +168,7 @@ async def search_google_scholar_citations(
         }
         
         # Make request to SERP API
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=upstream_hooks("google_scholar")) as client:
             response = await client.get(serp_api_url, params=params)
             
         if response.status_code != 200:
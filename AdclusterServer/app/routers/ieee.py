@@ -7,6 +7,7 @@ import os
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User as UserModel
+from app.core.metrics import upstream_hooks
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -135,7 +136,7 @@ async def search_ieee(
         params["apikey"] = ieee_api_key
         
         # Make API request
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("ieee")) as client:
             response = await client.get(ieee_url, params=params)
             
         if response.status_code != 200:
@@ -6,6 +6,7 @@ from typing import Optional
 from urllib.parse import quote
 
 from app.schemas.kci import KciSearchResponse, KciArticleInfo, KciErrorResponse
+from app.core.metrics import upstream_hooks
 
 router = APIRouter(prefix="/api/kci", tags=["KCI"])
 
@@ -207,7 +208,7 @@ async def search_kci_articles(
         # API 요청 URL 구성
         url = f"{KCI_BASE_URL}?apiCode=articleSearch&key={KCI_API_KEY}&title={encoded_title}&page={page}&displayCount={page_size}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("kci")) as client:
             response = await client.get(url)
             response.raise_for_status()
             
@@ -239,7 +240,7 @@ async def health_check():
         # 간단한 테스트 검색
         url = f"{KCI_BASE_URL}?apiCode=articleSearch&key={KCI_API_KEY}&title=test&page=1&displayCount=1"
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, event_hooks=upstream_hooks("kci")) as client:
             response = await client.get(url)
             
             if response.status_code == 200:
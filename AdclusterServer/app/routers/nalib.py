@@ -6,6 +6,7 @@ import os
 from datetime import datetime
 import urllib.parse
 
+from app.core.metrics import upstream_hooks
 from app.schemas.nalib import (
     NalibSearchResponse, 
     NalibSearchItem, 
@@ -167,7 +168,7 @@ async def search_nalib(
         print(f"API 요청 - 페이지 {page}, 크기 {page_size}: {params}")
         
         # API 호출
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("nalib")) as client:
             response = await client.get(NALIB_BASE_URL, params=params)
             response.raise_for_status()
             
@@ -265,7 +266,7 @@ async def health_check():
             "search": "전체,테스트"
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, event_hooks=upstream_hooks("nalib")) as client:
             response = await client.get(NALIB_BASE_URL, params=params)
             
             if response.status_code == 200:
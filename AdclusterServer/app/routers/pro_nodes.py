@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
 from typing import List, Optional
 import uuid
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
 from app.models.pro_nodes import ProNode
 from app.models.user import User as UserModel
 from app.core.dependencies import get_current_user
@@ -37,17 +38,31 @@ class ProNodeResponse(ProNodeBase):
     class Config:
         from_attributes = True
 
+async def project_nodes_etag(db: AsyncSession, project_id: str) -> str:
+    """ETag of a project's nodes: their count and newest updated_at (nodes are hard-deleted)"""
+    version = (await db.execute(select(func.count(), func.max(ProNode.updated_at)).where(
+        ProNode.prjid == project_id
+    ))).one()
+    return make_etag("pro-nodes", project_id, *version)
+
 @router.get("/project/{project_id}", response_model=List[ProNodeResponse])
 async def get_project_nodes(
     project_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get all nodes for a specific project"""
     try:
-        nodes = db.query(ProNode).filter(
+        etag = await project_nodes_etag(db, project_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        nodes = (await db.execute(select(ProNode).where(
             ProNode.prjid == project_id
-        ).order_by(ProNode.created_at).all()
+        ).order_by(ProNode.created_at))).scalars().all()
         
         return nodes
     except Exception as e:
@@ -59,12 +74,12 @@ async def get_project_nodes(
 @router.get("/{node_id}", response_model=ProNodeResponse)
 async def get_node(
     node_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get a specific node by ID"""
     try:
-        node = db.query(ProNode).filter(ProNode.nodeid == node_id).first()
+        node = (await db.execute(select(ProNode).where(ProNode.nodeid == node_id))).scalars().first()
         if not node:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -82,7 +97,7 @@ async def get_node(
 @router.post("/", response_model=ProNodeResponse, status_code=status.HTTP_201_CREATED)
 async def create_node(
     node: ProNodeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Create a new node"""
@@ -97,12 +112,12 @@ async def create_node(
         )
         
         db.add(db_node)
-        db.commit()
-        db.refresh(db_node)
+        await db.commit()
+        await db.refresh(db_node)
         
         return db_node
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"노드 생성 중 오류 발생: {str(e)}"
@@ -112,13 +127,13 @@ async def create_node(
 async def update_node(
     node_id: str,
     node_update: ProNodeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Update a node"""
     try:
         # Find the node
-        node = db.query(ProNode).filter(ProNode.nodeid == node_id).first()
+        node = (await db.execute(select(ProNode).where(ProNode.nodeid == node_id))).scalars().first()
         if not node:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -135,14 +150,14 @@ async def update_node(
         
         node.updated_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(node)
+        await db.commit()
+        await db.refresh(node)
         
         return node
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"노드 업데이트 중 오류 발생: {str(e)}"
@@ -151,13 +166,13 @@ async def update_node(
 @router.delete("/{node_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_node(
     node_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Delete a node"""
     try:
         # Find the node
-        node = db.query(ProNode).filter(ProNode.nodeid == node_id).first()
+        node = (await db.execute(select(ProNode).where(ProNode.nodeid == node_id))).scalars().first()
         if not node:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -165,18 +180,18 @@ async def delete_node(
             )
         
         # Delete child nodes first (cascade delete)
-        child_nodes = db.query(ProNode).filter(ProNode.prjid_parents == node_id).all()
+        child_nodes = (await db.execute(select(ProNode).where(ProNode.prjid_parents == node_id))).scalars().all()
         for child in child_nodes:
-            db.delete(child)
+            await db.delete(child)
         
         # Delete the node
-        db.delete(node)
-        db.commit()
+        await db.delete(node)
+        await db.commit()
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"노드 삭제 중 오류 발생: {str(e)}"
@@ -185,14 +200,21 @@ async def delete_node(
 @router.get("/project/{project_id}/tree", response_model=List[ProNodeResponse])
 async def get_project_tree(
     project_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get project nodes in tree structure"""
     try:
-        nodes = db.query(ProNode).filter(
+        etag = await project_nodes_etag(db, project_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        nodes = (await db.execute(select(ProNode).where(
             ProNode.prjid == project_id
-        ).order_by(ProNode.created_at).all()
+        ).order_by(ProNode.created_at))).scalars().all()
         
         return nodes
     except Exception as e:
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import List
-from app.core.database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from typing import List, Optional
+from app.core.database import get_async_db
+from app.core.db_routing import get_read_db
 from app.core.dependencies import get_current_user
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.pagination import clamp_limit, decode_cursor, set_next_cursor
 from app.models.user import User as UserModel
 from app.models.project import Project as ProjectModel
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
@@ -21,7 +24,7 @@ router = APIRouter(
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Create a new project"""
@@ -37,12 +40,12 @@ async def create_project(
         db_project.end_date = project.end_date
         
         db.add(db_project)
-        db.commit()
-        db.refresh(db_project)
+        await db.commit()
+        await db.refresh(db_project)
         
         return db_project
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"프로젝트 생성 중 오류 발생: {str(e)}"
@@ -52,16 +55,16 @@ async def create_project(
 async def update_project(
     project_id: str,
     project_update: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Update an existing project"""
     try:
         # Find the project
-        db_project = db.query(ProjectModel).filter(
+        db_project = (await db.execute(select(ProjectModel).where(
             ProjectModel.prjid == uuid.UUID(project_id),
             ProjectModel.crtid == current_user.uid
-        ).first()
+        ))).scalars().first()
         
         if not db_project:
             raise HTTPException(
@@ -87,8 +90,8 @@ async def update_project(
         # Update the update_at timestamp
         db_project.update_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(db_project)
+        await db.commit()
+        await db.refresh(db_project)
         
         return db_project
     except ValueError:
@@ -97,7 +100,7 @@ async def update_project(
             detail="잘못된 프로젝트 ID 형식입니다"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"프로젝트 업데이트 중 오류 발생: {str(e)}"
@@ -105,16 +108,46 @@ async def update_project(
 
 @router.get("/", response_model=List[ProjectExtendedResponse])
 async def get_projects(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
     # 임시로 인증 제거 - 테스트용
     # current_user: UserModel = Depends(get_current_user)
 ):
-    """Get all projects with detailed information including notes and users count"""
+    """Get all projects with detailed information including notes and users count
+
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one;
+    `skip` is only used without a cursor. Answers If-None-Match with 304 while
+    the trigger-maintained 'projects' list version is unchanged (see
+    app/core/etag.py).
+    """
+    limit = clamp_limit(limit)
+    params = {"limit": limit, "skip": skip}
+    after_cursor = ""
+    if cursor:
+        # Keyset: continue after the last (created_at, prjid) of the previous page
+        params["cursor_created_at"], params["cursor_prjid"] = decode_cursor(cursor, 2)
+        params["skip"] = 0
+        after_cursor = "AND (p.created_at, p.prjid) < (:cursor_created_at, :cursor_prjid)"
     try:
-        # 새로운 복잡한 JOIN 쿼리 실행
-        query = """
+        # 목록이 바뀌었는지 먼저 확인 - 같으면 행을 읽지 않고 304 반환
+        # (end_date 조건 때문에 날짜가 바뀌어도 목록이 달라질 수 있음)
+        # 버전은 트리거가 올리는 카운터 한 행 (migrations/20251103_add_list_versions.sql)
+        version = (await db.execute(text("""
+        SELECT
+            (SELECT version FROM list_versions WHERE name = 'projects') AS version,
+            CURRENT_DATE AS today
+        """))).one()
+        etag = make_etag("projects", *version, request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        # 노트 수와 참여자 수는 트리거가 유지하는 project_stats에서 읽음 (migrations/20251101_add_project_stats.sql)
+        query = f"""
         SELECT 
             p.prjid, 
             p.crtid, 
@@ -122,27 +155,26 @@ async def get_projects(
             p.title, 
             p.description, 
             p.start_date, 
+            p.created_at, 
             COALESCE(p.status, 'begin') AS status, 
-            COUNT(DISTINCT n.noteid) AS notes, 
-            COUNT(DISTINCT pu.uid) AS users 
+            COALESCE(s.notes, 0) AS notes, 
+            COALESCE(s.users, 0) AS users 
         FROM projects p 
         JOIN users u 
            ON p.crtid = u.uid 
-        LEFT JOIN pronote n 
-            ON n.prjid = p.prjid 
-        LEFT JOIN prjuser pu 
-            ON pu.prjid = p.prjid 
+        LEFT JOIN project_stats s 
+            ON s.prjid = p.prjid 
         WHERE p.visibility IN ('company', 'team', 'private') 
           AND (p.end_date IS NULL OR p.end_date > CURRENT_DATE) 
-        GROUP BY p.prjid, p.crtid, u.uname, p.title, p.description, p.start_date, COALESCE(p.status, 'begin')
-        ORDER BY p.created_at DESC
+          {after_cursor}
+        ORDER BY p.created_at DESC, p.prjid DESC
         LIMIT :limit OFFSET :skip
         """
         
-        result = db.execute(text(query), {"limit": limit, "skip": skip})
+        rows = (await db.execute(text(query), params)).all()
         projects = []
         
-        for row in result:
+        for row in rows:
             projects.append({
                 "prjid": str(row.prjid),
                 "crtid": str(row.crtid),
@@ -155,6 +187,7 @@ async def get_projects(
                 "users": row.users
             })
         
+        set_next_cursor(response, rows, limit, lambda row: (row.created_at, row.prjid))
         return projects
     except Exception as e:
         raise HTTPException(
@@ -165,15 +198,15 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get a specific project by ID"""
     try:
-        project = db.query(ProjectModel).filter(
+        project = (await db.execute(select(ProjectModel).where(
             ProjectModel.prjid == uuid.UUID(project_id),
             ProjectModel.crtid == current_user.uid
-        ).first()
+        ))).scalars().first()
         
         if not project:
             raise HTTPException(
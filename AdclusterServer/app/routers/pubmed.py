@@ -7,6 +7,7 @@ import os
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User as UserModel
+from app.core.metrics import upstream_hooks
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -72,7 +73,7 @@ async def search_pubmed(
         if pubmed_api_key:
             esearch_params["api_key"] = pubmed_api_key
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=upstream_hooks("pubmed")) as client:
             esearch_response = await client.get(esearch_url, params=esearch_params)
             
         if esearch_response.status_code != 200:
@@ -106,7 +107,7 @@ async def search_pubmed(
         if pubmed_api_key:
             efetch_params["api_key"] = pubmed_api_key
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=upstream_hooks("pubmed")) as client:
             efetch_response = await client.get(efetch_url, params=efetch_params)
             
         if efetch_response.status_code != 200:
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, HTTPException, Depends, Response, status, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text, tuple_
 from typing import List, Optional
 import uuid
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.db_routing import get_read_db
 from app.core.dependencies import get_current_user
+from app.core.pagination import clamp_limit, decode_cursor, set_next_cursor
 from app.models.user import User as UserModel
 from app.models.my_lib import MyLib as MyLibModel
 from app.models.my_lib_items import MyLibItem as MyLibItemModel
@@ -19,26 +21,40 @@ router = APIRouter(
 
 @router.get("/", response_model=List[ResourceResponse])
 async def get_resources(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    """Get all resources for the current user"""
+    """Get all resources for the current user, oldest first
+
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one;
+    `skip` is only used without a cursor.
+    """
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor, 2) if cursor else None
     try:
         # First, check if the library exists for this user
-        library = db.query(MyLibModel).filter(
+        library = (await db.execute(select(MyLibModel).where(
             MyLibModel.author == current_user.uname
-        ).first()
+        ))).scalars().first()
         
         # If no library exists, return empty list
         if not library:
             return []
         
-        resources = db.query(MyLibItemModel).filter(
+        query = select(MyLibItemModel).where(
             MyLibItemModel.mlid == library.mlid
-        ).offset(skip).limit(limit).all()
+        ).order_by(MyLibItemModel.created_at, MyLibItemModel.item_id)
+        if after:
+            query = query.where(tuple_(MyLibItemModel.created_at, MyLibItemModel.item_id) > tuple_(*after))
+        else:
+            query = query.offset(skip)
+        resources = (await db.execute(query.limit(limit))).scalars().all()
         
+        set_next_cursor(response, resources, limit, lambda item: (item.created_at, item.item_id))
         return resources
     except Exception as e:
         raise HTTPException(
@@ -49,15 +65,15 @@ async def get_resources(
 @router.post("/", response_model=ResourceResponse, status_code=status.HTTP_201_CREATED)
 async def create_resource(
     resource: ResourceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Create a new resource"""
     try:
         # First, check if the library exists for this user
-        library = db.query(MyLibModel).filter(
+        library = (await db.execute(select(MyLibModel).where(
             MyLibModel.author == current_user.uname
-        ).first()
+        ))).scalars().first()
         
         # If no library exists, create one
         if not library:
@@ -68,8 +84,8 @@ async def create_resource(
                 author=current_user.uname
             )
             db.add(library)
-            db.commit()
-            db.refresh(library)
+            await db.commit()
+            await db.refresh(library)
         
         # Create the resource item
         db_resource = MyLibItemModel(
@@ -82,12 +98,12 @@ async def create_resource(
         )
         
         db.add(db_resource)
-        db.commit()
-        db.refresh(db_resource)
+        await db.commit()
+        await db.refresh(db_resource)
         
         return db_resource
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"자료 생성 중 오류 발생: {str(e)}"
@@ -96,15 +112,15 @@ async def create_resource(
 @router.get("/{resource_id}", response_model=ResourceResponse)
 async def get_resource(
     resource_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Get a specific resource by ID"""
     try:
         # First, check if the library exists for this user
-        library = db.query(MyLibModel).filter(
+        library = (await db.execute(select(MyLibModel).where(
             MyLibModel.author == current_user.uname
-        ).first()
+        ))).scalars().first()
         
         if not library:
             raise HTTPException(
@@ -112,10 +128,10 @@ async def get_resource(
                 detail="자료를 찾을 수 없습니다"
             )
         
-        resource = db.query(MyLibItemModel).filter(
+        resource = (await db.execute(select(MyLibItemModel).where(
             MyLibItemModel.item_id == uuid.UUID(resource_id),
             MyLibItemModel.mlid == library.mlid
-        ).first()
+        ))).scalars().first()
         
         if not resource:
             raise HTTPException(
@@ -139,15 +155,15 @@ async def get_resource(
 async def update_resource(
     resource_id: str,
     resource_update: ResourceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Update a specific resource"""
     try:
         # First, check if the library exists for this user
-        library = db.query(MyLibModel).filter(
+        library = (await db.execute(select(MyLibModel).where(
             MyLibModel.author == current_user.uname
-        ).first()
+        ))).scalars().first()
         
         if not library:
             raise HTTPException(
@@ -156,10 +172,10 @@ async def update_resource(
             )
         
         # Find the resource
-        db_resource = db.query(MyLibItemModel).filter(
+        db_resource = (await db.execute(select(MyLibItemModel).where(
             MyLibItemModel.item_id == uuid.UUID(resource_id),
             MyLibItemModel.mlid == library.mlid
-        ).first()
+        ))).scalars().first()
         
         if not db_resource:
             raise HTTPException(
@@ -177,8 +193,8 @@ async def update_resource(
         if resource_update.content is not None:
             db_resource.content = resource_update.content
             
-        db.commit()
-        db.refresh(db_resource)
+        await db.commit()
+        await db.refresh(db_resource)
         
         return db_resource
     except ValueError:
@@ -187,7 +203,7 @@ async def update_resource(
             detail="잘못된 자료 ID 형식입니다"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"자료 수정 중 오류 발생: {str(e)}"
@@ -196,15 +212,15 @@ async def update_resource(
 @router.delete("/{resource_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_resource(
     resource_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Delete a specific resource"""
     try:
         # First, check if the library exists for this user
-        library = db.query(MyLibModel).filter(
+        library = (await db.execute(select(MyLibModel).where(
             MyLibModel.author == current_user.uname
-        ).first()
+        ))).scalars().first()
         
         if not library:
             raise HTTPException(
@@ -213,10 +229,10 @@ async def delete_resource(
             )
         
         # Find the resource
-        db_resource = db.query(MyLibItemModel).filter(
+        db_resource = (await db.execute(select(MyLibItemModel).where(
             MyLibItemModel.item_id == uuid.UUID(resource_id),
             MyLibItemModel.mlid == library.mlid
-        ).first()
+        ))).scalars().first()
         
         if not db_resource:
             raise HTTPException(
@@ -225,8 +241,8 @@ async def delete_resource(
             )
         
         # Delete the resource
-        db.delete(db_resource)
-        db.commit()
+        await db.delete(db_resource)
+        await db.commit()
         
         return None
     except ValueError:
@@ -235,7 +251,7 @@ async def delete_resource(
             detail="잘못된 자료 ID 형식입니다"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"자료 삭제 중 오류 발생: {str(e)}"
@@ -245,15 +261,15 @@ async def delete_resource(
 async def upload_resource_file(
     resource_id: str,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Upload a file for a specific resource"""
     try:
         # First, check if the library exists for this user
-        library = db.query(MyLibModel).filter(
+        library = (await db.execute(select(MyLibModel).where(
             MyLibModel.author == current_user.uname
-        ).first()
+        ))).scalars().first()
         
         if not library:
             raise HTTPException(
@@ -262,10 +278,10 @@ async def upload_resource_file(
             )
         
         # Find the resource
-        db_resource = db.query(MyLibItemModel).filter(
+        db_resource = (await db.execute(select(MyLibItemModel).where(
             MyLibItemModel.item_id == uuid.UUID(resource_id),
             MyLibItemModel.mlid == library.mlid
-        ).first()
+        ))).scalars().first()
         
         if not db_resource:
             raise HTTPException(
@@ -305,8 +321,8 @@ async def upload_resource_file(
         content_dict["fileType"] = file.content_type
         
         db_resource.content = json.dumps(content_dict)
-        db.commit()
-        db.refresh(db_resource)
+        await db.commit()
+        await db.refresh(db_resource)
         
         return {"message": "파일이 성공적으로 업로드되었습니다", "resource": db_resource}
     except ValueError:
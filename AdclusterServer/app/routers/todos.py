@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import uuid
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import get_current_user
 from app.models.simple_todo import SimpleTodo
 from app.models.user import User as UserModel
@@ -30,12 +31,12 @@ class TodoResponse(BaseModel):
         orm_mode = True
 
 @router.get("/", response_model=List[TodoResponse])
-async def get_todos(db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    todos = db.query(SimpleTodo).filter(SimpleTodo.user_id == str(current_user.uid)).order_by(SimpleTodo.created_at.desc()).all()
+async def get_todos(db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user)):
+    todos = (await db.execute(select(SimpleTodo).where(SimpleTodo.user_id == str(current_user.uid)).order_by(SimpleTodo.created_at.desc()))).scalars().all()
     return todos
 
 @router.post("/", response_model=TodoResponse)
-async def create_todo(todo: TodoCreate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+async def create_todo(todo: TodoCreate, db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user)):
     if not todo.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
@@ -44,13 +45,13 @@ async def create_todo(todo: TodoCreate, db: Session = Depends(get_db), current_u
         user_id=str(current_user.uid)
     )
     db.add(db_todo)
-    db.commit()
-    db.refresh(db_todo)
+    await db.commit()
+    await db.refresh(db_todo)
     return db_todo
 
 @router.put("/{todo_id}", response_model=TodoResponse)
-async def update_todo(todo_id: uuid.UUID, todo: TodoUpdate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_todo = db.query(SimpleTodo).filter(SimpleTodo.id == todo_id, SimpleTodo.user_id == str(current_user.uid)).first()
+async def update_todo(todo_id: uuid.UUID, todo: TodoUpdate, db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user)):
+    db_todo = (await db.execute(select(SimpleTodo).where(SimpleTodo.id == todo_id, SimpleTodo.user_id == str(current_user.uid)))).scalars().first()
     if not db_todo:
         raise HTTPException(status_code=404, detail="Todo not found")
     
@@ -59,22 +60,22 @@ async def update_todo(todo_id: uuid.UUID, todo: TodoUpdate, db: Session = Depend
     if todo.completed is not None:
         db_todo.completed = todo.completed
     
-    db.commit()
-    db.refresh(db_todo)
+    await db.commit()
+    await db.refresh(db_todo)
     return db_todo
 
 @router.delete("/{todo_id}")
-async def delete_todo(todo_id: uuid.UUID, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db_todo = db.query(SimpleTodo).filter(SimpleTodo.id == todo_id, SimpleTodo.user_id == str(current_user.uid)).first()
+async def delete_todo(todo_id: uuid.UUID, db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user)):
+    db_todo = (await db.execute(select(SimpleTodo).where(SimpleTodo.id == todo_id, SimpleTodo.user_id == str(current_user.uid)))).scalars().first()
     if not db_todo:
         raise HTTPException(status_code=404, detail="Todo not found")
     
-    db.delete(db_todo)
-    db.commit()
+    await db.delete(db_todo)
+    await db.commit()
     return {"message": "Todo deleted successfully"}
 
 @router.delete("/completed")
-async def delete_completed_todos(db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
-    db.query(SimpleTodo).filter(SimpleTodo.completed == True, SimpleTodo.user_id == str(current_user.uid)).delete()
-    db.commit()
+async def delete_completed_todos(db: AsyncSession = Depends(get_async_db), current_user: UserModel = Depends(get_current_user)):
+    await db.execute(delete(SimpleTodo).where(SimpleTodo.completed == True, SimpleTodo.user_id == str(current_user.uid)))
+    await db.commit()
     return {"message": "All completed todos deleted"}
\ No newline at end of file
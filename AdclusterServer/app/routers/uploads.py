@@ -1,5 +1,5 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from app.core.responses import JSONResponse
 import os
 import shutil
 from typing import List
@@ -1,6 +1,6 @@
 # app/routers/uploads_router.py
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from app.core.responses import JSONResponse
 from pathlib import Path
 from typing import Optional, List
 import os
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.schemas.user import User, UserCreate, UserUpdate
 from app.models.user import User as UserModel
 from app.core.database import get_db
 from app.core.security import get_password_hash
 from app.core.dependencies import get_current_user
+from app.core.auth_cache import user_cache
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, set_next_cursor
 
 router = APIRouter(
     prefix="/users",
@@ -18,14 +21,22 @@ async def read_users_me(current_user: UserModel = Depends(get_current_user)):
     return current_user
 
 @router.get("/", response_model=List[User])
-async def read_users(skip: int = 0, limit: int = 100, full_permission: int = 0, db: Session = Depends(get_db)):
+async def read_users(response: Response, skip: int = 0, limit: Optional[int] = None, cursor: Optional[str] = None, full_permission: int = 0, db: Session = Depends(get_db)):
     # 임시로 인증 제거 - 테스트용
     # current_user: UserModel = Depends(get_current_user)
-    # 전체 권한 설정 시 모든 사용자를 가져옴
-    if full_permission == 1:
-        users = db.query(UserModel).all()
+    # 전체 권한 설정 시 limit이 없으면 한 페이지 최대 행 수(API_PAGE_SIZE_MAX)까지 가져옴
+    # 그보다 많으면 X-Next-Cursor로 이어서 조회
+    if limit is None:
+        limit = settings.API_PAGE_SIZE_MAX if full_permission == 1 else 100
+    # 키셋 페이지네이션: 이전 페이지의 마지막 uid 다음부터 조회 (cursor가 없을 때만 skip 사용)
+    limit = clamp_limit(limit)
+    query = db.query(UserModel).order_by(UserModel.uid)
+    if cursor:
+        query = query.filter(UserModel.uid > decode_cursor(cursor, 1)[0])
     else:
-        users = db.query(UserModel).offset(skip).limit(limit).all()
+        query = query.offset(skip)
+    users = query.limit(limit).all()
+    set_next_cursor(response, users, limit, lambda user: (user.uid,))
     return users
 
 @router.get("/{user_id}", response_model=User)
@@ -94,6 +105,7 @@ async def update_user_profile(user_update: UserUpdate, db: Session = Depends(get
     # Commit changes to the database
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate_user(db_user.uid)
     
     return db_user
 
@@ -125,6 +137,8 @@ async def block_user(user_id: str, db: Session = Depends(get_db), current_user:
     # Commit changes to the database
     db.commit()
     db.refresh(db_user)
+    # Cached logins of this user must not keep the old state
+    user_cache.invalidate_user(db_user.uid)
     
     return db_user
 
@@ -156,6 +170,7 @@ async def unblock_user(user_id: str, db: Session = Depends(get_db), current_user
     # Commit changes to the database
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate_user(db_user.uid)
     
     return db_user
 
@@ -187,6 +202,7 @@ async def delete_user(user_id: str, db: Session = Depends(get_db), current_user:
     # Commit changes to the database
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate_user(db_user.uid)
     
     return db_user
 
@@ -226,5 +242,6 @@ async def update_user_role(user_id: str, role: str, db: Session = Depends(get_db
     # Commit changes to the database
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate_user(db_user.uid)
     
     return db_user
\ No newline at end of file
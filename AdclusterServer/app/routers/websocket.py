@@ -1,14 +1,40 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Set, Union, Optional
 from fastapi.security import OAuth2PasswordBearer
+from app.core.config import settings
+from app.core.ws_backplane import create_backplane
+from app.core.ws_history import GroupHistory
+from app.core.collab import NOTE_GROUP_PREFIX, CollabError, CollabService, is_note_group, note_group, user_can_open_note
+from app.core.awareness import AwarenessChannel
+from app.core.topics import TopicError, TopicIndex, split_topic
+from app.core.db_events import RESERVED_NAMESPACES, DatabaseEventListener, check_subscription, is_reserved_topic
+from app.core.database import DATABASE_URL, USE_SQLITE, get_db
+from app.core.dependencies import get_current_admin_user, get_current_user
+from app.core.auth_cache import user_cache
+from app.core.runtime_stats import LoopLagMonitor, process_rss_bytes
+from app.core.db_console import ConsoleQuery, check_connection, console_pools, is_allowed_target, run_blocking
+from app.core.rate_limit import DISCONNECT, DROP, POLICY_DISCONNECT, THROTTLE, TOO_LARGE, InboundLimiter
+from app.core.ot import OperationError
+from app.core.ws_protocol import (
+    Command, ProtocolError, Reply, WIRE_JSON, WIRE_MSGPACK, WIRE_TEXT,
+    decode_frame, encode, msgpack, reply_payload
+)
+import asyncio
 import json
 import uuid
 import psycopg2
 import psycopg2.extras
 import random
+import time
 
 router = APIRouter()
 
+
+def _public_groups(groups) -> List[str]:
+    """Group names other clients may see; open notes (note:<id>) stay private to their editors"""
+    return [group for group in groups if not is_note_group(group)]
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
@@ -20,6 +46,73 @@ class ConnectionManager:
         self.string_to_numeric_id: Dict[str, int] = {}  # Map string IDs to numeric IDs
         self.numeric_to_string_id: Dict[int, str] = {}  # Map numeric IDs to string IDs
         self.user_info: Dict[str, dict] = {}  # Map connection IDs to user information
+        self.send_queues: Dict[str, asyncio.Queue] = {}  # Map connection IDs to bounded outbound queues
+        self.writer_tasks: Dict[str, asyncio.Task] = {}  # Map connection IDs to their writer tasks
+        self.dropped_messages: Dict[str, int] = {}  # Map connection IDs to dropped message counts
+        self.connection_stats: Dict[str, dict] = {}  # Map connection IDs to activity and send latency counters
+        self.total_dropped = 0  # Dropped messages, including connections that have since closed
+        self.reaped_connections = 0  # Connections closed for being idle or stuck in a send
+        self.total_rate_limited = 0  # Inbound frames over a connection's rate or size limits
+        self.reaper_task: Optional[asyncio.Task] = None
+        self.loop_lag = LoopLagMonitor()
+        self.pending_presence: List[dict] = []  # Presence deltas waiting for the next debounced flush
+        self.presence_flush_task: Optional[asyncio.Task] = None
+        self.remote_clients: Dict[str, dict] = {}  # Map connection IDs to client data for clients on other workers
+        self.remote_group_counts: Dict[str, int] = {}  # Map group names to member counts on other workers
+        self.worker_last_seen: Dict[str, float] = {}  # Map other worker IDs to the time we last heard from them
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        self.wire_formats: Dict[str, str] = {}  # Map connection IDs to the format pushed messages are encoded in
+        self.topics = TopicIndex()  # Topic subscriptions of local connections
+        self.db_events: Optional[DatabaseEventListener] = None
+        self.history = GroupHistory(
+            settings.WS_HISTORY_SIZE,
+            settings.WS_HISTORY_MAX_GROUPS,
+            settings.WS_HISTORY_SPILL_DIR,
+            settings.WS_HISTORY_SPILL_MAX_BYTES
+        )
+        self.backplane = create_backplane()
+        self.backplane.set_handler(self._on_backplane_message)
+        self.backplane.on_ready = self._announce
+        self.collab = CollabService(
+            lambda: self.backplane.worker_id,
+            self.backplane.publish,
+            self._deliver_to_local_group,
+            lambda group: len(self.group_memberships.get(group, ())),
+            lambda: set(self.worker_last_seen)
+        )
+        # Admin changes to a user reach the login caches of the other workers too
+        user_cache.on_invalidate = self._publish_user_invalidation
+        self.awareness = AwarenessChannel(
+            settings.WS_AWARENESS_INTERVAL_MS,
+            lambda: self.backplane.worker_id,
+            self.backplane.publish,
+            self._deliver_to_local_group
+        )
+
+    async def start(self):
+        """Connect to the backplane so messages reach clients on every worker"""
+        await self.backplane.start()
+        self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        self.reaper_task = asyncio.create_task(self._reaper_loop())
+        self.loop_lag.start()
+        if settings.DB_EVENTS_ENABLED and not USE_SQLITE:
+            # Each worker listens itself, so database events skip the backplane
+            self.db_events = DatabaseEventListener(DATABASE_URL, self.deliver_topic_local)
+            await self.db_events.start()
+
+    async def stop(self):
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+        if self.reaper_task is not None:
+            self.reaper_task.cancel()
+            self.reaper_task = None
+        self.loop_lag.stop()
+        if self.db_events is not None:
+            await self.db_events.stop()
+            self.db_events = None
+        await self.backplane.publish({"kind": "goodbye", "worker": self.backplane.worker_id})
+        await self.backplane.stop()
 
     async def connect(self, websocket: WebSocket, client_id: Optional[Union[int, str]] = None, group: Optional[str] = None, user_data: Optional[dict] = None):
         await websocket.accept()
@@ -31,6 +124,9 @@ class ConnectionManager:
         self.websocket_to_id[websocket_id] = connection_id
         self.id_to_websocket[connection_id] = websocket
         
+        # Start the outbound queue before anything is sent to this connection
+        self._start_writer(connection_id, websocket)
+        
         # Handle client ID mapping
         numeric_client_id = None
         if client_id is not None:
@@ -66,10 +162,13 @@ class ConnectionManager:
         if user_data:
             self.user_info[connection_id] = user_data
         
-        # Notify all clients about the new connection
-        await self.broadcast_connected_clients()
-        # Broadcast updated group information
-        await self.broadcast_group_info()
+        # Give the new client a full snapshot; everyone else gets a presence delta
+        await self.send_snapshot(connection_id)
+        self._queue_presence({
+            "event": "joined",
+            "connection_id": connection_id,
+            "client": self._client_data(connection_id)
+        })
 
     def _generate_unique_numeric_id(self) -> int:
         """Generate a unique numeric ID that doesn't conflict with existing IDs"""
@@ -79,6 +178,214 @@ class ConnectionManager:
             if numeric_id not in self.numeric_to_string_id:
                 return numeric_id
 
+    def _start_writer(self, connection_id: str, websocket: WebSocket):
+        """Create the bounded outbound queue and the writer task that drains it"""
+        queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.send_queues[connection_id] = queue
+        now = time.monotonic()
+        self.connection_stats[connection_id] = {
+            "connected_at": now,
+            "last_activity": now,  # Last frame received from the client
+            "ping_sent": None,  # When the unanswered application ping went out
+            "send_started": None,  # Set while a send is in progress, to spot stuck sockets
+            "messages_sent": 0,
+            "send_latency_total": 0.0,  # Seconds from enqueue to send completion
+            "send_latency_max": 0.0,
+            "rate_limited": 0  # Inbound frames over the rate or size limits
+        }
+        self.writer_tasks[connection_id] = asyncio.create_task(self._writer(websocket, queue, self.connection_stats[connection_id]))
+
+    def _stop_writer(self, connection_id: str):
+        """Cancel the writer task and discard anything still queued for the connection"""
+        self.send_queues.pop(connection_id, None)
+        self.dropped_messages.pop(connection_id, None)
+        self.connection_stats.pop(connection_id, None)
+        task = self.writer_tasks.pop(connection_id, None)
+        # A writer that hit a send error disconnects itself; don't cancel it mid-cleanup
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue, stats: dict):
+        """Send queued messages one at a time so a slow socket only delays itself"""
+        try:
+            while True:
+                enqueued_at, message = await queue.get()
+                stats["send_started"] = time.monotonic()
+                if isinstance(message, bytes):
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_text(message)
+                stats["send_started"] = None
+                latency = time.monotonic() - enqueued_at
+                stats["messages_sent"] += 1
+                stats["send_latency_total"] += latency
+                if latency > stats["send_latency_max"]:
+                    stats["send_latency_max"] = latency
+        except Exception as e:
+            print(f"WebSocket writer stopped: {e}")
+            # Remove dead connection
+            self.disconnect(websocket)
+
+    async def _close_quietly(self, websocket: WebSocket, code: int = 1000):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _enqueue(self, connection_id: str, message: Union[str, bytes]) -> bool:
+        """Queue an already-encoded message for one connection without waiting on the socket"""
+        queue = self.send_queues.get(connection_id)
+        if queue is None:
+            return False
+        try:
+            queue.put_nowait((time.monotonic(), message))
+            return True
+        except asyncio.QueueFull:
+            self.dropped_messages[connection_id] = self.dropped_messages.get(connection_id, 0) + 1
+            self.total_dropped += 1
+            if settings.WS_SLOW_CONSUMER_POLICY == "disconnect":
+                websocket = self.id_to_websocket.get(connection_id)
+                if websocket is not None:
+                    print(f"Disconnecting slow WebSocket consumer {connection_id}: send queue full")
+                    self.disconnect(websocket)
+                    # 1013 = try again later
+                    asyncio.create_task(self._close_quietly(websocket, 1013))
+            return False
+
+    def _fan_out(self, connection_ids, message: Union[str, bytes]):
+        """Queue one encoded message for many connections"""
+        for connection_id in list(connection_ids):  # Create a copy to avoid modification during iteration
+            self._enqueue(connection_id, message)
+
+    def create_limiter(self) -> InboundLimiter:
+        return InboundLimiter(
+            settings.WS_INBOUND_MESSAGES_PER_SECOND,
+            settings.WS_INBOUND_MESSAGE_BURST,
+            settings.WS_INBOUND_BYTES_PER_SECOND,
+            settings.WS_INBOUND_BYTE_BURST,
+            settings.WS_MAX_FRAME_BYTES,
+            settings.WS_INBOUND_LIMIT_POLICY
+        )
+
+    async def receive_within_limits(self, websocket: WebSocket, limiter: InboundLimiter) -> Optional[dict]:
+        """Receive one frame and apply the connection's inbound limits; returns None for a dropped frame"""
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        connection_id = self.websocket_to_id.get(id(websocket))
+        self.record_activity(connection_id)
+
+        text = message.get("text")
+        size = len(text.encode("utf-8")) if text is not None else len(message.get("bytes") or b"")
+        decision, wait = limiter.check(size)
+        if decision == THROTTLE:
+            # Not reading from the socket meanwhile pushes back on the client through TCP
+            await asyncio.sleep(wait)
+            return message
+        if decision not in (DROP, DISCONNECT, TOO_LARGE):
+            return message
+
+        stats = self.connection_stats.get(connection_id)
+        if stats is not None:
+            stats["rate_limited"] += 1
+        self.total_rate_limited += 1
+        if decision == DISCONNECT or (decision == TOO_LARGE and limiter.policy == POLICY_DISCONNECT):
+            print(f"Disconnecting WebSocket {connection_id}: inbound {'frame too large' if decision == TOO_LARGE else 'rate limit exceeded'}")
+            self.disconnect(websocket)
+            # 1009 = message too big, 1008 = policy violation
+            code = 1009 if decision == TOO_LARGE else 1008
+            await self._close_quietly(websocket, code)
+            raise WebSocketDisconnect(code)
+        if limiter.notice_due():
+            if decision == TOO_LARGE:
+                notice = f"Message dropped: frames are limited to {limiter.max_frame_bytes} bytes"
+            else:
+                notice = "Message dropped: rate limit exceeded"
+            wire_format = self.wire_formats.get(connection_id, WIRE_TEXT)
+            if wire_format != WIRE_TEXT:
+                notice = encode(reply_payload(Command("error"), Reply(False, notice)), wire_format)
+            await self.send_personal_message(notice, websocket)
+        return None
+
+    def record_activity(self, connection_id: Optional[str]):
+        """Note that a frame arrived from the client, for idle detection"""
+        stats = self.connection_stats.get(connection_id)
+        if stats is not None:
+            stats["last_activity"] = time.monotonic()
+
+    def _send_ping(self, connection_id: str, stats: dict, now: float):
+        """Queue an application-level ping; any frame the client sends back counts as the pong"""
+        payload = {"type": "ping"}
+        wire_format = self.wire_formats.get(connection_id, WIRE_TEXT)
+        self._enqueue(connection_id, encode(payload, wire_format) if wire_format == WIRE_MSGPACK else json.dumps(payload))
+        stats["ping_sent"] = now
+
+    async def _reaper_loop(self):
+        """Ping quiet connections and close the dead ones.
+
+        A connection that has sent nothing for WS_PING_INTERVAL_SECONDS gets a
+        {"type": "ping"} message; if no frame (a pong or anything else) arrives
+        within WS_PING_TIMEOUT_SECONDS it is closed. This works under any server
+        launch, unlike uvicorn's transport pings, and also catches half-open
+        sockets nothing is being sent to. Sends that stop making progress and
+        connections idle for longer than WS_IDLE_TIMEOUT_SECONDS are closed too.
+        """
+        while True:
+            await asyncio.sleep(settings.WS_REAP_INTERVAL_SECONDS)
+            now = time.monotonic()
+            for connection_id, stats in list(self.connection_stats.items()):
+                reason = None
+                ping_sent = stats["ping_sent"]
+                answered = ping_sent is None or stats["last_activity"] >= ping_sent
+                if stats["send_started"] is not None and now - stats["send_started"] > settings.WS_SEND_TIMEOUT_SECONDS:
+                    reason = "send timed out"
+                elif not answered and now - ping_sent > settings.WS_PING_TIMEOUT_SECONDS:
+                    reason = "missed pong"
+                elif settings.WS_IDLE_TIMEOUT_SECONDS > 0 and now - stats["last_activity"] > settings.WS_IDLE_TIMEOUT_SECONDS:
+                    reason = "idle timeout"
+                elif answered and settings.WS_PING_INTERVAL_SECONDS > 0 and now - stats["last_activity"] >= settings.WS_PING_INTERVAL_SECONDS:
+                    self._send_ping(connection_id, stats, now)
+                websocket = self.id_to_websocket.get(connection_id)
+                if reason is None or websocket is None:
+                    continue
+                print(f"Reaping WebSocket connection {connection_id}: {reason}")
+                self.reaped_connections += 1
+                self.disconnect(websocket)
+                # 1001 = going away
+                asyncio.create_task(self._close_quietly(websocket, 1001))
+
+    def get_metrics(self, include_connections: bool = True):
+        """Per-connection queue depth, send latency and drop counts for this worker"""
+        now = time.monotonic()
+        connections = []
+        for connection_id, stats in (self.connection_stats.items() if include_connections else ()):
+            queue = self.send_queues.get(connection_id)
+            sent = stats["messages_sent"]
+            info = self.client_info.get(connection_id, {})
+            connections.append({
+                "connection_id": connection_id,
+                "client_id": info.get("original_client_id"),
+                "queue_depth": queue.qsize() if queue is not None else 0,
+                "queue_capacity": settings.WS_SEND_QUEUE_SIZE,
+                "messages_sent": sent,
+                "dropped": self.dropped_messages.get(connection_id, 0),
+                "avg_send_latency_ms": round(stats["send_latency_total"] / sent * 1000, 3) if sent else 0.0,
+                "max_send_latency_ms": round(stats["send_latency_max"] * 1000, 3),
+                "rate_limited": stats["rate_limited"],
+                "idle_seconds": round(now - stats["last_activity"], 1),
+                "connected_seconds": round(now - stats["connected_at"], 1)
+            })
+        return {
+            "worker_id": self.backplane.worker_id,
+            "connection_count": len(self.connection_stats),
+            "total_dropped": self.total_dropped,
+            "reaped_connections": self.reaped_connections,
+            "total_rate_limited": self.total_rate_limited,
+            "process_rss_bytes": process_rss_bytes(),
+            "event_loop_lag": self.loop_lag.snapshot(),
+            "connections": connections
+        }
+
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
@@ -90,6 +397,11 @@ class ConnectionManager:
             if websocket_id in self.websocket_to_id:
                 connection_id = self.websocket_to_id[websocket_id]
                 
+                # Stop sending to this connection
+                self._stop_writer(connection_id)
+                self.wire_formats.pop(connection_id, None)
+                self.topics.unsubscribe_all(connection_id)
+                
                 # Clean up ID mappings if they exist
                 if connection_id in self.client_info:
                     client_data = self.client_info[connection_id]
@@ -102,9 +414,17 @@ class ConnectionManager:
                     if numeric_id and numeric_id in self.numeric_to_string_id:
                         del self.numeric_to_string_id[numeric_id]
                 
+                # Tell the remaining clients this connection is gone
+                self._queue_presence({
+                    "event": "left",
+                    "connection_id": connection_id,
+                    "groups": _public_groups(self.client_groups.get(connection_id, set()))
+                })
+                
                 # Remove group membership if exists
                 if connection_id in self.client_groups:
                     groups = self.client_groups[connection_id].copy()  # Create a copy to avoid modification during iteration
+                    self.awareness.forget(connection_id, groups)
                     for group in groups:
                         if group in self.group_memberships and connection_id in self.group_memberships[group]:
                             self.group_memberships[group].remove(connection_id)
@@ -121,56 +441,218 @@ class ConnectionManager:
                 # Remove client information
                 if connection_id in self.client_info:
                     del self.client_info[connection_id]
+                
+                # Remove user information
+                if connection_id in self.user_info:
+                    del self.user_info[connection_id]
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
+    async def send_personal_message(self, message: Union[str, bytes], websocket: WebSocket):
+        connection_id = self.websocket_to_id.get(id(websocket))
+        if connection_id in self.send_queues:
+            self._enqueue(connection_id, message)
+            return
         try:
-            await websocket.send_text(message)
-        except:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+        except Exception:
             # Remove dead connection
             self.disconnect(websocket)
 
-    async def send_message_to_client_id(self, message: str, target_client_id: Union[int, str]):
-        """Send a message to a specific client by client ID (either numeric or string)"""
+    def _find_local_connection(self, target_client_id: Union[int, str]) -> Optional[str]:
+        """Return the connection ID on this worker for a numeric or string client ID"""
         # Resolve the target client ID to a numeric ID if it's a string
         if isinstance(target_client_id, str):
             if target_client_id not in self.string_to_numeric_id:
-                return False  # String ID not found
+                return None  # String ID not found
             target_client_id = self.string_to_numeric_id[target_client_id]
         
         # Find the connection with this numeric ID
         for connection_id, info in self.client_info.items():
             if info["client_id"] == target_client_id:
-                if connection_id in self.id_to_websocket:
-                    websocket = self.id_to_websocket[connection_id]
-                    try:
-                        await websocket.send_text(message)
-                        return True  # Message sent successfully
-                    except:
-                        # Remove dead connection
-                        self.disconnect(websocket)
-                        return False  # Failed to send message
+                return connection_id
+        return None
+
+    def _is_remote_client(self, target_client_id: Union[int, str]) -> bool:
+        """Check whether another worker has announced a client with this ID"""
+        for client in self.remote_clients.values():
+            if target_client_id in (client.get("original_client_id"), client.get("client_id")):
+                return True
+        return False
+
+    async def send_message_to_client_id(self, message: str, target_client_id: Union[int, str]):
+        """Send a message to a specific client by client ID (either numeric or string)"""
+        connection_id = self._find_local_connection(target_client_id)
+        if connection_id is not None:
+            # False if the client's queue is gone or full
+            return self._enqueue(connection_id, message)
+        
+        # Route through the backplane when the client lives on another worker
+        if self._is_remote_client(target_client_id):
+            await self.backplane.publish({
+                "kind": "client",
+                "worker": self.backplane.worker_id,
+                "target": target_client_id,
+                "message": message
+            })
+            return True
         return False  # Client not found
 
+    def _publish_user_invalidation(self, uid: str):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Called outside the event loop; other workers fall back to the cache TTL
+        asyncio.create_task(self.backplane.publish({
+            "kind": "user_invalidate",
+            "worker": self.backplane.worker_id,
+            "uid": uid
+        }))
+
+    def _local_connection_index(self) -> Dict[int, str]:
+        """Map numeric client IDs to local connection IDs, for lookups of many clients at once"""
+        index: Dict[int, str] = {}
+        for connection_id, info in self.client_info.items():
+            if info["client_id"] is not None:
+                index.setdefault(info["client_id"], connection_id)
+        return index
+
+    def _local_connection_from_index(self, index: Dict[int, str], target_client_id: Union[int, str]) -> Optional[str]:
+        if isinstance(target_client_id, str):
+            target_client_id = self.string_to_numeric_id.get(target_client_id)
+        return index.get(target_client_id)
+
+    async def send_messages_to_client_ids(self, items: List[tuple]) -> List[str]:
+        """Send many (client ID, message) pairs; returns a status per pair, in order.
+
+        "sent" means queued for a local client, "forwarded" that the client lives on
+        another worker (all forwards share one backplane message), "queue_full" and
+        "not_found" that nothing was delivered.
+        """
+        index = self._local_connection_index()
+        remote_ids = set()
+        for client in self.remote_clients.values():
+            remote_ids.add(client.get("original_client_id"))
+            remote_ids.add(client.get("client_id"))
+
+        statuses = []
+        forwards = []
+        for target_client_id, message in items:
+            connection_id = self._local_connection_from_index(index, target_client_id)
+            if connection_id is not None:
+                statuses.append("sent" if self._enqueue(connection_id, message) else "queue_full")
+            elif target_client_id in remote_ids:
+                forwards.append({"target": target_client_id, "message": message})
+                statuses.append("forwarded")
+            else:
+                statuses.append("not_found")
+        if forwards:
+            await self.backplane.publish({
+                "kind": "client_batch",
+                "worker": self.backplane.worker_id,
+                "messages": forwards
+            })
+        return statuses
+
+    async def broadcast_to_group_batch(self, items: List[tuple]) -> List[int]:
+        """Broadcast many (group, message) pairs in one backplane message; returns their sequence numbers"""
+        # The Redis connection pipelines these, so a batch costs one round trip, not one per group
+        seqs = await asyncio.gather(*(self.backplane.next_sequence(group) for group, _ in items))
+        await self.backplane.publish({
+            "kind": "group_batch",
+            "worker": self.backplane.worker_id,
+            "messages": [
+                {"group": group, "seq": seq, "message": message}
+                for (group, message), seq in zip(items, seqs)
+            ]
+        })
+        return list(seqs)
+
     async def broadcast(self, message: str):
         """Broadcast message to all connected clients"""
-        for connection in self.active_connections[:]:  # Create a copy to avoid modification during iteration
-            try:
-                await connection.send_text(message)
-            except:
-                # Remove dead connections
-                self.disconnect(connection)
+        await self.backplane.publish({
+            "kind": "broadcast",
+            "worker": self.backplane.worker_id,
+            "message": message
+        })
 
     async def broadcast_to_group(self, message: str, group: str):
         """Broadcast message to all clients in a specific group"""
-        if group in self.group_memberships:
-            for connection_id in list(self.group_memberships[group]):  # Create a copy to avoid modification during iteration
-                if connection_id in self.id_to_websocket:
-                    websocket = self.id_to_websocket[connection_id]
-                    try:
-                        await websocket.send_text(message)
-                    except:
-                        # Remove dead connections
-                        self.disconnect(websocket)
+        # Sequence numbers let reconnecting clients ask for just the messages they missed
+        seq = await self.backplane.next_sequence(group)
+        await self.backplane.publish({
+            "kind": "group",
+            "worker": self.backplane.worker_id,
+            "group": group,
+            "seq": seq,
+            "message": message
+        })
+
+    def _deliver_group_message(self, group: str, seq: int, message: str):
+        """Record a group message and queue it for local members in their wire format"""
+        self.history.append(group, seq, message)
+        encoded: Dict[str, Union[str, bytes]] = {WIRE_TEXT: message}
+        for connection_id in list(self.group_memberships.get(group, ())):
+            wire_format = self.wire_formats.get(connection_id, WIRE_TEXT)
+            if wire_format not in encoded:
+                # Encode once per format, not once per connection
+                encoded[wire_format] = encode({"type": "group_message", "group": group, "seq": seq, "message": message}, wire_format)
+            self._enqueue(connection_id, encoded[wire_format])
+
+    def _deliver_to_local_group(self, group: str, payload: dict, exclude_connection_id: Optional[str] = None):
+        """Queue a structured payload for this worker's members of a group"""
+        self._deliver_structured(self.group_memberships.get(group, ()), payload, exclude_connection_id)
+
+    def _deliver_structured(self, connection_ids, payload: dict, exclude_connection_id: Optional[str] = None):
+        """Queue a structured payload for local connections, encoded once per format"""
+        encoded: Dict[str, Union[str, bytes]] = {}
+        for connection_id in list(connection_ids):
+            if connection_id == exclude_connection_id:
+                continue
+            wire_format = self.wire_formats.get(connection_id, WIRE_JSON)
+            if wire_format not in encoded:
+                encoded[wire_format] = encode(payload, wire_format)
+            self._enqueue(connection_id, encoded[wire_format])
+
+    async def publish_topic(self, topic: str, data):
+        """Send an event to every connection, on any worker, subscribed to a matching pattern"""
+        split_topic(topic)  # Raises TopicError for wildcards or empty segments
+        if is_reserved_topic(topic):
+            # Subscribers trust these as database change events; only the listener sends them
+            raise TopicError(f"Topics under {', '.join(f'{namespace}/' for namespace in RESERVED_NAMESPACES)} are reserved for database change events")
+        await self.backplane.publish({
+            "kind": "topic",
+            "worker": self.backplane.worker_id,
+            "topic": topic,
+            "data": data
+        })
+
+    def deliver_topic_local(self, topic: str, data):
+        """Queue a topic event for the matching subscribers on this worker"""
+        subscribers = self.topics.match(topic)
+        if subscribers:
+            self._deliver_structured(subscribers, {"type": "event", "topic": topic, "data": data})
+
+    async def resume_group(self, group: str, after: int) -> dict:
+        """Return the group messages a client missed after the given sequence number"""
+        last_seq = self.history.last_sequence(group)
+        reset = after > last_seq
+        if reset:
+            # The counter restarted since the client last saw this group; replay what we have
+            after = 0
+        messages, truncated = await self.history.since(group, after, settings.WS_RESUME_MAX_MESSAGES)
+        return {
+            "group": group,
+            "messages": messages,
+            "last_seq": last_seq,
+            "truncated": truncated or reset
+        }
+
+    def set_wire_format(self, websocket: WebSocket, wire_format: str):
+        connection_id = self.websocket_to_id.get(id(websocket))
+        if connection_id:
+            self.wire_formats[connection_id] = wire_format
 
     async def broadcast_to_groups(self, message: str, groups: Set[str]):
         """Broadcast message to all clients in multiple groups"""
@@ -179,47 +661,13 @@ class ConnectionManager:
 
     async def broadcast_connected_clients(self):
         """Broadcast the list of connected clients to all connected clients"""
-        clients_info = []
-        for connection_id, info in self.client_info.items():
-            # Create comprehensive client information with key-value pairs
-            client_data = {
-                "connection_id": connection_id,  # Unique connection identifier
-                "client_id": info["client_id"],  # Numeric client ID
-                "original_client_id": info["original_client_id"],  # Original client ID (could be string or numeric)
-                "groups": list(info.get("groups", set())),  # Groups the client belongs to
-                "connected_at": info["connected_at"]  # Connection timestamp
-            }
-            
-            # Add user information if available
-            if connection_id in self.user_info:
-                client_data["user"] = self.user_info[connection_id]
-                
-            # Add mapping information
-            if info["client_id"] and info["original_client_id"]:
-                if isinstance(info["original_client_id"], str):
-                    client_data["id_mapping"] = {
-                        "string_id": info["original_client_id"],
-                        "numeric_id": info["client_id"]
-                    }
-                else:
-                    client_data["id_mapping"] = {
-                        "numeric_id": info["original_client_id"]
-                    }
-            
-            clients_info.append(client_data)
-        
         message = {
             "type": "client_list",
-            "clients": clients_info
+            "clients": self.get_connected_clients()
         }
         
-        # Send to all connected clients
-        for connection in self.active_connections[:]:  # Create a copy to avoid modification during iteration
-            try:
-                await connection.send_text(json.dumps(message))
-            except:
-                # Remove dead connections
-                self.disconnect(connection)
+        # Encode once and send to all connected clients
+        self._fan_out(self.send_queues.keys(), json.dumps(message))
 
     async def broadcast_group_info(self):
         """Broadcast the list of groups and their member counts to all connected clients"""
@@ -230,49 +678,272 @@ class ConnectionManager:
             "groups": groups
         }
         
-        # Send to all connected clients
-        for connection in self.active_connections[:]:  # Create a copy to avoid modification during iteration
-            try:
-                await connection.send_text(json.dumps(message))
-            except:
-                # Remove dead connections
-                self.disconnect(connection)
+        # Encode once and send to all connected clients
+        self._fan_out(self.send_queues.keys(), json.dumps(message))
+
+    def _client_data(self, connection_id: str) -> dict:
+        """Return comprehensive key-value information for one connection"""
+        info = self.client_info[connection_id]
+        client_data = {
+            "connection_id": connection_id,  # Unique connection identifier
+            "client_id": info["client_id"],  # Numeric client ID
+            "original_client_id": info["original_client_id"],  # Original client ID (could be string or numeric)
+            "groups": _public_groups(info.get("groups", set())),  # Groups the client belongs to, without open notes
+            "connected_at": info["connected_at"]  # Connection timestamp
+        }
+        
+        # Add user information if available
+        if connection_id in self.user_info:
+            client_data["user"] = self.user_info[connection_id]
+            
+        # Add mapping information
+        if info["client_id"] and info["original_client_id"]:
+            if isinstance(info["original_client_id"], str):
+                client_data["id_mapping"] = {
+                    "string_id": info["original_client_id"],
+                    "numeric_id": info["client_id"]
+                }
+            else:
+                client_data["id_mapping"] = {
+                    "numeric_id": info["original_client_id"]
+                }
+        return client_data
 
     def get_connected_clients(self):
         """Return the list of currently connected clients with comprehensive key-value information"""
-        clients_info = []
-        for connection_id, info in self.client_info.items():
-            # Create comprehensive client information with key-value pairs
-            client_data = {
-                "connection_id": connection_id,  # Unique connection identifier
-                "client_id": info["client_id"],  # Numeric client ID
-                "original_client_id": info["original_client_id"],  # Original client ID (could be string or numeric)
-                "groups": list(info.get("groups", set())),  # Groups the client belongs to
-                "connected_at": info["connected_at"]  # Connection timestamp
-            }
-            
-            # Add user information if available
-            if connection_id in self.user_info:
-                client_data["user"] = self.user_info[connection_id]
-                
-            # Add mapping information
-            if info["client_id"] and info["original_client_id"]:
-                if isinstance(info["original_client_id"], str):
-                    client_data["id_mapping"] = {
-                        "string_id": info["original_client_id"],
-                        "numeric_id": info["client_id"]
-                    }
-                else:
-                    client_data["id_mapping"] = {
-                        "numeric_id": info["original_client_id"]
-                    }
-            
-            clients_info.append(client_data)
+        clients_info = [self._client_data(connection_id) for connection_id in self.client_info]
+        # Include clients connected to other workers
+        clients_info.extend(self.remote_clients.values())
         return clients_info
 
+    async def send_snapshot(self, connection_id: str):
+        """Send one connection the full client list and group information on demand"""
+        self._enqueue(connection_id, json.dumps({
+            "type": "client_list",
+            "clients": self.get_connected_clients()
+        }))
+        self._enqueue(connection_id, json.dumps({
+            "type": "group_info",
+            "groups": self.get_groups()
+        }))
+
+    def _queue_presence(self, event: dict):
+        """Record a presence delta and schedule a debounced flush"""
+        self.pending_presence.append(event)
+        if self.presence_flush_task is None or self.presence_flush_task.done():
+            self.presence_flush_task = asyncio.create_task(self._flush_presence())
+
+    def _coalesce_presence(self, events: List[dict]) -> List[dict]:
+        """Drop deltas that cancel each other out within one debounce window"""
+        result: List[Optional[dict]] = []
+        client_events: Dict[str, List[int]] = {}  # connection ID -> indexes of its events in result
+        joined: Set[str] = set()
+        group_joined: Dict[tuple, int] = {}
+        for event in events:
+            connection_id = event["connection_id"]
+            kind = event["event"]
+            if kind == "left" and connection_id in joined:
+                # Connected and disconnected inside the window: nobody needs to hear about it
+                for index in client_events.pop(connection_id, []):
+                    result[index] = None
+                joined.discard(connection_id)
+                continue
+            if kind == "group_left":
+                index = group_joined.pop((connection_id, event["group"]), None)
+                if index is not None:
+                    result[index] = None
+                    continue
+            if kind == "joined":
+                joined.add(connection_id)
+            elif kind == "group_joined":
+                group_joined[(connection_id, event["group"])] = len(result)
+            client_events.setdefault(connection_id, []).append(len(result))
+            result.append(event)
+        return [event for event in result if event is not None]
+
+    async def _flush_presence(self):
+        """Send all presence deltas collected during the debounce window as one message"""
+        await asyncio.sleep(settings.WS_PRESENCE_DEBOUNCE_MS / 1000)
+        # Events queued while this flush is sending go into the next window
+        self.presence_flush_task = None
+        events = self._coalesce_presence(self.pending_presence)
+        self.pending_presence = []
+        if not events:
+            return
+        
+        await self.backplane.publish({
+            "kind": "presence",
+            "worker": self.backplane.worker_id,
+            "events": events
+        })
+
+    async def _send_presence_local(self, events: List[dict]):
+        """Deliver presence deltas to the clients connected to this worker"""
+        # During connection storms a full snapshot is smaller than the deltas
+        if len(events) > settings.WS_PRESENCE_SNAPSHOT_THRESHOLD:
+            await self.broadcast_connected_clients()
+            await self.broadcast_group_info()
+            return
+        
+        changed_groups = set()
+        for event in events:
+            if "group" in event:
+                changed_groups.add(event["group"])
+            changed_groups.update(event.get("groups", []))
+            changed_groups.update(event.get("client", {}).get("groups", []))
+        
+        message = {
+            "type": "presence",
+            "events": events,
+            "groups": [
+                {"name": group_name, "member_count": self.group_member_count(group_name)}
+                for group_name in sorted(changed_groups)
+            ]
+        }
+        self._fan_out(self.send_queues.keys(), json.dumps(message))
+
+    async def _on_backplane_message(self, message: dict):
+        """Deliver a backplane message to the matching clients on this worker"""
+        if not isinstance(message, dict) or not isinstance(message.get("kind"), str) or not message.get("worker"):
+            # A stray or foreign PUBLISH on the shared channel; don't count its sender as a worker either
+            return
+        kind = message.get("kind")
+        worker = message.get("worker")
+        is_remote = worker != self.backplane.worker_id
+        if is_remote:
+            self.worker_last_seen[worker] = time.monotonic()
+        
+        if kind == "group":
+            self._deliver_group_message(message["group"], message["seq"], message["message"])
+        elif kind == "broadcast":
+            self._fan_out(self.send_queues.keys(), message["message"])
+        elif kind == "client":
+            connection_id = self._find_local_connection(message["target"])
+            if connection_id is not None:
+                self._enqueue(connection_id, message["message"])
+        elif kind == "client_batch":
+            index = self._local_connection_index()
+            for item in message["messages"]:
+                connection_id = self._local_connection_from_index(index, item["target"])
+                if connection_id is not None:
+                    self._enqueue(connection_id, item["message"])
+        elif kind == "group_batch":
+            for item in message["messages"]:
+                self._deliver_group_message(item["group"], item["seq"], item["message"])
+        elif kind == "user_invalidate":
+            if is_remote:
+                user_cache.invalidate_user(message["uid"], notify=False)
+        elif kind == "presence":
+            if is_remote:
+                self._apply_remote_presence(worker, message["events"])
+            await self._send_presence_local(message["events"])
+        elif kind == "topic":
+            self.deliver_topic_local(message["topic"], message["data"])
+        elif kind == "awareness":
+            self.awareness.handle_backplane_message(message)
+        elif kind.startswith("collab_"):
+            await self.collab.handle_backplane_message(message)
+        elif kind == "hello" and is_remote:
+            # A worker (re)joined: tell it who is connected here
+            await self.backplane.publish({
+                "kind": "sync",
+                "worker": self.backplane.worker_id,
+                "clients": [self._client_data(connection_id) for connection_id in self.client_info]
+            })
+        elif kind == "sync" and is_remote:
+            await self._sync_remote_worker(worker, message["clients"])
+        elif kind == "goodbye" and is_remote:
+            await self._forget_worker(worker)
+
+    def _add_remote_client(self, worker: str, client: dict):
+        # A sync and a presence event may both announce the same client
+        self._remove_remote_client(client["connection_id"])
+        client = dict(client, worker_id=worker, groups=list(client.get("groups", [])))
+        self.remote_clients[client["connection_id"]] = client
+        for group_name in client.get("groups", []):
+            self.remote_group_counts[group_name] = self.remote_group_counts.get(group_name, 0) + 1
+
+    def _remove_remote_client(self, connection_id: str) -> Optional[dict]:
+        client = self.remote_clients.pop(connection_id, None)
+        if client is not None:
+            for group_name in client.get("groups", []):
+                self._decrement_remote_group(group_name)
+        return client
+
+    def _decrement_remote_group(self, group_name: str):
+        count = self.remote_group_counts.get(group_name, 0) - 1
+        if count > 0:
+            self.remote_group_counts[group_name] = count
+        else:
+            self.remote_group_counts.pop(group_name, None)
+
+    def _apply_remote_presence(self, worker: str, events: List[dict]):
+        """Mirror another worker's presence deltas into the remote client directory"""
+        for event in events:
+            kind = event["event"]
+            connection_id = event["connection_id"]
+            if kind == "joined":
+                self._add_remote_client(worker, event["client"])
+            elif kind == "left":
+                self._remove_remote_client(connection_id)
+            elif connection_id in self.remote_clients:
+                groups = self.remote_clients[connection_id].setdefault("groups", [])
+                if kind == "group_joined" and event["group"] not in groups:
+                    groups.append(event["group"])
+                    self.remote_group_counts[event["group"]] = self.remote_group_counts.get(event["group"], 0) + 1
+                elif kind == "group_left" and event["group"] in groups:
+                    groups.remove(event["group"])
+                    self._decrement_remote_group(event["group"])
+
+    async def _sync_remote_worker(self, worker: str, clients: List[dict]):
+        """Replace everything we know about a worker with its full client list"""
+        incoming = {client["connection_id"]: client for client in clients}
+        events = []
+        for connection_id, client in list(self.remote_clients.items()):
+            if client.get("worker_id") == worker and connection_id not in incoming:
+                self._remove_remote_client(connection_id)
+                events.append({"event": "left", "connection_id": connection_id, "groups": client.get("groups", [])})
+        for connection_id, client in incoming.items():
+            if connection_id not in self.remote_clients:
+                events.append({"event": "joined", "connection_id": connection_id, "client": client})
+            self._add_remote_client(worker, client)
+        if events:
+            await self._send_presence_local(events)
+
+    async def _forget_worker(self, worker: str):
+        """Drop the clients of a worker that shut down or stopped sending heartbeats"""
+        self.worker_last_seen.pop(worker, None)
+        events = []
+        for connection_id in [cid for cid, client in self.remote_clients.items() if client.get("worker_id") == worker]:
+            client = self._remove_remote_client(connection_id)
+            events.append({"event": "left", "connection_id": connection_id, "groups": client.get("groups", [])})
+        if events:
+            await self._send_presence_local(events)
+
+    async def _announce(self):
+        await self.backplane.publish({"kind": "hello", "worker": self.backplane.worker_id})
+
+    async def _heartbeat_loop(self):
+        """Tell other workers we are alive and forget the ones that went silent"""
+        interval = settings.WS_BACKPLANE_HEARTBEAT_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            await self.backplane.publish({"kind": "heartbeat", "worker": self.backplane.worker_id})
+            deadline = time.monotonic() - interval * 3
+            for worker, last_seen in list(self.worker_last_seen.items()):
+                if last_seen < deadline:
+                    print(f"WebSocket worker {worker} stopped sending heartbeats; dropping its clients")
+                    await self._forget_worker(worker)
+
+    def group_member_count(self, group: str) -> int:
+        return len(self.group_memberships.get(group, ())) + self.remote_group_counts.get(group, 0)
+
     def get_group_members(self, group: str):
         """Return the list of clients in a specific group"""
         members = []
+        if is_note_group(group):
+            # Who edits which note is only shared with co-editors, through awareness
+            return members
         if group in self.group_memberships:
             for connection_id in self.group_memberships[group]:
                 if connection_id in self.client_info:
@@ -282,15 +953,25 @@ class ConnectionManager:
                         "original_client_id": info["original_client_id"],
                         "connected_at": info["connected_at"]
                     })
+        # Include members connected to other workers
+        for client in self.remote_clients.values():
+            if group in client.get("groups", []):
+                members.append({
+                    "client_id": client["client_id"],
+                    "original_client_id": client["original_client_id"],
+                    "connected_at": client["connected_at"]
+                })
         return members
 
     def get_groups(self):
         """Return the list of all groups with their member counts"""
         groups = []
-        for group_name, members in self.group_memberships.items():
+        for group_name in set(self.group_memberships) | set(self.remote_group_counts):
+            if is_note_group(group_name):
+                continue
             groups.append({
                 "name": group_name,
-                "member_count": len(members)
+                "member_count": self.group_member_count(group_name)
             })
         return groups
 
@@ -316,10 +997,13 @@ class ConnectionManager:
                 self.client_info[connection_id]["groups"] = set()
             self.client_info[connection_id]["groups"].add(group_name)
         
-        # Notify all clients about the updated connection list
-        await self.broadcast_connected_clients()
-        # Broadcast updated group information
-        await self.broadcast_group_info()
+        # Notify all clients about the membership change (not for open notes)
+        if not is_note_group(group_name):
+            self._queue_presence({
+                "event": "group_joined",
+                "connection_id": connection_id,
+                "group": group_name
+            })
         
         return True
 
@@ -343,11 +1027,15 @@ class ConnectionManager:
             # Update client info
             if connection_id in self.client_info and "groups" in self.client_info[connection_id]:
                 self.client_info[connection_id]["groups"].discard(group_name)
+            self.awareness.forget(connection_id, {group_name})
             
-            # Notify all clients about the updated connection list
-            await self.broadcast_connected_clients()
-            # Broadcast updated group information
-            await self.broadcast_group_info()
+            # Notify all clients about the membership change (not for open notes)
+            if not is_note_group(group_name):
+                self._queue_presence({
+                    "event": "group_left",
+                    "connection_id": connection_id,
+                    "group": group_name
+                })
             
             return True
         return False
@@ -371,10 +1059,13 @@ manager = ConnectionManager()
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
+    limiter = manager.create_limiter()
     try:
         while True:
-            data = await websocket.receive_text()
-            await manager.send_personal_message(f"Message text was: {data}", websocket)
+            message = await manager.receive_within_limits(websocket, limiter)
+            if message is None or message.get("text") is None:
+                continue
+            await manager.send_personal_message(f"Message text was: {message['text']}", websocket)
     except WebSocketDisconnect:
         print("\n\n*** WebSocket /ws disconnected normally ***\n\n")
         manager.disconnect(websocket)
@@ -386,48 +1077,60 @@ async def websocket_endpoint(websocket: WebSocket):
             pass
         manager.disconnect(websocket)
 
+def authenticated_user_data(token: str, db) -> dict:
+    """manager.user_info entry for a JWT; raises HTTPException if the token is not valid"""
+    user = get_current_user(token, db)
+    return {
+        "user_id": str(user.uid),
+        "username": user.uname,
+        "email": user.uemail
+    }
+
+
+def _authenticate_admin_token(token: str):
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        # Same check as the get_current_admin_user dependency of the HTTP admin routes
+        return get_current_admin_user(get_current_user(token, db))
+    finally:
+        db.close()
+
+
+def _authenticate_token(token: str) -> dict:
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        return authenticated_user_data(token, db)
+    finally:
+        db.close()
+
+
 @router.websocket("/ws/auth")
 async def websocket_endpoint_auth(websocket: WebSocket, token: str):
     """WebSocket endpoint that requires JWT authentication"""
     try:
-        # Import dependencies here to avoid circular imports
-        from app.core.dependencies import get_current_user
-        from app.core.database import get_db
-        from app.core.jwt import verify_token
-        from sqlalchemy.orm import Session
-        
-        # Verify the JWT token
-        credentials_exception = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-        
-        # Get database session
+        # Get database session; it only connects if the token is not cached yet
         db_gen = get_db()
         db = next(db_gen)
         
         try:
-            token_data = verify_token(token, credentials_exception)
-            user = get_current_user(token, db)
-            
-            # Create user data to store
-            user_data = {
-                "user_id": str(user.uid),
-                "username": user.uname,
-                "email": user.uemail
-            }
+            # Verifies the JWT token, or reuses a recent verification of it
+            user_data = authenticated_user_data(token, db)
             
             # Connect with user information
             await manager.connect(websocket, user_data=user_data)
             
             # Send welcome message with user information
-            await websocket.send_text(f"Connected as authenticated user: {user.uname} ({user.uemail})")
+            await manager.send_personal_message(f"Connected as authenticated user: {user_data['username']} ({user_data['email']})", websocket)
             
             try:
+                limiter = manager.create_limiter()
                 while True:
-                    data = await websocket.receive_text()
-                    await manager.send_personal_message(f"Message text was: {data}", websocket)
+                    message = await manager.receive_within_limits(websocket, limiter)
+                    if message is None or message.get("text") is None:
+                        continue
+                    await manager.send_personal_message(f"Message text was: {message['text']}", websocket)
             except WebSocketDisconnect:
                 print("\n\n*** WebSocket /ws/auth disconnected normally ***\n\n")
                 manager.disconnect(websocket)
@@ -449,9 +1152,564 @@ async def websocket_endpoint_auth(websocket: WebSocket, token: str):
             pass
         await websocket.close()
 
-@router.websocket("/ws/{client_id}")
-async def websocket_endpoint_with_id(websocket: WebSocket, client_id: str):
-    print(f"WebSocket connection attempt with client_id: {client_id}")
+class ClientSession:
+    """Receive loop shared by /ws/{client_id} and /ws/{client_id}/{group}"""
+
+    def __init__(self, websocket: WebSocket, client_id_value: Union[int, str], default_group: Optional[str] = None):
+        self.websocket = websocket
+        self.client_id_value = client_id_value
+        self.default_group = default_group  # Initial group of /ws/{client_id}/{group} connections
+        self.label = f"client '{client_id_value}'" + (f" in group {default_group}" if default_group else "")
+        self.limiter = manager.create_limiter()
+        self.open_notes: Set[str] = set()  # Notes this connection was allowed to open
+
+    @property
+    def connection_id(self) -> Optional[str]:
+        return manager.websocket_to_id.get(id(self.websocket))
+
+    def current_groups(self) -> Set[str]:
+        return manager.client_groups.get(self.connection_id, set())
+
+    async def run(self):
+        while True:
+            message = await manager.receive_within_limits(self.websocket, self.limiter)
+            if message is None:
+                continue
+            print(f"Received message from {self.label}: {message.get('text') if message.get('text') is not None else '<binary frame>'}")
+            try:
+                commands, wire_format, batched = decode_frame(message, manager.wire_formats.get(self.connection_id, WIRE_TEXT))
+            except ProtocolError as e:
+                error = Reply(False, str(e))
+                wire_format = WIRE_MSGPACK if message.get("bytes") is not None and msgpack is not None else WIRE_JSON
+                await manager.send_personal_message(encode(reply_payload(Command("error"), error), wire_format), self.websocket)
+                continue
+            
+            replies = []
+            for command in commands:
+                handler = COMMAND_HANDLERS.get(command.op)
+                if handler is None:
+                    reply = Reply(False, f"Unknown command: {command.op}")
+                else:
+                    reply = await handler(self, command)
+                if reply is not None:
+                    replies.append((command, reply))
+            await self.send_replies(replies, wire_format, batched)
+
+    async def send_replies(self, replies, wire_format: str, batched: bool):
+        if not replies:
+            return
+        if wire_format == WIRE_TEXT:
+            for command, reply in replies:
+                if reply.text is not None:
+                    await manager.send_personal_message(reply.text, self.websocket)
+            return
+        payloads = [reply_payload(command, reply) for command, reply in replies]
+        # A batch gets one frame with every reply, in command order
+        await manager.send_personal_message(encode(payloads if batched else payloads[0], wire_format), self.websocket)
+
+
+def _string_arg(command: Command, name: str) -> Optional[str]:
+    value = command.args.get(name)
+    return value if isinstance(value, str) and value else None
+
+
+async def _handle_send_to(session: ClientSession, command: Command) -> Reply:
+    target_client_id = command.args.get("target")
+    message = _string_arg(command, "message")
+    if isinstance(target_client_id, str) and target_client_id.isdigit():
+        # Try to convert to int if it's numeric
+        target_client_id = int(target_client_id)
+    if not isinstance(target_client_id, (int, str)) or target_client_id == "" or message is None:
+        return Reply(False, "Invalid command format. Use: /send_to <target_client_id> <message>")
+    success = await manager.send_message_to_client_id(
+        f"Private message from client '{session.client_id_value}': {message}", 
+        target_client_id
+    )
+    if success:
+        return Reply(True, f"Message sent to client '{target_client_id}'")
+    return Reply(False, f"Failed to send message to client '{target_client_id}'. Client not found or disconnected.")
+
+
+async def _handle_join(session: ClientSession, command: Command) -> Reply:
+    group_name = _string_arg(command, "group")
+    if group_name is None:
+        return Reply(False, "Invalid command format. Use: /join <group_name>")
+    if is_note_group(group_name):
+        return Reply(False, "Use note_open to join a note")
+    if await manager.join_group(session.websocket, group_name):
+        return Reply(True, f"Joined group: {group_name}", {"group": group_name, "last_seq": manager.history.last_sequence(group_name)})
+    return Reply(False, f"Failed to join group: {group_name}")
+
+
+async def _handle_leave(session: ClientSession, command: Command) -> Reply:
+    group_name = _string_arg(command, "group")
+    if group_name is None:
+        return Reply(False, "Invalid command format. Use: /leave <group_name>")
+    if is_note_group(group_name):
+        session.open_notes.discard(group_name[len(NOTE_GROUP_PREFIX):])
+    if await manager.leave_group(session.websocket, group_name):
+        return Reply(True, f"Left group: {group_name}")
+    return Reply(False, f"Failed to leave group: {group_name}")
+
+
+async def _handle_leave_all(session: ClientSession, command: Command) -> Reply:
+    session.open_notes.clear()
+    if await manager.leave_all_groups(session.websocket):
+        return Reply(True, "Left all groups")
+    return Reply(False, "Failed to leave all groups")
+
+
+async def _handle_my_groups(session: ClientSession, command: Command) -> Reply:
+    groups = list(session.current_groups())
+    if not groups:
+        return Reply(True, "You are not in any groups", [])
+    return Reply(True, f"Your groups: {groups}", groups)
+
+
+async def _handle_group(session: ClientSession, command: Command) -> Reply:
+    group_message = _string_arg(command, "message")
+    if group_message is None:
+        return Reply(False, "Invalid command format. Use: /group <message>")
+    text = f"Group message from client '{session.client_id_value}': {group_message}"
+    if session.default_group:
+        # Group connections always talk to their initial group
+        await manager.broadcast_to_group(text, session.default_group)
+        return Reply(True, None)
+    groups = list(session.current_groups())
+    if not groups:
+        return Reply(False, "You are not in any groups. Use /join <group_name> to join a group.")
+    for group_name in groups:
+        await manager.broadcast_to_group(text, group_name)
+    return Reply(True, f"Message sent to groups: {groups}", groups)
+
+
+async def _handle_resume(session: ClientSession, command: Command) -> Reply:
+    group_name = _string_arg(command, "group")
+    after = command.args.get("after", 0)
+    if group_name is None or not isinstance(after, int) or isinstance(after, bool):
+        return Reply(False, "Invalid command format. Use: {\"op\": \"resume\", \"group\": <group_name>, \"after\": <last_seq>}")
+    if group_name not in session.current_groups():
+        return Reply(False, f"Join group '{group_name}' before resuming it")
+    result = await manager.resume_group(group_name, after)
+    return Reply(True, f"Resumed group '{group_name}': {len(result['messages'])} missed messages", result)
+
+
+def _session_user_id(session: ClientSession) -> Optional[str]:
+    """User the connection authenticated as with ?token=; never taken from the client ID"""
+    user = manager.user_info.get(session.connection_id)
+    return user.get("user_id") if user else None
+
+
+def _note_arg(command: Command) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(command.args.get("note"))))
+    except ValueError:
+        return None
+
+
+async def _handle_note_open(session: ClientSession, command: Command) -> Reply:
+    note_id = _note_arg(command)
+    if note_id is None:
+        return Reply(False, "Invalid command format. 'note' must be a note ID")
+    user_id = _session_user_id(session)
+    if user_id is None:
+        return Reply(False, "Notes can only be opened by authenticated connections; connect with ?token=<access token>")
+    try:
+        allowed = await run_in_threadpool(user_can_open_note, note_id, user_id)
+    except Exception as e:
+        print(f"Note access check failed for {note_id}: {e}")
+        return Reply(False, "Could not check access to the note")
+    if not allowed:
+        return Reply(False, "Note not found or you are not a member of its project")
+    group_name = note_group(note_id)
+    await manager.join_group(session.websocket, group_name)
+    try:
+        await manager.collab.open(note_id)
+    except CollabError as e:
+        await manager.leave_group(session.websocket, group_name)
+        return Reply(False, str(e))
+    session.open_notes.add(note_id)
+    state = manager.collab.state(note_id)
+    state["awareness"] = manager.awareness.snapshot(group_name)
+    return Reply(True, f"Opened note: {note_id}", state)
+
+
+async def _handle_note_edit(session: ClientSession, command: Command) -> Reply:
+    note_id = _note_arg(command)
+    revision = command.args.get("revision")
+    if note_id is None or not isinstance(revision, int) or isinstance(revision, bool):
+        return Reply(False, "Invalid command format. Use: {\"op\": \"note_edit\", \"note\": <note_id>, \"revision\": <revision>, \"ops\": [...]}")
+    user_id = _session_user_id(session)
+    if user_id is None or note_id not in session.open_notes or note_group(note_id) not in session.current_groups():
+        return Reply(False, "Open the note before editing it")
+    try:
+        new_revision = await manager.collab.submit(note_id, revision, command.args.get("ops"), user_id, session.connection_id)
+    except (CollabError, OperationError) as e:
+        # The client should reload the note with note_open and reapply its pending edits
+        return Reply(False, str(e), {"note": note_id, "resync": True})
+    except asyncio.TimeoutError:
+        return Reply(False, "Edit was not confirmed in time", {"note": note_id, "resync": True})
+    return Reply(True, None, {"note": note_id, "revision": new_revision})
+
+
+async def _handle_awareness(session: ClientSession, command: Command) -> Optional[Reply]:
+    note_id = _note_arg(command)
+    state = command.args.get("state")
+    if note_id is None or not isinstance(state, dict):
+        return Reply(False, "Invalid command format. Use: {\"op\": \"awareness\", \"note\": <note_id>, \"state\": {...}}")
+    group_name = note_group(note_id)
+    if note_id not in session.open_notes or group_name not in session.current_groups():
+        return Reply(False, "Open the note before sending awareness updates")
+    if len(json.dumps(state)) > settings.WS_AWARENESS_MAX_BYTES:
+        return Reply(False, "Awareness state is too large")
+    state["client_id"] = session.client_id_value
+    manager.awareness.update(group_name, session.connection_id, state)
+    # Fire-and-forget: cursor updates are too frequent to acknowledge
+    return None
+
+
+def _topics_arg(command: Command) -> Optional[List[str]]:
+    topics = command.args.get("topics", command.args.get("topic"))
+    if isinstance(topics, str):
+        topics = [topics]
+    if not isinstance(topics, list) or not topics or not all(isinstance(topic, str) for topic in topics):
+        return None
+    return topics
+
+
+async def _handle_subscribe(session: ClientSession, command: Command) -> Reply:
+    topics = _topics_arg(command)
+    if topics is None:
+        return Reply(False, "Invalid command format. Use: /subscribe <topic_pattern>")
+    user_id = _session_user_id(session)
+    if user_id is None:
+        return Reply(False, "Topics can only be subscribed to by authenticated connections; connect with ?token=<access token>")
+    connection_id = session.connection_id
+    if len(manager.topics.patterns(connection_id) | set(topics)) > settings.WS_MAX_SUBSCRIPTIONS:
+        return Reply(False, f"Too many subscriptions (max {settings.WS_MAX_SUBSCRIPTIONS})")
+    try:
+        # Check every pattern before subscribing to any, so a refused batch changes nothing
+        for topic in topics:
+            await run_in_threadpool(check_subscription, topic, user_id)
+        for topic in topics:
+            manager.topics.subscribe(connection_id, topic)
+    except TopicError as e:
+        return Reply(False, str(e))
+    except Exception as e:
+        print(f"Topic access check failed for {topics}: {e}")
+        return Reply(False, "Could not check access to the topic")
+    # Subscriptions are private to the connection: no presence events
+    return Reply(True, f"Subscribed to: {topics}", sorted(manager.topics.patterns(connection_id)))
+
+
+async def _handle_unsubscribe(session: ClientSession, command: Command) -> Reply:
+    topics = _topics_arg(command)
+    if topics is None:
+        return Reply(False, "Invalid command format. Use: /unsubscribe <topic_pattern>")
+    for topic in topics:
+        manager.topics.unsubscribe(session.connection_id, topic)
+    return Reply(True, f"Unsubscribed from: {topics}", sorted(manager.topics.patterns(session.connection_id)))
+
+
+async def _handle_subscriptions(session: ClientSession, command: Command) -> Reply:
+    patterns = sorted(manager.topics.patterns(session.connection_id))
+    return Reply(True, f"Your subscriptions: {patterns}", patterns)
+
+
+async def _handle_note_close(session: ClientSession, command: Command) -> Reply:
+    note_id = _note_arg(command)
+    if note_id is None:
+        return Reply(False, "Invalid command format. 'note' must be a note ID")
+    session.open_notes.discard(note_id)
+    await manager.leave_group(session.websocket, note_group(note_id))
+    return Reply(True, f"Closed note: {note_id}")
+
+
+async def _handle_ping(session: ClientSession, command: Command) -> Reply:
+    # Application-level heartbeat; any frame already counts as activity
+    return Reply(True, "pong")
+
+
+async def _handle_pong(session: ClientSession, command: Command) -> None:
+    # Answer to the server's {"type": "ping"}; receiving the frame already recorded the activity
+    return None
+
+
+async def _handle_clients(session: ClientSession, command: Command) -> Reply:
+    if session.connection_id:
+        await manager.send_snapshot(session.connection_id)
+    return Reply(True, None)
+
+
+async def _handle_groups(session: ClientSession, command: Command) -> Reply:
+    groups = manager.get_groups()
+    return Reply(True, f"Available groups: {json.dumps(groups)}", groups)
+
+
+async def _handle_group_members(session: ClientSession, command: Command) -> Reply:
+    group_name = _string_arg(command, "group")
+    if group_name is None:
+        return Reply(False, "Invalid command format. Use: /group_members <group_name>")
+    members = manager.get_group_members(group_name)
+    return Reply(True, f"Members in group '{group_name}': {json.dumps(members)}", members)
+
+
+async def _handle_message(session: ClientSession, command: Command) -> Reply:
+    data = command.args.get("message")
+    if not isinstance(data, str):
+        return Reply(False, "Invalid command format. 'message' must be a string")
+    text = f"Client '{session.client_id_value}': {data}"
+    # Send to the client's groups instead of all clients
+    groups = session.current_groups()
+    if groups:
+        for group_name in list(groups):
+            await manager.broadcast_to_group(text, group_name)
+    elif session.default_group:
+        # If not in any groups, broadcast to the initial group
+        await manager.broadcast_to_group(text, session.default_group)
+    else:
+        # If not in any groups, broadcast to all clients
+        await manager.broadcast(text)
+    return Reply(True, f"Client '{session.client_id_value}' says: {data}")
+
+
+# Dispatch table: envelope "op" -> handler
+COMMAND_HANDLERS = {
+    "send_to": _handle_send_to,
+    "join": _handle_join,
+    "leave": _handle_leave,
+    "leave_all": _handle_leave_all,
+    "my_groups": _handle_my_groups,
+    "group": _handle_group,
+    "clients": _handle_clients,
+    "groups": _handle_groups,
+    "group_members": _handle_group_members,
+    "resume": _handle_resume,
+    "ping": _handle_ping,
+    "pong": _handle_pong,
+    "note_open": _handle_note_open,
+    "note_edit": _handle_note_edit,
+    "note_close": _handle_note_close,
+    "awareness": _handle_awareness,
+    "subscribe": _handle_subscribe,
+    "unsubscribe": _handle_unsubscribe,
+    "subscriptions": _handle_subscriptions,
+    "message": _handle_message,
+}
+
+
+class DatabaseConsoleSession:
+    """State of one /ws/db connection: the target database's pool and the query running on it"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.pool = None
+        self.target = None
+        self.query: Optional[ConsoleQuery] = None
+        self.query_task: Optional[asyncio.Task] = None
+        self.send_lock = asyncio.Lock()
+
+    async def send(self, payload: dict):
+        # Rows can hold dates and decimals; the query task and the receive loop both send
+        async with self.send_lock:
+            await self.websocket.send_text(json.dumps(payload, default=str))
+
+    async def handle(self, data: dict):
+        action = data.get("action")
+        client_id = data.get("client_id")
+        if client_id is not None and not isinstance(client_id, (int, str)):
+            # Accept both string and integer client IDs
+            await self.send({"status": "error", "message": f"Error: Invalid client_id. Must be an integer or string. Got {type(client_id)}"})
+            return
+        handler = {
+            "connect": self.connect,
+            "disconnect": self.disconnect,
+            "query": self.start_query,
+            "cancel": self.cancel
+        }.get(action)
+        if handler is None:
+            await self.send({"status": "error", "message": f"Unknown action: {action}"})
+            return
+        await handler(data)
+
+    def query_running(self) -> bool:
+        return self.query_task is not None and not self.query_task.done()
+
+    async def connect(self, data: dict):
+        if self.query_running():
+            await self.send({"status": "error", "message": "A query is still running; cancel it first"})
+            return
+        conn_params = {
+            "host": data.get("host", "localhost"),
+            "port": data.get("port", 5432),
+            "database": data.get("database"),
+            "user": data.get("user"),
+            "password": data.get("password")
+        }
+        print(f"Database console connection attempt: {conn_params['host']}:{conn_params['port']} - {conn_params['database']} - {conn_params['user']}")
+        if not all([conn_params["database"], conn_params["user"]]):
+            await self.send({"status": "error", "message": "Missing required connection parameters"})
+            return
+        if not is_allowed_target(conn_params):
+            await self.send({"status": "error", "message": "This database is not configured for the console (WS_DB_TARGETS)"})
+            return
+        try:
+            pool = await run_blocking(console_pools.get, conn_params)
+            await run_blocking(check_connection, pool)
+        except Exception as e:
+            await self.send({"status": "error", "message": f"Database connection error: {str(e)}"})
+            return
+        self.pool = pool
+        self.target = conn_params
+        await self.send({
+            "status": "success",
+            "message": f"Connected to {conn_params['database']} at {conn_params['host']}:{conn_params['port']}"
+        })
+
+    async def disconnect(self, data: dict):
+        if self.pool is None:
+            await self.send({"status": "error", "message": "Not connected to any database"})
+            return
+        await self.close()
+        # The pool stays open for the next session that connects to the same database
+        self.pool = None
+        self.target = None
+        await self.send({"status": "success", "message": "Disconnected from database"})
+
+    async def start_query(self, data: dict):
+        if self.pool is None:
+            await self.send({"status": "error", "message": "Not connected to any database"})
+            return
+        sql = data.get("query")
+        if not sql:
+            await self.send({"status": "error", "message": "No query provided"})
+            return
+        if self.query_running():
+            await self.send({"status": "error", "message": f"Query {self.query.query_id} is still running; cancel it first"})
+            return
+        try:
+            timeout_ms = min(int(data.get("timeout_ms") or settings.WS_DB_STATEMENT_TIMEOUT_MS), settings.WS_DB_STATEMENT_TIMEOUT_MS)
+            chunk_size = max(1, min(int(data.get("chunk_size") or settings.WS_DB_CHUNK_ROWS), settings.WS_DB_CHUNK_ROWS))
+        except (TypeError, ValueError):
+            await self.send({"status": "error", "message": "timeout_ms and chunk_size must be integers"})
+            return
+        query_id = data.get("query_id")
+        self.query = ConsoleQuery(self.pool, sql, timeout_ms, str(query_id) if query_id is not None else None)
+        stream = bool(data.get("stream"))
+        if stream:
+            await self.send({"status": "started", "query_id": self.query.query_id})
+        # Run in the background so the receive loop stays free for a cancel
+        self.query_task = asyncio.create_task(self.run_query(self.query, stream, chunk_size))
+
+    async def run_query(self, query: ConsoleQuery, stream: bool, chunk_size: int):
+        commit = False
+        try:
+            columns, rows_affected = await run_blocking(query.execute)
+            if columns is None:
+                # DML query (INSERT, UPDATE, DELETE)
+                commit = True
+                await self.send({
+                    "status": "success",
+                    "result_type": "dml",
+                    "query_id": query.query_id,
+                    "message": "Query executed successfully",
+                    "rows_affected": rows_affected
+                })
+            elif stream:
+                chunk_index = 0
+                row_count = 0
+                while not query.cancelled:
+                    columns, rows = await run_blocking(query.fetch, chunk_size)
+                    row_count += len(rows)
+                    await self.send({
+                        "status": "success",
+                        "result_type": "rows",
+                        "query_id": query.query_id,
+                        "chunk": chunk_index,
+                        "columns": columns,
+                        "rows": rows
+                    })
+                    chunk_index += 1
+                    if len(rows) < chunk_size:
+                        break
+                commit = not query.cancelled
+                await self.send({
+                    "status": "cancelled" if query.cancelled else "success",
+                    "result_type": "select_end",
+                    "query_id": query.query_id,
+                    "chunks": chunk_index,
+                    "row_count": row_count
+                })
+            else:
+                # One message, as before streaming existed, capped at WS_DB_MAX_ROWS
+                result_rows = []
+                truncated = False
+                while not query.cancelled:
+                    columns, rows = await run_blocking(query.fetch, chunk_size)
+                    result_rows.extend(rows)
+                    if len(result_rows) > settings.WS_DB_MAX_ROWS:
+                        result_rows = result_rows[:settings.WS_DB_MAX_ROWS]
+                        truncated = True
+                        break
+                    if len(rows) < chunk_size:
+                        break
+                if query.cancelled:
+                    await self.send({"status": "cancelled", "query_id": query.query_id, "message": "Query cancelled"})
+                else:
+                    commit = True
+                    await self.send({
+                        "status": "success",
+                        "result_type": "select",
+                        "query_id": query.query_id,
+                        "columns": columns,
+                        "rows": result_rows,
+                        "row_count": len(result_rows),
+                        "truncated": truncated
+                    })
+        except Exception as e:
+            try:
+                if query.cancelled:
+                    await self.send({"status": "cancelled", "query_id": query.query_id, "message": "Query cancelled"})
+                else:
+                    await self.send({"status": "error", "query_id": query.query_id, "message": f"Query execution error: {str(e)}"})
+            except Exception:
+                pass
+        finally:
+            await run_blocking(query.finish, commit)
+
+    async def cancel(self, data: dict):
+        query_id = data.get("query_id")
+        if not self.query_running() or (query_id is not None and str(query_id) != self.query.query_id):
+            await self.send({"status": "error", "message": "No such query is running"})
+            return
+        await self._cancel_running()
+
+    async def _cancel_running(self):
+        # Not on the console pool: its threads may all be busy with the queries being cancelled
+        await asyncio.get_running_loop().run_in_executor(None, self.query.cancel)
+
+    async def close(self):
+        """Cancel any running query and wait for its connection to go back to the pool"""
+        if self.query_running():
+            await self._cancel_running()
+            await asyncio.gather(self.query_task, return_exceptions=True)
+
+async def run_client_session(websocket: WebSocket, client_id: str, group: Optional[str] = None, wire_format: str = WIRE_TEXT, token: Optional[str] = None):
+    session_label = f"client_id: {client_id}" + (f" and group: {group}" if group else "")
+    print(f"WebSocket connection attempt with {session_label}")
+    if group and is_note_group(group):
+        # Note groups carry note contents; they are joined with note_open only
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_data = None
+    if token:
+        # Optional: authenticated connections may open and edit notes
+        try:
+            user_data = await run_in_threadpool(_authenticate_token, token)
+        except Exception as e:
+            print(f"WebSocket authentication failed for {session_label}: {e}")
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
     # Validate client_id - now we accept both numeric and string IDs
     # For backward compatibility, we still validate numeric IDs
     client_id_value = client_id
@@ -460,419 +1718,92 @@ async def websocket_endpoint_with_id(websocket: WebSocket, client_id: str):
         
     print(f"Valid client_id received: {client_id_value}")
         
-    await manager.connect(websocket, client_id_value)
+    await manager.connect(websocket, client_id_value, group, user_data)
+    if wire_format == WIRE_JSON or (wire_format == WIRE_MSGPACK and msgpack is not None):
+        # Pushed group messages arrive as {"type": "group_message", "seq": ...} envelopes
+        manager.set_wire_format(websocket, wire_format)
+    session = ClientSession(websocket, client_id_value, group)
+    in_group = f" in group '{group}'" if group else ""
     try:
         # Send a welcome message to indicate successful connection
         if isinstance(client_id_value, int):
-            await websocket.send_text(f"Connected as client #{client_id_value}")
+            await manager.send_personal_message(f"Connected as client #{client_id_value}{in_group}", websocket)
         else:
             # For string IDs, we show both the original and the mapped numeric ID
             numeric_id = manager.string_to_numeric_id.get(client_id_value)
-            await websocket.send_text(f"Connected as client '{client_id_value}' (mapped to numeric ID: {numeric_id})")
+            await manager.send_personal_message(f"Connected as client '{client_id_value}' (mapped to numeric ID: {numeric_id}){in_group}", websocket)
         
-        while True:
-            data = await websocket.receive_text()
-            print(f"Received message from client '{client_id_value}': {data}")
-            # Check if this is a command to send a message to a specific client
-            if data.startswith("/send_to "):
-                # Parse the command: /send_to <target_client_id> <message>
-                parts = data.split(" ", 2)
-                if len(parts) >= 3:
-                    try:
-                        target_client_id = parts[1]
-                        # Try to convert to int if it's numeric
-                        if target_client_id.isdigit():
-                            target_client_id = int(target_client_id)
-                        message = parts[2]
-                        success = await manager.send_message_to_client_id(
-                            f"Private message from client '{client_id_value}': {message}", 
-                            target_client_id
-                        )
-                        if success:
-                            await manager.send_personal_message(
-                                f"Message sent to client '{target_client_id}'", 
-                                websocket
-                            )
-                        else:
-                            await manager.send_personal_message(
-                                f"Failed to send message to client '{target_client_id}'. Client not found or disconnected.", 
-                                websocket
-                            )
-                    except ValueError:
-                        await manager.send_personal_message(
-                            "Invalid target client ID.", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /send_to <target_client_id> <message>", 
-                        websocket
-                    )
-            # Check if this is a command to join a group
-            elif data.startswith("/join "):
-                group_name = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_name:
-                    success = await manager.join_group(websocket, group_name)
-                    if success:
-                        await manager.send_personal_message(
-                            f"Joined group: {group_name}", 
-                            websocket
-                        )
-                    else:
-                        await manager.send_personal_message(
-                            f"Failed to join group: {group_name}", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /join <group_name>", 
-                        websocket
-                    )
-            # Check if this is a command to leave a group
-            elif data.startswith("/leave "):
-                group_name = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_name:
-                    success = await manager.leave_group(websocket, group_name)
-                    if success:
-                        await manager.send_personal_message(
-                            f"Left group: {group_name}", 
-                            websocket
-                        )
-                    else:
-                        await manager.send_personal_message(
-                            f"Failed to leave group: {group_name}", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /leave <group_name>", 
-                        websocket
-                    )
-            # Check if this is a command to leave all groups
-            elif data == "/leave_all":
-                success = await manager.leave_all_groups(websocket)
-                if success:
-                    await manager.send_personal_message(
-                        "Left all groups", 
-                        websocket
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "Failed to leave all groups", 
-                        websocket
-                    )
-            # Check if this is a command to list client's groups
-            elif data == "/my_groups":
-                connection_id = manager.websocket_to_id.get(id(websocket))
-                if connection_id and connection_id in manager.client_groups:
-                    groups = list(manager.client_groups[connection_id])
-                    await manager.send_personal_message(
-                        f"Your groups: {groups}", 
-                        websocket
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "You are not in any groups", 
-                        websocket
-                    )
-            # Check if this is a command to send a message to a group
-            elif data.startswith("/group "):
-                group_message = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_message:
-                    connection_id = manager.websocket_to_id.get(id(websocket))
-                    if connection_id and connection_id in manager.client_groups:
-                        groups = manager.client_groups[connection_id]
-                        if groups:
-                            for group_name in groups:
-                                await manager.broadcast_to_group(
-                                    f"Group message from client '{client_id_value}': {group_message}", 
-                                    group_name
-                                )
-                            await manager.send_personal_message(
-                                f"Message sent to groups: {list(groups)}", 
-                                websocket
-                            )
-                        else:
-                            await manager.send_personal_message(
-                                "You are not in any groups. Use /join <group_name> to join a group.", 
-                                websocket
-                            )
-                    else:
-                        await manager.send_personal_message(
-                            "You are not in any groups. Use /join <group_name> to join a group.", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /group <message>", 
-                        websocket
-                    )
-            # Check if this is a command to list all groups
-            elif data == "/groups":
-                groups = manager.get_groups()
-                await manager.send_personal_message(
-                    f"Available groups: {json.dumps(groups)}", 
-                    websocket
-                )
-            # Check if this is a command to get members of a specific group
-            elif data.startswith("/group_members "):
-                group_name = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_name:
-                    members = manager.get_group_members(group_name)
-                    await manager.send_personal_message(
-                        f"Members in group '{group_name}': {json.dumps(members)}", 
-                        websocket
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /group_members <group_name>", 
-                        websocket
-                    )
-            else:
-                await manager.send_personal_message(f"Client '{client_id_value}' says: {data}", websocket)
-                # Broadcast to all client's groups instead of all clients
-                connection_id = manager.websocket_to_id.get(id(websocket))
-                if connection_id and connection_id in manager.client_groups:
-                    groups = manager.client_groups[connection_id]
-                    if groups:
-                        for group_name in groups:
-                            await manager.broadcast_to_group(
-                                f"Client '{client_id_value}': {data}", 
-                                group_name
-                            )
-                    else:
-                        # If not in any groups, broadcast to all clients
-                        await manager.broadcast(f"Client '{client_id_value}': {data}")
-                else:
-                    # If not in any groups, broadcast to all clients
-                    await manager.broadcast(f"Client '{client_id_value}': {data}")
+        await session.run()
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected for client '{client_id_value}'")
+        print(f"WebSocket disconnected for {session.label}")
         manager.disconnect(websocket)
-        # Notify all clients about the disconnection
-        await manager.broadcast_connected_clients()
-        await manager.broadcast_group_info()
         await manager.broadcast(f"Client '{client_id_value}' has disconnected")
     except Exception as e:
         # Handle any other exceptions that might occur
-        print(f"Error in WebSocket connection for client '{client_id_value}': {e}")
+        print(f"Error in WebSocket connection for {session.label}: {e}")
         try:
             await websocket.send_text(f"Server error: {str(e)}")
         except Exception as send_error:
-            print(f"Failed to send error message to client '{client_id_value}': {send_error}")
+            print(f"Failed to send error message to {session.label}: {send_error}")
         manager.disconnect(websocket)
-        # Notify all clients about the disconnection
-        await manager.broadcast_connected_clients()
-        await manager.broadcast_group_info()
 
-@router.websocket("/ws/{client_id}/{group}")
-async def websocket_endpoint_with_id_and_group(websocket: WebSocket, client_id: str, group: str):
-    print(f"WebSocket connection attempt with client_id: {client_id} and group: {group}")
-    # Validate client_id - now we accept both numeric and string IDs
-    # For backward compatibility, we still validate numeric IDs
-    client_id_value = client_id
-    if client_id.isdigit():
-        client_id_value = int(client_id)
-        
-    print(f"Valid client_id received: {client_id_value}")
-        
-    await manager.connect(websocket, client_id_value, group)
+@router.websocket("/ws/db")
+async def database_websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    # Registered before /ws/{client_id}, which would otherwise take "db" as a client ID
+    # Runs arbitrary SQL: admins only, checked before the socket is accepted
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+        await run_in_threadpool(_authenticate_admin_token, token)
+    except Exception as e:
+        print(f"Database console WebSocket rejected: {getattr(e, 'detail', e)}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    session = DatabaseConsoleSession(websocket)
+    limiter = manager.create_limiter()
     try:
-        # Send a welcome message to indicate successful connection
-        if isinstance(client_id_value, int):
-            await websocket.send_text(f"Connected as client #{client_id_value} in group '{group}'")
-        else:
-            # For string IDs, we show both the original and the mapped numeric ID
-            numeric_id = manager.string_to_numeric_id.get(client_id_value)
-            await websocket.send_text(f"Connected as client '{client_id_value}' (mapped to numeric ID: {numeric_id}) in group '{group}'")
-        
         while True:
-            data = await websocket.receive_text()
-            print(f"Received message from client '{client_id_value}' in group {group}: {data}")
-            # Check if this is a command to send a message to a specific client
-            if data.startswith("/send_to "):
-                # Parse the command: /send_to <target_client_id> <message>
-                parts = data.split(" ", 2)
-                if len(parts) >= 3:
-                    try:
-                        target_client_id = parts[1]
-                        # Try to convert to int if it's numeric
-                        if target_client_id.isdigit():
-                            target_client_id = int(target_client_id)
-                        message = parts[2]
-                        success = await manager.send_message_to_client_id(
-                            f"Private message from client '{client_id_value}': {message}", 
-                            target_client_id
-                        )
-                        if success:
-                            await manager.send_personal_message(
-                                f"Message sent to client '{target_client_id}'", 
-                                websocket
-                            )
-                        else:
-                            await manager.send_personal_message(
-                                f"Failed to send message to client '{target_client_id}'. Client not found or disconnected.", 
-                                websocket
-                            )
-                    except ValueError:
-                        await manager.send_personal_message(
-                            "Invalid target client ID.", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /send_to <target_client_id> <message>", 
-                        websocket
-                    )
-            # Check if this is a command to send a message to the group
-            elif data.startswith("/group "):
-                group_message = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_message:
-                    await manager.broadcast_to_group(
-                        f"Group message from client '{client_id_value}': {group_message}", 
-                        group
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /group <message>", 
-                        websocket
-                    )
-            # Check if this is a command to list all groups
-            elif data == "/groups":
-                groups = manager.get_groups()
-                await manager.send_personal_message(
-                    f"Available groups: {json.dumps(groups)}", 
-                    websocket
-                )
-            # Check if this is a command to get members of a specific group
-            elif data.startswith("/group_members "):
-                group_name = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_name:
-                    members = manager.get_group_members(group_name)
-                    await manager.send_personal_message(
-                        f"Members in group '{group_name}': {json.dumps(members)}", 
-                        websocket
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /group_members <group_name>", 
-                        websocket
-                    )
-            # Check if this is a command to join additional groups
-            elif data.startswith("/join "):
-                group_name = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_name:
-                    success = await manager.join_group(websocket, group_name)
-                    if success:
-                        await manager.send_personal_message(
-                            f"Joined group: {group_name}", 
-                            websocket
-                        )
-                    else:
-                        await manager.send_personal_message(
-                            f"Failed to join group: {group_name}", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /join <group_name>", 
-                        websocket
-                    )
-            # Check if this is a command to leave a group
-            elif data.startswith("/leave "):
-                group_name = data.split(" ", 1)[1] if len(data.split(" ", 1)) > 1 else None
-                if group_name:
-                    success = await manager.leave_group(websocket, group_name)
-                    if success:
-                        await manager.send_personal_message(
-                            f"Left group: {group_name}", 
-                            websocket
-                        )
-                    else:
-                        await manager.send_personal_message(
-                            f"Failed to leave group: {group_name}", 
-                            websocket
-                        )
-                else:
-                    await manager.send_personal_message(
-                        "Invalid command format. Use: /leave <group_name>", 
-                        websocket
-                    )
-            # Check if this is a command to leave all groups
-            elif data == "/leave_all":
-                success = await manager.leave_all_groups(websocket)
-                if success:
-                    await manager.send_personal_message(
-                        "Left all groups", 
-                        websocket
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "Failed to leave all groups", 
-                        websocket
-                    )
-            # Check if this is a command to list client's groups
-            elif data == "/my_groups":
-                connection_id = manager.websocket_to_id.get(id(websocket))
-                if connection_id and connection_id in manager.client_groups:
-                    groups = list(manager.client_groups[connection_id])
-                    await manager.send_personal_message(
-                        f"Your groups: {groups}", 
-                        websocket
-                    )
-                else:
-                    await manager.send_personal_message(
-                        "You are not in any groups", 
-                        websocket
-                    )
-            else:
-                await manager.send_personal_message(f"Client '{client_id_value}' says: {data}", websocket)
-                # Broadcast to the client's groups (including the initial group)
-                connection_id = manager.websocket_to_id.get(id(websocket))
-                if connection_id and connection_id in manager.client_groups:
-                    groups = manager.client_groups[connection_id]
-                    if groups:
-                        for group_name in groups:
-                            await manager.broadcast_to_group(
-                                f"Client '{client_id_value}': {data}", 
-                                group_name
-                            )
-                    else:
-                        # If not in any groups, broadcast to the initial group
-                        await manager.broadcast_to_group(
-                            f"Client '{client_id_value}': {data}", 
-                            group
-                        )
-                else:
-                    # If not in any groups, broadcast to the initial group
-                    await manager.broadcast_to_group(
-                        f"Client '{client_id_value}': {data}", 
-                        group
-                    )
+            message = await manager.receive_within_limits(websocket, limiter)
+            if message is None:
+                continue
+            try:
+                data = json.loads(message.get("text") or message.get("bytes") or b"")
+                if not isinstance(data, dict):
+                    raise ValueError("Expected a JSON object")
+            except ValueError as e:
+                await session.send({"status": "error", "message": f"Error: {str(e)}"})
+                continue
+            await session.handle(data)
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected for client '{client_id_value}' in group {group}")
-        manager.disconnect(websocket)
-        # Notify all clients about the disconnection
-        await manager.broadcast_connected_clients()
-        await manager.broadcast_group_info()
-        await manager.broadcast(f"Client '{client_id_value}' has disconnected")
+        print("Database console WebSocket disconnected")
     except Exception as e:
-        # Handle any other exceptions that might occur
-        print(f"Error in WebSocket connection for client '{client_id_value}' in group {group}: {e}")
+        print(f"Database console WebSocket error: {str(e)}")
         try:
-            await websocket.send_text(f"Server error: {str(e)}")
+            await session.send({"status": "error", "message": f"Server error: {str(e)}"})
         except Exception as send_error:
-            print(f"Failed to send error message to client '{client_id_value}' in group {group}: {send_error}")
-        manager.disconnect(websocket)
-        # Notify all clients about the disconnection
-        await manager.broadcast_connected_clients()
-        await manager.broadcast_group_info()
+            print(f"Error sending error message: {send_error}")
+    finally:
+        await session.close()
+
+@router.websocket("/ws/{client_id}")
+async def websocket_endpoint_with_id(websocket: WebSocket, client_id: str, wire_format: str = Query(WIRE_TEXT, alias="format"), token: Optional[str] = None):
+    await run_client_session(websocket, client_id, wire_format=wire_format, token=token)
+
+@router.websocket("/ws/{client_id}/{group}")
+async def websocket_endpoint_with_id_and_group(websocket: WebSocket, client_id: str, group: str, wire_format: str = Query(WIRE_TEXT, alias="format"), token: Optional[str] = None):
+    await run_client_session(websocket, client_id, group, wire_format, token)
 
 @router.get("/ws/clients")
 async def get_connected_clients():
     """HTTP endpoint to get the list of connected WebSocket clients"""
     return {"clients": manager.get_connected_clients()}
 
+@router.get("/ws/metrics")
+async def get_websocket_metrics(details: bool = True):
+    """HTTP endpoint to get per-connection queue depth, send latency and drop counts"""
+    return manager.get_metrics(include_connections=details)
+
 @router.get("/ws/groups")
 async def get_groups():
     """HTTP endpoint to get the list of all groups"""
@@ -911,200 +1842,91 @@ async def broadcast_message_to_group(group_name: str, message: dict):
     )
     return {"status": "success", "message": f"Message broadcast to group '{group_name}'"}
 
-# Database query handling via WebSocket
-import psycopg2
-import psycopg2.extras
+def _batch_items(body: dict) -> List[dict]:
+    items = body.get("messages")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'messages' must be a list")
+    if len(items) > settings.WS_HTTP_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.WS_HTTP_BATCH_MAX} messages per batch"
+        )
+    return items
 
-@router.websocket("/ws/db")
-async def database_websocket_endpoint(websocket: WebSocket):
-    print("\n\n*** WebSocket connection to /ws/db received ***\n\n")
-    await websocket.accept()
-    print("\n\n*** WebSocket connection to /ws/db accepted ***\n\n")
+@router.post("/ws/send_to_batch")
+async def send_messages_to_clients(body: dict):
+    """HTTP endpoint to send many private messages in one call: {"messages": [{"client_id": ..., "message": ...}]}
+
+    Each result reports "sent", "forwarded" (client on another worker), "queue_full",
+    "not_found" or "invalid" for the item at the same position.
+    """
+    items = _batch_items(body)
+    results = [None] * len(items)
+    deliveries = []
+    positions = []
+    for position, item in enumerate(items):
+        client_id = item.get("client_id") if isinstance(item, dict) else None
+        if isinstance(client_id, bool) or not isinstance(client_id, (int, str)) or client_id == "":
+            results[position] = {"client_id": client_id, "status": "invalid"}
+            continue
+        # Try to convert to int if it's numeric
+        target_client_id = int(client_id) if isinstance(client_id, str) and client_id.isdigit() else client_id
+        text_message = item.get("message", "Server message")
+        deliveries.append((target_client_id, f"Server message to client '{target_client_id}': {text_message}"))
+        positions.append(position)
+
+    statuses = await manager.send_messages_to_client_ids(deliveries)
+    for position, (target_client_id, _), delivery_status in zip(positions, deliveries, statuses):
+        results[position] = {"client_id": target_client_id, "status": delivery_status}
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"status": "success", "counts": counts, "results": results}
+
+@router.post("/ws/broadcast_to_groups_batch")
+async def broadcast_messages_to_groups(body: dict):
+    """HTTP endpoint to broadcast to many groups in one call.
+
+    Accepts {"messages": [{"group": ..., "message": ...}]} or, for the same message
+    to every group, {"groups": [...], "message": ...}. Each result carries the
+    group's new sequence number and its member count across workers.
+    """
+    if "groups" in body:
+        groups = body.get("groups")
+        if not isinstance(groups, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'groups' must be a list")
+        body = {"messages": [{"group": group, "message": body.get("message", "Server message")} for group in groups]}
+    items = _batch_items(body)
+
+    results = [None] * len(items)
+    broadcasts = []
+    positions = []
+    for position, item in enumerate(items):
+        group_name = item.get("group") if isinstance(item, dict) else None
+        if not isinstance(group_name, str) or not group_name:
+            results[position] = {"group": group_name, "status": "invalid"}
+            continue
+        text_message = item.get("message", "Server message")
+        broadcasts.append((group_name, f"Server broadcast to group '{group_name}': {text_message}"))
+        positions.append(position)
+
+    seqs = await manager.broadcast_to_group_batch(broadcasts) if broadcasts else []
+    for position, (group_name, _), seq in zip(positions, broadcasts, seqs):
+        results[position] = {
+            "group": group_name,
+            "status": "sent",
+            "seq": seq,
+            "members": manager.group_member_count(group_name)
+        }
+    return {"status": "success", "results": results}
+
+@router.post("/ws/publish")
+async def publish_topic_event(message: dict):
+    """HTTP endpoint to publish an event to every connection subscribed to a matching topic pattern"""
+    topic = message.get("topic")
     try:
-        while True:
-            print("\n\n*** Waiting for data from client ***\n\n")
-            try:
-                data = await websocket.receive_json()
-                print(f"\n\n*** WebSocket data received: {data} ***\n\n")
-                action = data.get("action")
-                print(f"\n\n*** Action: {action} ***\n\n")
-                
-                # Validate client_id if provided
-                client_id = data.get("client_id")
-                print(f"\n\n*** Client ID received: {client_id}, type: {type(client_id)} ***\n\n")
-                if client_id is not None:
-                    # Accept both string and integer client IDs
-                    # No need to convert to int, just validate it's a valid type
-                    if not isinstance(client_id, (int, str)):
-                        error_msg = f"Error: Invalid client_id. Must be an integer or string. Got {type(client_id)}"
-                        print(f"\n\n*** {error_msg} ***\n\n")
-                        await websocket.send_json({"status": "error", "message": error_msg})
-                        continue
-            except Exception as e:
-                print(f"\n\n*** Error receiving WebSocket data: {str(e)} ***\n\n")
-                await websocket.send_text(f"Error: {str(e)}")
-                continue
-            
-            if action == "connect":
-                print("\n\n*** Processing connect action ***\n\n")
-                # Connect to database
-                try:
-                    conn_params = {
-                        "host": data.get("host", "localhost"),
-                        "port": data.get("port", 5432),
-                        "database": data.get("database"),
-                        "user": data.get("user"),
-                        "password": data.get("password")
-                    }
-                    
-                    print(f"\n\n*** Database connection attempt: {conn_params['host']}:{conn_params['port']} - {conn_params['database']} - {conn_params['user']} ***\n\n")
-                    
-                    # Validate required parameters
-                    if not all([conn_params["database"], conn_params["user"]]):
-                        print("\n\n*** Missing required connection parameters ***\n\n")
-                        await websocket.send_json({
-                            "status": "error",
-                            "message": "Missing required connection parameters"
-                        })
-                        continue
-                    
-                    # Attempt to connect
-                    try:
-                        print("\n\n*** Attempting database connection ***\n\n")
-                        conn = psycopg2.connect(**conn_params)
-                        print(f"\n\n*** Database connection successful ***\n\n")
-                        
-                        # Store connection in WebSocket state
-                        websocket.state.db_conn = conn
-                        
-                        await websocket.send_json({
-                            "status": "success",
-                            "message": f"Connected to {conn_params['database']} at {conn_params['host']}:{conn_params['port']}"
-                        })
-                        print("\n\n*** Success response sent ***\n\n")
-                    except psycopg2.OperationalError as e:
-                        error_message = str(e)
-                        print(f"\n\n*** Database connection error (OperationalError): {error_message} ***\n\n")
-                        await websocket.send_json({
-                            "status": "error",
-                            "message": f"Database connection error: {error_message}"
-                        })
-                except Exception as e:
-                    print(f"\n\n*** General connection error: {str(e)} ***\n\n")
-                    await websocket.send_json({
-                        "status": "error",
-                        "message": f"Database connection error: {str(e)}"
-                    })
-            
-            elif action == "disconnect":
-                # Disconnect from database
-                if hasattr(websocket.state, "db_conn"):
-                    try:
-                        websocket.state.db_conn.close()
-                        delattr(websocket.state, "db_conn")
-                        await websocket.send_json({
-                            "status": "success",
-                            "message": "Disconnected from database"
-                        })
-                    except Exception as e:
-                        await websocket.send_json({
-                            "status": "error",
-                            "message": f"Error disconnecting from database: {str(e)}"
-                        })
-                else:
-                    await websocket.send_json({
-                        "status": "error",
-                        "message": "Not connected to any database"
-                    })
-            
-            elif action == "query":
-                # Execute SQL query
-                if not hasattr(websocket.state, "db_conn"):
-                    await websocket.send_json({
-                        "status": "error",
-                        "message": "Not connected to any database"
-                    })
-                    continue
-                
-                query = data.get("query")
-                if not query:
-                    await websocket.send_json({
-                        "status": "error",
-                        "message": "No query provided"
-                    })
-                    continue
-                
-                try:
-                    conn = websocket.state.db_conn
-                    cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-                    cursor.execute(query)
-                    
-                    # Handle different query types
-                    if query.lower().strip().startswith("select"):
-                        # SELECT query
-                        rows = cursor.fetchall()
-                        columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                        
-                        await websocket.send_json({
-                            "status": "success",
-                            "result_type": "select",
-                            "columns": columns,
-                            "rows": rows,
-                            "row_count": len(rows)
-                        })
-                    else:
-                        # DML query (INSERT, UPDATE, DELETE)
-                        conn.commit()
-                        rows_affected = cursor.rowcount
-                        
-                        await websocket.send_json({
-                            "status": "success",
-                            "result_type": "dml",
-                            "message": "Query executed successfully",
-                            "rows_affected": rows_affected
-                        })
-                    
-                    cursor.close()
-                except Exception as e:
-                    # Rollback on error
-                    if hasattr(websocket.state, "db_conn"):
-                        websocket.state.db_conn.rollback()
-                    
-                    await websocket.send_json({
-                        "status": "error",
-                        "message": f"Query execution error: {str(e)}"
-                    })
-            
-            else:
-                await websocket.send_json({
-                    "status": "error",
-                    "message": f"Unknown action: {action}"
-                })
-                
-    except WebSocketDisconnect:
-        print("\n\n*** WebSocket disconnected normally ***\n\n")
-        # Clean up database connection if exists
-        if hasattr(websocket.state, "db_conn"):
-            try:
-                websocket.state.db_conn.close()
-                print("\n\n*** Database connection closed on disconnect ***\n\n")
-            except Exception as cleanup_error:
-                print(f"\n\n*** Error closing database connection: {cleanup_error} ***\n\n")
-    except Exception as e:
-        print(f"\n\n*** WebSocket error: {str(e)} ***\n\n")
-        import traceback
-        print(f"\n\n*** Full traceback: {traceback.format_exc()} ***\n\n")
-        try:
-            await websocket.send_json({
-                "status": "error",
-                "message": f"Server error: {str(e)}"
-            })
-        except Exception as send_error:
-            print(f"\n\n*** Error sending error message: {send_error} ***\n\n")
-        # Clean up database connection if exists
-        if hasattr(websocket.state, "db_conn"):
-            try:
-                websocket.state.db_conn.close()
-                print("\n\n*** Database connection closed on error ***\n\n")
-            except Exception as cleanup_error:
-                print(f"\n\n*** Error closing database connection: {cleanup_error} ***\n\n")
\ No newline at end of file
+        await manager.publish_topic(topic, message.get("data"))
+    except TopicError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"status": "success", "message": f"Event published to topic '{topic}'"}
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script to apply the LISTEN/NOTIFY change trigger migration to the database
+"""
+
+import os
+import sys
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+def apply_migration():
+    """Apply the change notification trigger migration"""
+    
+    try:
+        # Import the database module from the app
+        from app.core.database import engine
+        
+        # Read migration file
+        migration_file = os.path.join(os.path.dirname(__file__), 'migrations', '20251019_add_change_notify_triggers.sql')
+        
+        if not os.path.exists(migration_file):
+            print(f"Migration file not found: {migration_file}")
+            return False
+        
+        with open(migration_file, 'r', encoding='utf-8') as f:
+            migration_sql = f.read()
+        
+        # Extract the upgrade part (everything before the rollback section)
+        upgrade_sql = migration_sql.split('-- 다운그레이드')[0]
+        
+        # The trigger function body contains semicolons, so run the script as a whole
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(upgrade_sql)
+            connection.commit()
+        finally:
+            connection.close()
+        print("Migration applied successfully!")
+        return True
+    except Exception as e:
+        print(f"Error applying migration: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = apply_migration()
+    if success:
+        print("Change notification triggers created successfully!")
+    else:
+        print("Failed to create change notification triggers!")
+        sys.exit(1)
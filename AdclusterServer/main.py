@@ -1,6 +1,8 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.routers import users_router, auth_router, websocket_router, projects_router
 from app.routers.uploads_router import router as uploads_api_router
 from app.routers.db_tables import router as db_tables_router
@@ -21,7 +23,18 @@ from routers.core import router as core_router  # Add CORE router import
 from routers.semantic_scholar import router as semantic_scholar_router  # Add Semantic Scholar router import
 from routers.scopus import router as scopus_router  # Add Scopus router import
 from routers.web_of_science import router as web_of_science_router  # Add Web of Science router import
-from app.core.database import Base, engine
+from app.routers.admin_perf import router as admin_perf_router
+from app.routers.websocket import manager as websocket_manager
+from app.core.db_console import console_pools
+from app.core.db_routing import replica_router
+from app.core.runtime_stats import process_rss_bytes
+from app.core.metrics import metrics
+from app.core.compression import CompressionMiddleware
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.responses import JSONResponse
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.core.database import Base, engine, async_engine, bootstrap_database, warm_up_pool, warm_up_async_pool
 from app.models import user, project, node, content_block, file, reference, citation, ai_job, revision, team, client_ip, folder
 from sqlalchemy import MetaData
 import os
@@ -38,7 +51,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Adcluster API",
     description="API for the Adcluster server",
-    version="0.1.0"
+    version="0.1.0",
+    # orjson이 설치되어 있으면 ORJSONResponse로 빠르게 직렬화 (app/core/responses.py)
+    default_response_class=JSONResponse
 )
 
 app.add_middleware(
@@ -57,6 +72,66 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# 큰 JSON 응답은 brotli(설치된 경우) 또는 gzip으로 압축 (COMPRESSION_MINIMUM_SIZE 이상)
+app.add_middleware(CompressionMiddleware)
+
+@app.on_event("startup")
+async def prepare_database():
+    # 확장(ltree) 생성과 스키마 확인은 연결마다가 아니라 시작 시 한 번만 실행
+    try:
+        await run_in_threadpool(bootstrap_database)
+        await run_in_threadpool(warm_up_pool)
+        await warm_up_async_pool()
+    except Exception as e:
+        logger.error(f"Database bootstrap failed: {e}")
+
+@app.on_event("startup")
+async def start_replica_monitor():
+    # 읽기 전용 복제본의 지연 시간 확인 시작
+    await replica_router.start()
+
+# SQL 통계, 라우트별 요청 지표(/metrics), 쓰기 후 주 DB 고정(read-your-writes)을 한 번에 처리
+app.add_middleware(InstrumentationMiddleware)
+
+def runtime_gauges():
+    """/metrics 요청 시점의 WebSocket, DB 연결 풀, 이벤트 루프 상태"""
+    yield "websocket_connections", {}, len(websocket_manager.connection_stats)
+    yield "websocket_remote_clients", {}, len(websocket_manager.remote_clients)
+    yield "websocket_groups", {}, len(websocket_manager.group_memberships)
+    yield "websocket_dropped_messages_total", {}, websocket_manager.total_dropped
+    yield "websocket_rate_limited_frames_total", {}, websocket_manager.total_rate_limited
+    lag = websocket_manager.loop_lag.snapshot()
+    for stat in ("last", "p99", "max"):
+        yield "event_loop_lag_seconds", {"stat": stat}, lag[f"{stat}_ms"] / 1000
+    pools = [("primary", engine.pool), ("primary_async", async_engine.sync_engine.pool)]
+    for replica in replica_router.replicas:
+        pools += [(replica.name, replica.engine.pool), (f"{replica.name}_async", replica.async_engine.sync_engine.pool)]
+    for name, pool in pools:
+        if isinstance(pool, QueuePool):
+            yield "db_pool_size", {"pool": name}, pool.size()
+            yield "db_pool_checked_out", {"pool": name}, pool.checkedout()
+            yield "db_pool_overflow", {"pool": name}, max(0, pool.overflow())
+    yield "process_resident_memory_bytes", {}, process_rss_bytes()
+
+metrics.register_collector(runtime_gauges)
+# 누적 값은 게이지가 아니라 카운터로 내보냄 (rate() 계산용)
+metrics.describe("websocket_dropped_messages_total", "counter", "WebSocket messages dropped because a client's send queue was full")
+metrics.describe("websocket_rate_limited_frames_total", "counter", "Inbound WebSocket frames rejected by the per-connection rate or size limits")
+
+@app.on_event("startup")
+async def start_websocket_backplane():
+    # 워커 간 WebSocket 메시지 전달(backplane) 연결
+    await websocket_manager.start()
+
+@app.on_event("shutdown")
+async def stop_websocket_backplane():
+    await websocket_manager.stop()
+    # /ws/db 콘솔의 대상 DB 연결 풀 정리
+    console_pools.close_all()
+    # 비동기 DB 엔진 연결 풀 정리
+    await async_engine.dispose()
+    await replica_router.stop()
+
 logger.debug("--- main.py: Skipping database table creation (using migrations instead) ---")
 
 # === IMPORTANT: ROUTE ORDERING MATTERS ===
@@ -76,6 +151,7 @@ app.include_router(db_tables_router)
 app.include_router(client_ip_router)
 app.include_router(todos_router)
 app.include_router(resources_router)
+app.include_router(admin_perf_router)
 app.include_router(google_scholar_router)  # Add this line
 app.include_router(pubmed_router)  # Add PubMed router
 app.include_router(ieee_router)  # Add IEEE router
@@ -96,6 +172,11 @@ async def health_check_endpoint():
     """서버 상태 확인을 위한 엔드포인트"""
     return {"status": "ok", "message": "서버가 정상적으로 실행 중입니다."}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus 형식의 요청/지연 시간/WebSocket/DB 풀/이벤트 루프 지표"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Define specific GET routes for health and root
 @app.get("/health")
 async def health_check():
@@ -154,4 +235,15 @@ if __name__ == "__main__":
     
     logger.info("--- main.py: Starting Uvicorn server ---")
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True, log_level="info")
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        reload=True,
+        log_level="info",
+        # 프로토콜 수준 ping (python main.py로 실행할 때만 적용; 애플리케이션 ping/pong은 ConnectionManager가 처리)
+        ws_ping_interval=settings.WS_PING_INTERVAL_SECONDS,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT_SECONDS,
+        # 프로토콜 수준의 최대 프레임 크기; 그보다 작은 WS_MAX_FRAME_BYTES 초과분은 정책에 따라 처리
+        ws_max_size=settings.WS_MAX_FRAME_BYTES * 4
+    )
\ No newline at end of file
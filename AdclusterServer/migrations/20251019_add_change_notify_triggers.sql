@@ -0,0 +1,61 @@
+-- 마이그레이션: Add LISTEN/NOTIFY change triggers for real-time WebSocket events
+-- 생성 시간: 2025-10-19
+
+-- 업그레이드
+-- 변경된 행의 ID만 보내고(NOTIFY payload 8000바이트 제한) 내용은 클라이언트가 필요할 때 조회
+CREATE OR REPLACE FUNCTION adcluster_notify_change() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+
+    PERFORM pg_notify('adcluster_changes', jsonb_build_object(
+        'table', TG_TABLE_NAME,
+        'op', lower(TG_OP),
+        'id', CASE TG_TABLE_NAME
+            WHEN 'pronote' THEN row_data->>'noteid'
+            WHEN 'pronodes' THEN row_data->>'nodeid'
+            WHEN 'folders' THEN row_data->>'folderid'
+            WHEN 'mylibitems' THEN row_data->>'item_id'
+            ELSE row_data->>'id'
+        END,
+        'project', COALESCE(row_data->>'prjid', row_data->>'projectid'),
+        'note', row_data->>'noteid',
+        'node', row_data->>'nodeid',
+        'mlid', row_data->>'mlid'
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_pronote_notify ON pronote;
+CREATE TRIGGER trg_pronote_notify AFTER INSERT OR UPDATE OR DELETE ON pronote
+    FOR EACH ROW EXECUTE FUNCTION adcluster_notify_change();
+
+DROP TRIGGER IF EXISTS trg_pronodes_notify ON pronodes;
+CREATE TRIGGER trg_pronodes_notify AFTER INSERT OR UPDATE OR DELETE ON pronodes
+    FOR EACH ROW EXECUTE FUNCTION adcluster_notify_change();
+
+DROP TRIGGER IF EXISTS trg_folders_notify ON folders;
+CREATE TRIGGER trg_folders_notify AFTER INSERT OR UPDATE OR DELETE ON folders
+    FOR EACH ROW EXECUTE FUNCTION adcluster_notify_change();
+
+DROP TRIGGER IF EXISTS trg_clbcomments_notify ON clbcomments;
+CREATE TRIGGER trg_clbcomments_notify AFTER INSERT OR UPDATE OR DELETE ON clbcomments
+    FOR EACH ROW EXECUTE FUNCTION adcluster_notify_change();
+
+DROP TRIGGER IF EXISTS trg_mylibitems_notify ON mylibitems;
+CREATE TRIGGER trg_mylibitems_notify AFTER INSERT OR UPDATE OR DELETE ON mylibitems
+    FOR EACH ROW EXECUTE FUNCTION adcluster_notify_change();
+
+-- 다운그레이드 (롤백용)
+-- DROP TRIGGER IF EXISTS trg_pronote_notify ON pronote;
+-- DROP TRIGGER IF EXISTS trg_pronodes_notify ON pronodes;
+-- DROP TRIGGER IF EXISTS trg_folders_notify ON folders;
+-- DROP TRIGGER IF EXISTS trg_clbcomments_notify ON clbcomments;
+-- DROP TRIGGER IF EXISTS trg_mylibitems_notify ON mylibitems;
+-- DROP FUNCTION IF EXISTS adcluster_notify_change();
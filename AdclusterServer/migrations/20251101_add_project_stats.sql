@@ -0,0 +1,76 @@
+-- 마이그레이션: Add project_stats summary table maintained by triggers
+-- 생성 시간: 2025-11-01
+
+-- 업그레이드
+-- 프로젝트 목록(GET /api/projects)이 매 요청마다 pronote/prjuser를 조인해 COUNT(DISTINCT)
+-- 하지 않도록 노트 수와 참여자 수를 미리 계산해 둔다.
+-- 두 테이블 모두 행이 곧 하나의 노트/참여자이므로(pronote.noteid PK, prjuser UNIQUE(prjid, uid))
+-- 행 수를 세는 것으로 COUNT(DISTINCT ...)와 같은 값이 된다.
+CREATE TABLE IF NOT EXISTS project_stats (
+    prjid uuid PRIMARY KEY REFERENCES projects(prjid) ON DELETE CASCADE,
+    notes INTEGER NOT NULL DEFAULT 0,
+    users INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 증가는 upsert, 감소는 UPDATE만 한다: 프로젝트 삭제 시 CASCADE로 지워지는 pronote/prjuser 행의
+-- 트리거가 이미 삭제된 프로젝트에 대한 project_stats 행을 다시 만들지 않도록 하기 위함
+CREATE OR REPLACE FUNCTION adcluster_project_stats_add(project uuid, notes_delta integer, users_delta integer) RETURNS void AS $$
+BEGIN
+    IF notes_delta > 0 OR users_delta > 0 THEN
+        INSERT INTO project_stats AS s (prjid, notes, users)
+        VALUES (project, GREATEST(notes_delta, 0), GREATEST(users_delta, 0))
+        ON CONFLICT (prjid) DO UPDATE
+            SET notes = s.notes + EXCLUDED.notes,
+                users = s.users + EXCLUDED.users,
+                updated_at = CURRENT_TIMESTAMP;
+    ELSE
+        UPDATE project_stats
+            SET notes = GREATEST(notes + notes_delta, 0),
+                users = GREATEST(users + users_delta, 0),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE prjid = project;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION adcluster_project_stats_count() RETURNS trigger AS $$
+DECLARE
+    notes_delta integer := CASE WHEN TG_TABLE_NAME = 'pronote' THEN 1 ELSE 0 END;
+    users_delta integer := CASE WHEN TG_TABLE_NAME = 'prjuser' THEN 1 ELSE 0 END;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM adcluster_project_stats_add(OLD.prjid, -notes_delta, -users_delta);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM adcluster_project_stats_add(NEW.prjid, notes_delta, users_delta);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_pronote_project_stats ON pronote;
+CREATE TRIGGER trg_pronote_project_stats AFTER INSERT OR DELETE OR UPDATE OF prjid ON pronote
+    FOR EACH ROW EXECUTE FUNCTION adcluster_project_stats_count();
+
+DROP TRIGGER IF EXISTS trg_prjuser_project_stats ON prjuser;
+CREATE TRIGGER trg_prjuser_project_stats AFTER INSERT OR DELETE OR UPDATE OF prjid ON prjuser
+    FOR EACH ROW EXECUTE FUNCTION adcluster_project_stats_count();
+
+-- 기존 데이터로 초기값 계산
+INSERT INTO project_stats (prjid, notes, users)
+SELECT p.prjid,
+       (SELECT COUNT(*) FROM pronote n WHERE n.prjid = p.prjid),
+       (SELECT COUNT(*) FROM prjuser pu WHERE pu.prjid = p.prjid)
+FROM projects p
+ON CONFLICT (prjid) DO UPDATE
+    SET notes = EXCLUDED.notes,
+        users = EXCLUDED.users,
+        updated_at = CURRENT_TIMESTAMP;
+
+-- 다운그레이드 (롤백용)
+-- DROP TRIGGER IF EXISTS trg_pronote_project_stats ON pronote;
+-- DROP TRIGGER IF EXISTS trg_prjuser_project_stats ON prjuser;
+-- DROP FUNCTION IF EXISTS adcluster_project_stats_count();
+-- DROP FUNCTION IF EXISTS adcluster_project_stats_add(uuid, integer, integer);
+-- DROP TABLE IF EXISTS project_stats;
@@ -0,0 +1,45 @@
+-- 마이그레이션: Add indexes for the filters and sort keys the API routers use
+-- 생성 시간: 2025-11-02
+
+-- 업그레이드
+-- CONCURRENTLY: 운영 중 테이블 쓰기를 막지 않도록 함. 트랜잭션 블록 밖에서 실행해야 한다
+-- (psql -f 로 실행, BEGIN/COMMIT으로 감싸지 말 것).
+-- IF NOT EXISTS: 이전 스키마에서 같은 이름으로 만든 인덱스가 있으면 건너뜀.
+-- 확인: python test/explain_indexes.py
+
+-- 프로젝트 목록의 project_stats 조인, 노트 조회 (pronote.prjid)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pronote_prjid ON pronote (prjid);
+
+-- 프로젝트 참여자 수 트리거, 참여자 조회 (prjuser.prjid)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prjuser_prjid ON prjuser (prjid);
+
+-- GET /api/projects: 키셋 페이지네이션 정렬 키 (created_at DESC, prjid DESC)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_created_at_prjid ON projects (created_at DESC, prjid DESC);
+
+-- GET /api/resources: 자료실별 목록, (created_at, item_id) 순 키셋 페이지네이션
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_mylibitems_mlid_created_at ON mylibitems (mlid, created_at, item_id);
+
+-- GET /api/todos: 사용자별 목록, 최신순
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_simple_todos_user_id_created_at ON simple_todos (user_id, created_at);
+
+-- GET /api/user-schedules, /today/{user_id}: 삭제되지 않은 일정만 조회하므로 부분 인덱스
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_schedules_userid_startday_active ON user_schedules (us_userid, us_startday)
+    WHERE us_isdeleted = false;
+
+-- GET /api/folders/project/{project_id}: 활성 폴더를 이름순으로 조회 (부분 인덱스)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_folders_projectid_active ON folders (projectid, foldername)
+    WHERE is_active;
+
+-- GET /api/client-ip/list: 최근 접속순 키셋 페이지네이션 (last_seen DESC, id DESC)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_client_ips_last_seen ON client_ips (last_seen DESC, id DESC);
+
+-- 다운그레이드 (롤백용)
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_client_ips_last_seen;
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_folders_projectid_active;
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_user_schedules_userid_startday_active;
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_simple_todos_user_id_created_at;
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_mylibitems_mlid_created_at;
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_projects_created_at_prjid;
+-- 아래 두 인덱스는 이전 스키마에도 있었으므로 유지
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_prjuser_prjid;
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_pronote_prjid;
@@ -0,0 +1,47 @@
+-- 마이그레이션: Add list_versions change counters bumped by statement triggers
+-- 생성 시간: 2025-11-03
+
+-- 업그레이드
+-- GET /api/projects 는 목록을 읽기 전에 버전을 확인해 If-None-Match에 304로 답한다.
+-- projects/project_stats 전체를 count/max로 훑지 않도록, 목록에 영향을 주는 테이블이
+-- 바뀔 때마다 트리거가 list_versions의 카운터를 올리고 API는 그 한 행만 읽는다.
+-- 문장(STATEMENT) 단위 트리거라 여러 행을 바꾸는 문장도 한 번만 올린다.
+-- 카운터 행은 커밋할 때까지 잠기므로 같은 목록에 쓰는 트랜잭션은 짧게 직렬화된다.
+CREATE TABLE IF NOT EXISTS list_versions (
+    name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION adcluster_bump_list_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO list_versions AS v (name, version)
+    VALUES (TG_ARGV[0], 1)
+    ON CONFLICT (name) DO UPDATE
+        SET version = v.version + 1,
+            updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 프로젝트 목록: 프로젝트 행, 노트/참여자 수(project_stats), 생성자 이름(users.uname)
+DROP TRIGGER IF EXISTS trg_projects_list_version ON projects;
+CREATE TRIGGER trg_projects_list_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON projects
+    FOR EACH STATEMENT EXECUTE FUNCTION adcluster_bump_list_version('projects');
+
+DROP TRIGGER IF EXISTS trg_project_stats_list_version ON project_stats;
+CREATE TRIGGER trg_project_stats_list_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON project_stats
+    FOR EACH STATEMENT EXECUTE FUNCTION adcluster_bump_list_version('projects');
+
+DROP TRIGGER IF EXISTS trg_users_projects_list_version ON users;
+CREATE TRIGGER trg_users_projects_list_version AFTER UPDATE OF uname ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION adcluster_bump_list_version('projects');
+
+INSERT INTO list_versions (name) VALUES ('projects') ON CONFLICT (name) DO NOTHING;
+
+-- 다운그레이드 (롤백용)
+-- DROP TRIGGER IF EXISTS trg_users_projects_list_version ON users;
+-- DROP TRIGGER IF EXISTS trg_project_stats_list_version ON project_stats;
+-- DROP TRIGGER IF EXISTS trg_projects_list_version ON projects;
+-- DROP FUNCTION IF EXISTS adcluster_bump_list_version();
+-- DROP TABLE IF EXISTS list_versions;
@@ -0,0 +1,22 @@
+-- 마이그레이션: Make projects.created_at and mylibitems.created_at NOT NULL
+-- 생성 시간: 2025-11-04
+
+-- 업그레이드
+-- GET /api/projects, /api/resources 는 (created_at, 기본키) 키셋으로 페이지를 넘긴다.
+-- created_at이 NULL인 행이 페이지 마지막에 오면 커서 비교가 NULL이 되어 다음 페이지가
+-- 비어 버리므로, 기존 NULL을 채우고 NOT NULL로 바꾼다. 생성 시각을 모르는 행은
+-- 가장 오래된 것으로 취급한다(epoch). ORM 밖에서 넣는 행을 위해 기본값도 둔다.
+-- SET NOT NULL은 테이블 전체를 확인하는 동안 쓰기를 막으므로 한가한 시간에 실행할 것.
+UPDATE projects SET created_at = COALESCE(update_at, 'epoch') WHERE created_at IS NULL;
+ALTER TABLE projects ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE projects ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE mylibitems SET created_at = COALESCE(updated_at, 'epoch') WHERE created_at IS NULL;
+ALTER TABLE mylibitems ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE mylibitems ALTER COLUMN created_at SET NOT NULL;
+
+-- 다운그레이드 (롤백용)
+-- ALTER TABLE mylibitems ALTER COLUMN created_at DROP NOT NULL;
+-- ALTER TABLE mylibitems ALTER COLUMN created_at DROP DEFAULT;
+-- ALTER TABLE projects ALTER COLUMN created_at DROP NOT NULL;
+-- ALTER TABLE projects ALTER COLUMN created_at DROP DEFAULT;
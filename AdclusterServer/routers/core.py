@@ -4,6 +4,7 @@ import httpx
 import logging
 import os
 from app.core.dependencies import get_current_user
+from app.core.metrics import upstream_hooks
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ async def search_core(
         logger.info(f"CORE API 요청 URL: {core_url}")
         logger.info(f"CORE API 요청 파라미터: {params}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("core")) as client:
             response = await client.get(core_url, params=params)
             
             logger.info(f"CORE API 응답 상태: {response.status_code}")
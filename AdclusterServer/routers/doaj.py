@@ -4,6 +4,7 @@ import httpx
 import logging
 import os
 from app.core.dependencies import get_current_user
+from app.core.metrics import upstream_hooks
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -50,7 +51,7 @@ async def search_doaj(
         logger.info(f"DOAJ API 요청: {doaj_url} with params: {params}")
         
         # DOAJ API 호출
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=upstream_hooks("doaj")) as client:
             response = await client.get(
                 doaj_url,
                 params=params,
@@ -4,6 +4,7 @@ import os
 from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.dependencies import get_current_user
+from app.core.metrics import requests_hooks
 from typing import Optional, Dict, Any, List
 
 # 로거 설정
@@ -122,7 +123,7 @@ async def search_scopus(
         
         # 실제 API 호출
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = requests.get(url, headers=headers, params=params, timeout=30, hooks=requests_hooks("scopus"))
             
             if response.status_code == 200:
                 data = response.json()
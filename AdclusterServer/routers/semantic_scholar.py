@@ -4,6 +4,7 @@ import httpx
 import logging
 import os
 from app.core.dependencies import get_current_user
+from app.core.metrics import upstream_hooks
 from typing import List, Dict, Any, Optional
 import asyncio
 
@@ -70,7 +71,7 @@ async def search_semantic_scholar(
         
         logger.info(f"Semantic Scholar API 요청: {url} with params: {params}")
         
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
+        async with httpx.AsyncClient(timeout=TIMEOUT, event_hooks=upstream_hooks("semantic_scholar")) as client:
             response = await client.get(url, params=params)
             
             logger.info(f"Semantic Scholar API 응답 상태: {response.status_code}")
@@ -1,6 +1,7 @@
 import logging
 from fastapi import APIRouter, HTTPException, Depends, Query
 from app.core.dependencies import get_current_user
+from app.core.metrics import requests_hooks
 import requests
 import os
 from typing import Optional
@@ -81,7 +82,7 @@ async def search_wos(
         logger.info(f"Request params: {params}")
         
         # Web of Science API 호출
-        response = requests.get(url, params=params, headers=headers, timeout=30)
+        response = requests.get(url, params=params, headers=headers, timeout=30, hooks=requests_hooks("web_of_science"))
         
         logger.info(f"Web of Science API response status: {response.status_code}")
         
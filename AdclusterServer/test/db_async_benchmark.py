@@ -0,0 +1,121 @@
+"""Compare a sync-session endpoint with an async-session endpoint under load.
+
+Fires concurrent GET requests at each path in turn while a probe keeps polling
+/ws/metrics, which never touches the database. When a route runs blocking DB
+calls on the event loop the probe latency (and the server's event_loop_lag)
+climbs with the load; routes on get_async_db should leave it flat.
+
+Run the server first (python main.py), then for example:
+
+    python test/db_async_benchmark.py --token <access token> --concurrency 50 --duration 10
+
+The defaults compare /users/ (still on get_db) with /api/todos/ (get_async_db).
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(values, scale=1000.0):
+    """p50/p95/p99/max of a list of seconds, in milliseconds"""
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * scale, 2),
+        "p95_ms": round(percentile(values, 0.95) * scale, 2),
+        "p99_ms": round(percentile(values, 0.99) * scale, 2),
+        "max_ms": round(max(values) * scale, 2) if values else 0.0,
+    }
+
+
+def fetch(url, token=None, timeout=30):
+    request = urllib.request.Request(url)
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def server_loop_lag(base_url):
+    try:
+        _, body = fetch(f"{base_url}/ws/metrics?details=false", timeout=5)
+        return json.loads(body).get("event_loop_lag")
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run_phase(base_url, path, token, concurrency, duration):
+    deadline = time.monotonic() + duration
+    latencies, probe_latencies = [], []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                fetch(f"{base_url}{path}", token)
+                with lock:
+                    latencies.append(time.monotonic() - started)
+            except Exception:
+                with lock:
+                    errors += 1
+
+    def probe():
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                fetch(f"{base_url}/ws/metrics?details=false")
+                probe_latencies.append(time.monotonic() - started)
+            except Exception:
+                pass
+            time.sleep(0.05)
+
+    with ThreadPoolExecutor(max_workers=concurrency + 1) as pool:
+        pool.submit(probe)
+        for _ in range(concurrency):
+            pool.submit(worker)
+
+    return {
+        "path": path,
+        "requests_per_second": round(len(latencies) / duration, 1),
+        "errors": errors,
+        "latency": summarize(latencies),
+        "probe_latency": summarize(probe_latencies),
+        "server_event_loop_lag": server_loop_lag(base_url),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync vs async DB session benchmark")
+    parser.add_argument("--url", default="http://localhost:8000", help="Server base URL")
+    parser.add_argument("--token", help="Bearer token for authenticated paths")
+    parser.add_argument("--sync-path", default="/users/", help="Endpoint that uses get_db")
+    parser.add_argument("--async-path", default="/api/todos/", help="Endpoint that uses get_async_db")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per phase")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = {
+        "concurrency": arguments.concurrency,
+        "sync": run_phase(arguments.url, arguments.sync_path, arguments.token, arguments.concurrency, arguments.duration),
+        "async": run_phase(arguments.url, arguments.async_path, arguments.token, arguments.concurrency, arguments.duration),
+    }
+    print(json.dumps(report, indent=2))
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(report, output, indent=2)
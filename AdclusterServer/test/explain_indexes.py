@@ -0,0 +1,141 @@
+"""Check that the router queries on hot list paths are served by an index.
+
+Runs EXPLAIN (FORMAT JSON) for the query each router builds, with sample
+parameters, and asserts the expected index from
+migrations/20251102_add_hot_path_indexes.sql appears in the plan. On small
+development tables the planner prefers a sequential scan anyway, so by default
+sequential scans are disabled for the check (the question is whether an index
+*can* serve the query); pass --natural to see the plans the planner would
+really choose.
+
+Needs the PostgreSQL database from .env (not USE_SQLITE):
+
+    python test/explain_indexes.py
+"""
+import argparse
+import json
+import sys
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_, select, tuple_
+
+from app.core.database import engine
+from app.models.client_ip import ClientIP
+from app.models.folder import Folder
+from app.models.my_lib_items import MyLibItem
+from app.models.simple_todo import SimpleTodo
+from app.models.user_schedule import UserSchedule
+
+# Core tables: the statements need no mapper configuration
+client_ips, folders, mylibitems = ClientIP.__table__.c, Folder.__table__.c, MyLibItem.__table__.c
+simple_todos, user_schedules = SimpleTodo.__table__.c, UserSchedule.__table__.c
+
+SAMPLE_UUID = str(uuid.uuid4())
+SAMPLE_TIME = datetime(2025, 1, 1)
+START, END = date(2025, 1, 1), date(2025, 1, 31)
+
+
+def project_list_sql():
+    # Same statement as app/routers/projects.py get_projects with a cursor
+    return """
+        SELECT p.prjid, p.crtid, u.uname, p.title, p.description, p.start_date, p.created_at,
+               COALESCE(p.status, 'begin') AS status, COALESCE(s.notes, 0) AS notes, COALESCE(s.users, 0) AS users
+        FROM projects p
+        JOIN users u ON p.crtid = u.uid
+        LEFT JOIN project_stats s ON s.prjid = p.prjid
+        WHERE p.visibility IN ('company', 'team', 'private')
+          AND (p.end_date IS NULL OR p.end_date > CURRENT_DATE)
+          AND (p.created_at, p.prjid) < (%(created_at)s, %(prjid)s::uuid)
+        ORDER BY p.created_at DESC, p.prjid DESC
+        LIMIT 100
+    """, {"created_at": SAMPLE_TIME, "prjid": SAMPLE_UUID}
+
+
+def compiled(statement):
+    statement = statement.compile(dialect=engine.dialect)
+    return str(statement), statement.params
+
+
+# (name, expected index, function returning (sql, params))
+CASES = [
+    ("GET /api/projects/", "idx_projects_created_at_prjid", project_list_sql),
+    ("project note counts (pronote.prjid)", "idx_pronote_prjid",
+     lambda: ("SELECT count(*) FROM pronote WHERE prjid = %(prjid)s::uuid", {"prjid": SAMPLE_UUID})),
+    ("project member counts (prjuser.prjid)", "idx_prjuser_prjid",
+     lambda: ("SELECT count(*) FROM prjuser WHERE prjid = %(prjid)s::uuid", {"prjid": SAMPLE_UUID})),
+    ("GET /api/resources/", "idx_mylibitems_mlid_created_at", lambda: compiled(
+        select(MyLibItem.__table__).where(mylibitems.mlid == SAMPLE_UUID)
+        .where(tuple_(mylibitems.created_at, mylibitems.item_id) > tuple_(SAMPLE_TIME, SAMPLE_UUID))
+        .order_by(mylibitems.created_at, mylibitems.item_id).limit(100)
+    )),
+    ("GET /api/todos/", "idx_simple_todos_user_id_created_at", lambda: compiled(
+        select(SimpleTodo.__table__).where(simple_todos.user_id == SAMPLE_UUID).order_by(simple_todos.created_at.desc())
+    )),
+    ("GET /api/user-schedules/", "idx_user_schedules_userid_startday_active", lambda: compiled(
+        select(UserSchedule.__table__).where(and_(user_schedules.us_userid == 1, user_schedules.us_isdeleted == False))
+        .where(or_(
+            and_(user_schedules.us_startday >= START, user_schedules.us_startday <= END),
+            and_(user_schedules.us_endday >= START, user_schedules.us_endday <= END),
+            and_(user_schedules.us_startday <= START, user_schedules.us_endday >= END)
+        ))
+        .order_by(user_schedules.us_startday, user_schedules.us_starttime)
+    )),
+    ("GET /api/folders/project/{project_id}", "idx_folders_projectid_active", lambda: compiled(
+        select(Folder.__table__).where(folders.projectid == SAMPLE_UUID, folders.is_active == True).order_by(folders.foldername)
+    )),
+    ("GET /api/client-ip/list", "idx_client_ips_last_seen", lambda: compiled(
+        select(ClientIP.__table__).where(tuple_(client_ips.last_seen, client_ips.id) < tuple_(SAMPLE_TIME, 1 << 30))
+        .order_by(client_ips.last_seen.desc(), client_ips.id.desc()).limit(100)
+    )),
+]
+
+
+def index_names(plan):
+    """Every index a plan node (or one of its children) reads"""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the router queries and check their indexes")
+    parser.add_argument("--natural", action="store_true", help="Keep sequential scans enabled")
+    parser.add_argument("--verbose", action="store_true", help="Print each plan")
+    arguments = parser.parse_args()
+
+    failures = 0
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        if not arguments.natural:
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for name, expected, build in CASES:
+            sql, params = build()
+            try:
+                result = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+            except Exception as e:
+                print(f"ERROR {name}: {e}")
+                failures += 1
+                transaction.rollback()
+                transaction = connection.begin()
+                if not arguments.natural:
+                    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                continue
+            plan = (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+            used = index_names(plan)
+            ok = expected in used
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {name}: expected {expected}, plan uses {sorted(used) or 'no index'}")
+            if arguments.verbose:
+                print(json.dumps(plan, indent=2))
+        transaction.rollback()
+
+    print(f"\n{len(CASES) - failures}/{len(CASES)} queries use their index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.core.auth_cache import UserCache
+
+def make_user(role="user"):
+    return SimpleNamespace(uid=uuid.uuid4(), uemail="a@example.com", uname="alice", uactive=True, urole=role, uisdel=False, upassword="hash")
+
+def test_hit_and_projection():
+    cache = UserCache(10, 60)
+    user = make_user()
+    cached = cache.put("token-1", user)
+    assert cache.get("token-1") is cached
+    assert cached.uid == user.uid and cached.urole == "user"
+    # The password hash is not part of the projection
+    assert not hasattr(cached, "upassword")
+    assert cache.get("unknown") is None
+
+def test_invalidate_user_drops_all_tokens():
+    cache = UserCache(10, 60)
+    user, other = make_user(), make_user()
+    cache.put("token-1", user)
+    cache.put("token-2", user)
+    cache.put("token-3", other)
+    notified = []
+    cache.on_invalidate = notified.append
+    cache.invalidate_user(user.uid)
+    assert cache.get("token-1") is None and cache.get("token-2") is None
+    assert cache.get("token-3") is not None
+    assert notified == [str(user.uid)]
+
+def test_lookup_racing_an_invalidation_is_not_cached():
+    cache = UserCache(10, 60)
+    user = make_user()
+    generation = cache.generation(user.uid)
+    # Blocked by an admin while the row was being read
+    cache.invalidate_user(user.uid)
+    cached = cache.put("token-1", user, generation=generation)
+    assert cached.uid == user.uid
+    assert cache.get("token-1") is None
+    cache.put("token-1", user, generation=cache.generation(user.uid))
+    assert cache.get("token-1") is not None
+
+def test_expiry_and_size_bound():
+    cache = UserCache(2, 60)
+    user = make_user()
+    # Never cached past the token's own expiry
+    cache.put("expired", user, datetime.utcnow() - timedelta(seconds=1))
+    assert cache.get("expired") is None
+    for token in ["a", "b", "c"]:
+        cache.put(token, user)
+    assert cache.get("a") is None
+    assert len(cache.entries) == 2
+    assert cache.tokens_by_user[str(user.uid)] == {"b", "c"}
+
+def test_disabled_with_zero_ttl():
+    cache = UserCache(10, 0)
+    cache.put("token", make_user())
+    assert cache.get("token") is None
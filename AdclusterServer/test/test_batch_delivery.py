@@ -0,0 +1,44 @@
+import asyncio
+import websockets
+import requests
+
+async def receive_matching(websocket, text, timeout=2.0):
+    """Skip presence and client list updates until a message containing `text` arrives"""
+    while True:
+        message = await asyncio.wait_for(websocket.recv(), timeout=timeout)
+        if text in message:
+            return message
+
+async def test_batch_delivery():
+    async with websockets.connect("ws://localhost:8000/ws/501/batch-a") as client1:
+        async with websockets.connect("ws://localhost:8000/ws/batch-502/batch-b") as client2:
+            # Test 1: several private messages in one HTTP call
+            print("\n--- Test 1: batched private messages ---")
+            response = requests.post(
+                "http://localhost:8000/ws/send_to_batch",
+                json={"messages": [
+                    {"client_id": 501, "message": "Hello 501"},
+                    {"client_id": "batch-502", "message": "Hello 502"},
+                    {"client_id": "nobody", "message": "Lost"}
+                ]}
+            )
+            data = response.json()
+            print(f"HTTP response: {data}")
+            assert [result["status"] for result in data["results"]] == ["sent", "sent", "not_found"]
+            print(f"Client 501 received: {await receive_matching(client1, 'Hello 501')}")
+            print(f"Client batch-502 received: {await receive_matching(client2, 'Hello 502')}")
+
+            # Test 2: one message to several groups in one HTTP call
+            print("\n--- Test 2: batched group broadcast ---")
+            response = requests.post(
+                "http://localhost:8000/ws/broadcast_to_groups_batch",
+                json={"groups": ["batch-a", "batch-b"], "message": "Maintenance at 18:00"}
+            )
+            data = response.json()
+            print(f"HTTP response: {data}")
+            assert all(result["status"] == "sent" for result in data["results"])
+            print(f"Client 501 received: {await receive_matching(client1, 'Maintenance')}")
+            print(f"Client batch-502 received: {await receive_matching(client2, 'Maintenance')}")
+
+if __name__ == "__main__":
+    asyncio.run(test_batch_delivery())
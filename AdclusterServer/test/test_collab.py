@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from app.core import collab
+from app.core.collab import CollabService
+
+
+class Cluster:
+    """CollabServices wired to each other as if over the backplane"""
+
+    def __init__(self, count):
+        self.services = []
+        for index in range(count):
+            worker = f"w{index}"
+            service = CollabService(
+                lambda worker=worker: worker,
+                self.publish,
+                lambda group, payload, skip: None,
+                lambda group: 1,
+                lambda worker=worker: {f"w{other}" for other in range(count)} - {worker}
+            )
+            self.services.append(service)
+
+    async def publish(self, message):
+        for service in self.services:
+            await service.handle_backplane_message(message)
+
+
+def test_single_worker_loads_without_waiting(monkeypatch):
+    monkeypatch.setattr(collab, "_read_note_text", lambda note_id: "from db")
+
+    async def scenario():
+        service = Cluster(1).services[0]
+        started = time.monotonic()
+        document = await service._load("n1")
+        return document.text, time.monotonic() - started
+
+    text, elapsed = asyncio.run(scenario())
+    assert text == "from db"
+    assert elapsed < collab.STATE_REQUEST_TIMEOUT / 2
+
+
+def test_loads_from_database_once_every_worker_answered(monkeypatch):
+    monkeypatch.setattr(collab, "_read_note_text", lambda note_id: "from db")
+
+    async def scenario():
+        first = Cluster(3).services[0]
+        started = time.monotonic()
+        document = await first._load("n1")
+        return document.text, time.monotonic() - started
+
+    text, elapsed = asyncio.run(scenario())
+    assert text == "from db"
+    assert elapsed < collab.STATE_REQUEST_TIMEOUT / 2
+
+
+def test_takes_the_open_copy_of_another_worker(monkeypatch):
+    monkeypatch.setattr(collab, "_read_note_text", lambda note_id: "from db")
+
+    async def scenario():
+        cluster = Cluster(2)
+        cluster.services[1].documents["n1"] = collab.NoteDocument("n1", "edited", 7)
+        return await cluster.services[0]._load("n1")
+
+    document = asyncio.run(scenario())
+    assert (document.text, document.revision) == ("edited", 7)
+
+
+def test_closed_and_failed_notes_leave_no_load_lock(monkeypatch):
+    monkeypatch.setattr(collab.settings, "COLLAB_SAVE_IDLE_SECONDS", 0.01)
+    monkeypatch.setattr(CollabService, "_save", lambda self, document: None)
+
+    def unreadable(note_id):
+        if note_id == "broken":
+            raise RuntimeError("database down")
+        return "from db"
+
+    monkeypatch.setattr(collab, "_read_note_text", unreadable)
+
+    async def scenario():
+        service = CollabService(lambda: "w0", None, lambda group, payload, skip: None, lambda group: 0, set)
+        await service.open("n1")
+        try:
+            await service.open("broken")
+        except RuntimeError:
+            pass
+        # No local editor is left, so maintenance closes n1
+        await asyncio.sleep(0.1)
+        return service.documents, service.load_locks
+
+    documents, load_locks = asyncio.run(scenario())
+    assert documents == {} and load_locks == {}
@@ -0,0 +1,63 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, accepted_encodings, choose_encoding, is_compressible
+
+BIG = "x" * 4096
+
+def make_client():
+    app = Starlette()
+
+    @app.route("/big")
+    async def big(request):
+        return PlainTextResponse(BIG)
+
+    @app.route("/small")
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    @app.route("/image")
+    async def image(request):
+        return Response(b"\x89PNG" + b"0" * 4096, media_type="image/png")
+
+    @app.route("/stream")
+    async def stream(request):
+        async def chunks():
+            for _ in range(4):
+                yield BIG
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+def test_accept_encoding_parsing():
+    assert accepted_encodings("gzip, deflate;q=0.5, br;q=0") == {"gzip", "deflate"}
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=1.0") == "gzip"
+
+def test_only_text_like_bodies_are_compressible():
+    assert is_compressible("application/json")
+    assert is_compressible("text/html; charset=utf-8")
+    assert is_compressible("application/problem+json")
+    assert not is_compressible("image/png")
+    assert not is_compressible("text/event-stream")
+
+def test_gzip_above_minimum_size():
+    client = make_client()
+    # The test client decodes the body; Content-Length is the compressed size
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.text == BIG
+    for path in ("/small", "/image"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+def test_streamed_response_is_compressed_in_chunks():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == BIG * 4
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+
+def request_with(if_none_match=None):
+    headers = {} if if_none_match is None else {"if-none-match": if_none_match}
+    return SimpleNamespace(headers=headers)
+
+def test_etag_depends_on_every_part():
+    etag = make_etag("folders", "p1", 3, "2025-09-01 12:00:00")
+    assert etag.startswith('W/"')
+    assert etag == make_etag("folders", "p1", 3, "2025-09-01 12:00:00")
+    assert etag != make_etag("folders", "p1", 4, "2025-09-01 12:00:00")
+    assert etag != make_etag("folders", "p2", 3, "2025-09-01 12:00:00")
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("projects", 1)
+    assert not etag_matches(request_with(), etag)
+    assert etag_matches(request_with(etag), etag)
+    assert etag_matches(request_with(etag[2:]), etag)
+    assert etag_matches(request_with(f'"other", {etag}'), etag)
+    assert etag_matches(request_with("*"), etag)
+    assert not etag_matches(request_with(make_etag("projects", 2)), etag)
+
+def test_not_modified_carries_the_etag():
+    etag = make_etag("pro-nodes", 1)
+    response = not_modified(etag)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert not response.body
+    holder = SimpleNamespace(headers={})
+    set_etag(holder, etag)
+    assert holder.headers["ETag"] == etag
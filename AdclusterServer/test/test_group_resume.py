@@ -0,0 +1,38 @@
+import asyncio
+import websockets
+import json
+
+async def receive_until(websocket, predicate, timeout=2.0):
+    while True:
+        message = await asyncio.wait_for(websocket.recv(), timeout=timeout)
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            continue
+        if predicate(data):
+            return data
+
+async def test_resume_after_reconnect():
+    group = "resume-test"
+    async with websockets.connect(f"ws://localhost:8000/ws/401/{group}?format=json") as listener:
+        async with websockets.connect(f"ws://localhost:8000/ws/402/{group}") as sender:
+            await sender.send("/group first")
+            data = await receive_until(listener, lambda d: d.get("type") == "group_message")
+            last_seq = data["seq"]
+            print(f"Listener saw seq {last_seq}: {data['message']}")
+    
+    # Messages sent while the listener is away
+    async with websockets.connect(f"ws://localhost:8000/ws/402/{group}") as sender:
+        for i in range(3):
+            await sender.send(f"/group missed {i}")
+        await asyncio.sleep(0.5)
+        
+        async with websockets.connect(f"ws://localhost:8000/ws/401/{group}?format=json") as listener:
+            await listener.send(json.dumps({"op": "resume", "group": group, "after": last_seq, "id": "resume"}))
+            reply = await receive_until(listener, lambda d: d.get("id") == "resume")
+            for message in reply["data"]["messages"]:
+                print(f"Recovered seq {message['seq']}: {message['message']}")
+            print(f"Truncated: {reply['data']['truncated']}")
+
+if __name__ == "__main__":
+    asyncio.run(test_resume_after_reconnect())
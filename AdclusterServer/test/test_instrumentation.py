@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.metrics import metrics
+
+app = FastAPI()
+app.add_middleware(InstrumentationMiddleware)
+
+@app.get("/items/{item_id}")
+async def read_item(item_id: int):
+    return {"item_id": item_id}
+
+@app.get("/broken")
+async def broken():
+    raise RuntimeError("boom")
+
+def request_count(route, status):
+    key = (("method", "GET"), ("route", route), ("status", status))
+    return metrics.counters.get("http_requests_total", {}).get(key, 0)
+
+def test_requests_are_recorded_per_route_template():
+    client = TestClient(app, raise_server_exceptions=False)
+    before = request_count("/items/{item_id}", "200")
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert request_count("/items/{item_id}", "200") == before + 2
+
+    before = request_count("/broken", "500")
+    assert client.get("/broken").status_code == 500
+    assert request_count("/broken", "500") == before + 1
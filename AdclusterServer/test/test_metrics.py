@@ -0,0 +1,30 @@
+from app.core.metrics import MetricsRegistry
+
+def test_counter_and_histogram_exposition():
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests")
+    registry.inc("requests_total", route="/api/projects/", status="200")
+    registry.inc("requests_total", route="/api/projects/", status="200")
+    registry.observe("latency_seconds", 0.02, buckets=(0.01, 0.1), route="/a")
+    registry.observe("latency_seconds", 5.0, buckets=(0.01, 0.1), route="/a")
+    text = registry.render()
+    assert "# HELP requests_total Requests\n# TYPE requests_total counter" in text
+    assert 'requests_total{route="/api/projects/",status="200"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.01"} 0' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/a"} 2' in text
+
+def test_collected_gauges_and_label_escaping():
+    registry = MetricsRegistry()
+    registry.register_collector(lambda: [("websocket_connections", {}, 3), ("db_pool_checked_out", {"pool": 'a"b'}, 1)])
+    text = registry.render()
+    assert "# TYPE websocket_connections gauge\nwebsocket_connections 3" in text
+    assert 'db_pool_checked_out{pool="a\\"b"} 1' in text
+
+def test_collected_counters_keep_their_type():
+    registry = MetricsRegistry()
+    registry.describe("websocket_dropped_messages_total", "counter", "Dropped messages")
+    registry.register_collector(lambda: [("websocket_dropped_messages_total", {}, 7)])
+    text = registry.render()
+    assert "# TYPE websocket_dropped_messages_total counter\nwebsocket_dropped_messages_total 7" in text
@@ -0,0 +1,48 @@
+import random
+
+from app.core.ot import apply, changed_range, transform
+
+def random_operation(document):
+    operation = []
+    position = 0
+    while position < len(document):
+        length = random.randint(1, len(document) - position)
+        choice = random.random()
+        if choice < 0.4:
+            operation.append(length)
+            position += length
+        elif choice < 0.7:
+            operation.append(-length)
+            position += length
+        else:
+            operation.append(random.choice(["x", "yz", "한"]))
+    if random.random() < 0.3:
+        operation.append("end")
+    return operation
+
+def test_concurrent_inserts():
+    document = "hello world"
+    a = ["A", 11]
+    b = [11, "B"]
+    a_prime, b_prime = transform(a, b)
+    assert apply(apply(document, a), b_prime) == "Ahello worldB"
+    assert apply(apply(document, b), a_prime) == "Ahello worldB"
+
+def test_transform_converges():
+    random.seed(32)
+    for _ in range(5000):
+        document = "".join(random.choice("abcdef") for _ in range(random.randint(0, 12)))
+        a = random_operation(document)
+        b = random_operation(document)
+        a_prime, b_prime = transform(a, b)
+        assert apply(apply(document, a), b_prime) == apply(apply(document, b), a_prime)
+
+def test_changed_range():
+    assert changed_range([3, "abc", -2, 4]) == (3, 6)
+    assert changed_range([5]) == (0, 0)
+
+if __name__ == "__main__":
+    test_concurrent_inserts()
+    test_transform_converges()
+    test_changed_range()
+    print("OT tests passed")
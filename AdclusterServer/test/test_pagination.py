@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, set_next_cursor
+
+def test_cursor_round_trip():
+    values = [datetime(2025, 9, 1, 12, 30, tzinfo=timezone.utc), uuid.uuid4(), Decimal("1.50"), 7, "x"]
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+def test_invalid_cursor_is_rejected():
+    for cursor in ["garbage", "", encode_cursor([1])]:
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(cursor, 2)
+        assert error.value.status_code == 400
+
+def test_next_cursor_only_on_full_pages():
+    response = SimpleNamespace(headers={})
+    assert set_next_cursor(response, [1, 2], 3, lambda row: (row,)) is None
+    assert NEXT_CURSOR_HEADER not in response.headers
+    cursor = set_next_cursor(response, [1, 2, 3], 3, lambda row: (row,))
+    assert response.headers[NEXT_CURSOR_HEADER] == cursor
+    assert decode_cursor(cursor, 1) == [3]
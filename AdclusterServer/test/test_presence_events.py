@@ -0,0 +1,62 @@
+import asyncio
+import websockets
+import json
+
+async def receive_until(websocket, message_type, timeout=2.0):
+    """Read messages until one with the given JSON type arrives"""
+    while True:
+        message = await asyncio.wait_for(websocket.recv(), timeout=timeout)
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            print(f"Text message: {message}")
+            continue
+        if data.get("type") == message_type:
+            return data
+
+async def test_presence_events():
+    uri = "ws://localhost:8000/ws/201/presence-test"
+    async with websockets.connect(uri) as watcher:
+        # The new connection receives a full snapshot first
+        snapshot = await receive_until(watcher, "client_list")
+        print(f"Initial snapshot: {len(snapshot['clients'])} clients")
+        
+        # Other connections only produce presence deltas
+        async with websockets.connect("ws://localhost:8000/ws/202/presence-test") as other:
+            presence = await receive_until(watcher, "presence")
+            print(f"Presence events: {[event['event'] for event in presence['events']]}")
+            print(f"Changed groups: {presence['groups']}")
+            
+            await other.send("/join presence-extra")
+            presence = await receive_until(watcher, "presence")
+            print(f"Presence events after join: {[event['event'] for event in presence['events']]}")
+        
+        presence = await receive_until(watcher, "presence")
+        print(f"Presence events after disconnect: {[event['event'] for event in presence['events']]}")
+        
+        # A full snapshot is still available on demand
+        await watcher.send("/clients")
+        snapshot = await receive_until(watcher, "client_list")
+        print(f"On-demand snapshot: {len(snapshot['clients'])} clients")
+
+async def test_connection_storm():
+    # Connections that come and go inside one debounce window are coalesced away
+    async with websockets.connect("ws://localhost:8000/ws/301/storm-test") as watcher:
+        await receive_until(watcher, "client_list")
+        for i in range(20):
+            async with websockets.connect(f"ws://localhost:8000/ws/{400 + i}"):
+                pass
+        try:
+            presence = await receive_until(watcher, "presence", timeout=1.0)
+            print(f"Storm produced {len(presence['events'])} presence events")
+        except asyncio.TimeoutError:
+            print("Storm was fully coalesced (no presence message)")
+
+async def main():
+    print("Testing presence events...")
+    await test_presence_events()
+    print("\n" + "="*50 + "\n")
+    await test_connection_storm()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+from app.core.rate_limit import ALLOW, DISCONNECT, DROP, THROTTLE, TOO_LARGE, InboundLimiter, TokenBucket
+
+def test_bucket_refills_at_rate():
+    bucket = TokenBucket(10, 10)
+    bucket.updated_at = 0.0
+    bucket.consume(10, now=0.0)
+    assert bucket.wait_time(1, now=0.0) == 0.1
+    assert bucket.wait_time(1, now=0.5) == 0.0
+    assert bucket.tokens == 5
+
+def test_burst_then_policies():
+    for policy, over_limit in [("drop", DROP), ("disconnect", DISCONNECT)]:
+        limiter = InboundLimiter(5, 5, 0, 0, 1024, policy)
+        decisions = [limiter.check(10)[0] for _ in range(6)]
+        assert decisions == [ALLOW] * 5 + [over_limit]
+        assert limiter.limited == 1
+
+    limiter = InboundLimiter(5, 5, 0, 0, 1024, "throttle")
+    for _ in range(5):
+        limiter.check(10)
+    decision, wait = limiter.check(10)
+    assert decision == THROTTLE and 0 < wait <= 0.2
+
+def test_byte_limit_and_frame_cap():
+    limiter = InboundLimiter(0, 0, 100, 100, 1000, "drop")
+    assert limiter.check(100)[0] == ALLOW
+    assert limiter.check(50)[0] == DROP
+    # Oversized frames are never worth waiting for, whatever the policy
+    assert InboundLimiter(0, 0, 0, 0, 1000, "throttle").check(1001)[0] == TOO_LARGE
+
+def test_unlimited_when_rates_are_zero():
+    limiter = InboundLimiter(0, 0, 0, 0, 0, "disconnect")
+    assert all(limiter.check(10 ** 6)[0] == ALLOW for _ in range(1000))
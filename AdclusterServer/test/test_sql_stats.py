@@ -0,0 +1,25 @@
+from app.core.config import settings
+from app.core.sql_stats import SqlStatsCollector, statement_shape
+
+def test_shape_strips_literals():
+    assert statement_shape("SELECT * FROM users WHERE uid = 'a' AND n IN (1, 2,3)") == "SELECT * FROM users WHERE uid = ? AND n IN (?)"
+    assert statement_shape("SELECT *\n  FROM t LIMIT 10") == statement_shape("SELECT * FROM t LIMIT 20")
+
+def test_request_aggregation_and_n_plus_one():
+    collector = SqlStatsCollector()
+    stats = collector.begin_request("/api/projects/")
+    collector.record("SELECT * FROM projects", 0.010)
+    for prjid in range(settings.SQL_N_PLUS_ONE_THRESHOLD):
+        collector.record(f"SELECT count(*) FROM pronote WHERE prjid = {prjid}", 0.001)
+    collector.end_request("GET /api/projects/", stats)
+    report = collector.report()["routes"]["GET /api/projects/"]
+    assert report["requests"] == 1
+    assert report["statements"] == settings.SQL_N_PLUS_ONE_THRESHOLD + 1
+    assert report["slowest_statement"] == "SELECT * FROM projects"
+    assert report["n_plus_one_requests"] == 1
+    assert report["n_plus_one_suspects"][0]["shape"] == "SELECT count(*) FROM pronote WHERE prjid = ?"
+
+def test_slow_query_log():
+    collector = SqlStatsCollector()
+    collector.record("SELECT pg_sleep(1)", settings.SQL_SLOW_QUERY_MS / 1000 + 0.1)
+    assert collector.report()["slow_queries"][0]["statement"] == "SELECT pg_sleep(1)"
@@ -0,0 +1,50 @@
+from app.core.topics import TopicError, TopicIndex
+
+def test_wildcard_matching():
+    index = TopicIndex()
+    index.subscribe("project-watcher", "project/1/#")
+    index.subscribe("folder-watcher", "project/+/folder/+")
+    index.subscribe("comment-watcher", "note/9/comments")
+
+    assert index.match("project/1") == {"project-watcher"}
+    assert index.match("project/1/folder/2") == {"project-watcher", "folder-watcher"}
+    assert index.match("project/2/folder/3") == {"folder-watcher"}
+    assert index.match("note/9/comments") == {"comment-watcher"}
+    assert index.match("note/9") == set()
+
+def test_unsubscribe_prunes_index():
+    index = TopicIndex()
+    index.subscribe("client", "project/1/#")
+    index.subscribe("client", "note/+/comments")
+    index.unsubscribe_all("client")
+    assert index.root.children == {}
+    assert index.patterns("client") == set()
+
+def test_invalid_patterns():
+    index = TopicIndex()
+    for pattern in ["", "project//1", "project/#/folder", "project/1+"]:
+        try:
+            index.subscribe("client", pattern)
+        except TopicError:
+            continue
+        raise AssertionError(f"{pattern!r} should be rejected")
+
+def test_change_event_subscriptions_need_access(monkeypatch):
+    from app.core import db_events
+    project, other = "11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"
+    monkeypatch.setattr(db_events, "user_can_access_project", lambda project_id, user_id: project_id == project)
+    monkeypatch.setattr(db_events, "user_owns_mylib", lambda mlid, user_id: False)
+    db_events.check_subscription(f"project/{project}/#", "user")
+    db_events.check_subscription("chat/+", "user")
+    for pattern in ["#", "+/#", "project/+/#", "project/#", "project/not-an-id/#", f"project/{other}/#", f"mylib/{project}/#"]:
+        try:
+            db_events.check_subscription(pattern, "user")
+        except TopicError:
+            continue
+        raise AssertionError(f"{pattern!r} should be rejected")
+
+if __name__ == "__main__":
+    test_wildcard_matching()
+    test_unsubscribe_prunes_index()
+    test_invalid_patterns()
+    print("Topic tests passed")
@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+from app.core.ws_backplane import RedisBackplane, encode_command, read_reply
+
+
+class StandInRedis:
+    """Tiny Redis-protocol server supporting just enough pub/sub for the backplane"""
+
+    def __init__(self):
+        self.subscribers = {}  # channel -> set of writers
+        self.clients = set()
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        await self.server.wait_closed()
+        await asyncio.sleep(0.05)  # Let connection handlers finish
+
+    async def handle(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                command = await read_reply(reader)
+                name = command[0].decode().upper()
+                if name == "SUBSCRIBE":
+                    channel = command[1].decode()
+                    self.subscribers.setdefault(channel, set()).add(writer)
+                    writer.write(b"*3\r\n$9\r\nsubscribe\r\n" + encode_command(channel)[4:] + b":1\r\n")
+                elif name == "PUBLISH":
+                    channel = command[1].decode()
+                    receivers = self.subscribers.get(channel, set())
+                    for subscriber in receivers:
+                        subscriber.write(encode_command("message", channel, command[2]))
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name == "PING":
+                    writer.write(b"+PONG\r\n")
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            for receivers in self.subscribers.values():
+                receivers.discard(writer)
+            writer.close()
+
+
+async def run_cross_worker_delivery():
+    redis = StandInRedis()
+    await redis.start()
+    url = f"redis://127.0.0.1:{redis.port}/0"
+
+    received = {"a": [], "b": []}
+    worker_a = RedisBackplane(url, "test:ws")
+    worker_b = RedisBackplane(url, "test:ws")
+
+    async def on_a(message):
+        received["a"].append(message)
+
+    async def on_b(message):
+        received["b"].append(message)
+
+    worker_a.set_handler(on_a)
+    worker_b.set_handler(on_b)
+    await worker_a.start()
+    await worker_b.start()
+
+    await worker_a.publish({"kind": "group", "worker": worker_a.worker_id, "group": "g", "message": "hello"})
+    await asyncio.sleep(0.2)
+
+    # Both workers, including the sender, see the message exactly once
+    assert [m["message"] for m in received["a"]] == ["hello"]
+    assert [m["message"] for m in received["b"]] == ["hello"]
+    print(f"Delivered to both workers: {json.dumps(received)}")
+
+    await worker_a.stop()
+    await worker_b.stop()
+    await redis.stop()
+
+
+def test_cross_worker_delivery():
+    asyncio.run(run_cross_worker_delivery())
+
+
+async def run_publish_during_reset():
+    redis = StandInRedis()
+    await redis.start()
+    worker = RedisBackplane(f"redis://127.0.0.1:{redis.port}/0", "test:ws")
+    await worker.connection.execute("PING")
+
+    # Drop every connection while publishes are in flight; they retry or give up but never crash
+    for writer in list(redis.clients):
+        writer.close()
+    await asyncio.gather(*(worker.publish({"kind": "group", "message": str(i)}) for i in range(20)))
+    assert await worker.connection.execute("PING") == "PONG"
+    print("Publishes survived a connection reset")
+
+    await worker.stop()
+    await redis.stop()
+
+
+def test_publish_during_reset():
+    asyncio.run(run_publish_during_reset())
+
+
+if __name__ == "__main__":
+    test_cross_worker_delivery()
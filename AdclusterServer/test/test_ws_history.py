@@ -0,0 +1,11 @@
+from app.core.ws_history import GroupHistory
+
+def test_spill_files_are_per_group(tmp_path):
+    history = GroupHistory(1, 10, str(tmp_path), 10**6)
+    # Names that a character-escaping scheme would map to the same file
+    groups = ["개발팀", "디자인", "a/b", "a b", "a_b"]
+    for group in groups:
+        history._write_spill(group, [(1, f"first in {group}"), (2, f"second in {group}")])
+    for group in groups:
+        assert history._read_spill(group, 0) == [(1, f"first in {group}"), (2, f"second in {group}")]
+    assert history._read_spill("other", 0) == []
@@ -0,0 +1,69 @@
+import asyncio
+import websockets
+import json
+
+async def test_json_batch():
+    # JSON envelopes are only parsed on connections opened with ?format=json
+    async with websockets.connect("ws://localhost:8000/ws/301?format=json") as first, \
+               websockets.connect("ws://localhost:8000/ws/302") as second:
+        # Several commands pipelined in one frame get one frame of replies back
+        await first.send(json.dumps([
+            {"op": "join", "group": "protocol-test", "id": 1},
+            {"op": "send_to", "target": "302", "message": "hello", "id": 2},
+            {"op": "group_members", "group": "protocol-test", "id": 3}
+        ]))
+        while True:
+            message = await asyncio.wait_for(first.recv(), timeout=2)
+            if message.startswith("["):
+                for reply in json.loads(message):
+                    print(f"Reply {reply['id']} ({reply['op']}): ok={reply['ok']} {reply['message']}")
+                break
+        
+        while True:
+            message = await asyncio.wait_for(second.recv(), timeout=2)
+            if message.startswith("Private message"):
+                print(f"Second client received: {message}")
+                break
+
+async def test_legacy_commands():
+    async with websockets.connect("ws://localhost:8000/ws/303") as websocket:
+        # Old slash commands still get plain text replies
+        await websocket.send("/join protocol-test")
+        while True:
+            message = await asyncio.wait_for(websocket.recv(), timeout=2)
+            if message.startswith("Joined group"):
+                print(f"Legacy reply: {message}")
+                break
+
+async def test_json_looking_chat_on_legacy_connection():
+    async with websockets.connect("ws://localhost:8000/ws/305") as websocket:
+        # Without ?format=json a JSON-looking line is chat, not a command
+        await websocket.send('{"op": "leave_all"}')
+        while True:
+            message = await asyncio.wait_for(websocket.recv(), timeout=2)
+            if "leave_all" in message:
+                print(f"Treated as chat: {message}")
+                break
+
+async def test_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        print("msgpack not installed, skipping MessagePack test")
+        return
+    async with websockets.connect("ws://localhost:8000/ws/304") as websocket:
+        await websocket.send(msgpack.packb({"op": "groups", "id": "mp"}))
+        while True:
+            message = await asyncio.wait_for(websocket.recv(), timeout=2)
+            if isinstance(message, bytes):
+                print(f"MessagePack reply: {msgpack.unpackb(message)}")
+                break
+
+async def main():
+    await test_json_batch()
+    await test_legacy_commands()
+    await test_json_looking_chat_on_legacy_connection()
+    await test_msgpack()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,267 @@
+"""WebSocket load harness for ConnectionManager.
+
+Simulates many concurrent clients that join groups, chat and churn, then reports
+connect rate, group fan-out latency percentiles, server memory per connection
+and event-loop lag (server side from /ws/metrics, client side measured here).
+
+Run the server first (python main.py), then for example:
+
+    python test/ws_load_harness.py --clients 2000 --groups 50 --senders 100 --rate 2 --duration 30
+
+Thousands of sockets need a raised file descriptor limit on both sides
+(ulimit -n 65536). Run the harness on another machine for production-sized
+tests, because it competes with the server for CPU. Fan-out latency uses wall
+clock timestamps, so clients and server must have synchronised clocks when
+they run on different hosts.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import urllib.request
+
+import websockets
+
+LATENCY_MARKER = "lt:"
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(values, scale=1000.0):
+    """p50/p95/p99/max of a list of seconds, in milliseconds"""
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * scale, 2),
+        "p95_ms": round(percentile(values, 0.95) * scale, 2),
+        "p99_ms": round(percentile(values, 0.99) * scale, 2),
+        "max_ms": round(max(values) * scale, 2) if values else 0.0
+    }
+
+
+def fetch_server_metrics(http_url):
+    try:
+        with urllib.request.urlopen(f"{http_url}/ws/metrics?details=false", timeout=10) as response:
+            return json.loads(response.read())
+    except Exception as e:
+        print(f"Could not read server metrics: {e}")
+        return None
+
+
+class LoadStats:
+    def __init__(self):
+        self.connect_times = []
+        self.connect_failures = 0
+        self.fanout_latencies = []
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.disconnects = 0
+        self.loop_lags = []
+
+
+class SimulatedClient:
+    def __init__(self, client_id, group, args, stats):
+        self.client_id = client_id
+        self.group = group
+        self.args = args
+        self.stats = stats
+        self.websocket = None
+        self.reader_task = None
+
+    async def connect(self):
+        uri = f"{self.args.ws_url}/ws/load-{self.client_id}/{self.group}"
+        started = time.perf_counter()
+        try:
+            self.websocket = await websockets.connect(uri, max_queue=None, open_timeout=30)
+        except Exception:
+            self.stats.connect_failures += 1
+            return False
+        self.stats.connect_times.append(time.perf_counter() - started)
+        self.reader_task = asyncio.create_task(self.read())
+        return True
+
+    async def read(self):
+        try:
+            async for message in self.websocket:
+                self.stats.messages_received += 1
+                if isinstance(message, str):
+                    marker = message.find(LATENCY_MARKER)
+                    if marker != -1:
+                        sent_at = float(message[marker + len(LATENCY_MARKER):].split()[0])
+                        self.stats.fanout_latencies.append(time.time() - sent_at)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except asyncio.CancelledError:
+            pass
+
+    async def send_group_message(self):
+        if self.websocket is None:
+            return
+        try:
+            await self.websocket.send(f"/group {LATENCY_MARKER}{time.time():.6f}")
+            self.stats.messages_sent += 1
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def close(self):
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+        if self.websocket is not None:
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+        self.stats.disconnects += 1
+        self.websocket = None
+
+
+async def measure_loop_lag(stats, stop_event, interval=0.05):
+    """The harness' own event-loop lag; if it is high, the client side is the bottleneck"""
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stats.loop_lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def connect_all(clients, rate, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def connect_one(client):
+        async with semaphore:
+            await client.connect()
+
+    tasks = []
+    for client in clients:
+        tasks.append(asyncio.create_task(connect_one(client)))
+        if rate:
+            await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+
+
+async def chat(senders, rate, duration):
+    """Each sender posts to its group at `rate` messages per second"""
+    async def sender_loop(client):
+        # Spread senders out so they don't all fire on the same tick
+        await asyncio.sleep(random.random() / rate)
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await client.send_group_message()
+            await asyncio.sleep(1 / rate)
+
+    await asyncio.gather(*(sender_loop(client) for client in senders))
+
+
+async def churn(clients, fraction_per_second, duration):
+    """Disconnect and reconnect a fraction of the clients every second"""
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        await asyncio.sleep(1)
+        victims = random.sample(clients, max(1, int(len(clients) * fraction_per_second)))
+        for client in victims:
+            await client.close()
+        await asyncio.gather(*(client.connect() for client in victims))
+
+
+async def run(args):
+    stats = LoadStats()
+    stop_event = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stats, stop_event))
+
+    before = fetch_server_metrics(args.http_url)
+    clients = [SimulatedClient(i, f"load-group-{i % args.groups}", args, stats) for i in range(args.clients)]
+
+    print(f"Connecting {args.clients} clients across {args.groups} groups...")
+    started = time.perf_counter()
+    await connect_all(clients, args.connect_rate, args.concurrency)
+    connect_elapsed = time.perf_counter() - started
+    connected = len(stats.connect_times)
+    print(f"Connected {connected} clients in {connect_elapsed:.2f}s ({stats.connect_failures} failures)")
+
+    # Let the presence burst from the connection storm settle before measuring
+    await asyncio.sleep(args.settle)
+    after_connect = fetch_server_metrics(args.http_url)
+
+    live_clients = [client for client in clients if client.websocket is not None]
+    senders = random.sample(live_clients, min(args.senders, len(live_clients)))
+    print(f"Chatting for {args.duration}s with {len(senders)} senders at {args.rate} msg/s each...")
+    initial_connect_times = list(stats.connect_times)  # Churn reconnects are not part of the connect storm
+    activities = [chat(senders, args.rate, args.duration)]
+    if args.churn > 0:
+        activities.append(churn(live_clients, args.churn, args.duration))
+    await asyncio.gather(*activities)
+    await asyncio.sleep(args.settle)
+    after_chat = fetch_server_metrics(args.http_url)
+
+    stop_event.set()
+    await lag_task
+    await asyncio.gather(*(client.close() for client in clients))
+
+    report = {
+        "clients": args.clients,
+        "groups": args.groups,
+        "connect": {
+            "connected": connected,
+            "failures": stats.connect_failures,
+            "elapsed_s": round(connect_elapsed, 2),
+            "rate_per_s": round(connected / connect_elapsed, 1) if connect_elapsed else 0.0,
+            "latency": summarize(initial_connect_times)
+        },
+        "fanout_latency": summarize(stats.fanout_latencies),
+        "messages_sent": stats.messages_sent,
+        "messages_received": stats.messages_received,
+        # Every group message should reach each member of the sender's group
+        "expected_group_deliveries": stats.messages_sent * (args.clients // args.groups),
+        "group_deliveries": len(stats.fanout_latencies),
+        "harness_loop_lag": summarize(stats.loop_lags)
+    }
+    if before and after_connect:
+        added = after_connect["connection_count"] - before["connection_count"]
+        if added > 0:
+            report["server_memory_per_connection_bytes"] = int(
+                (after_connect["process_rss_bytes"] - before["process_rss_bytes"]) / added
+            )
+    if after_chat:
+        report["server"] = {
+            "event_loop_lag": after_chat.get("event_loop_lag"),
+            "total_dropped": after_chat.get("total_dropped"),
+            "reaped_connections": after_chat.get("reaped_connections"),
+            "process_rss_bytes": after_chat.get("process_rss_bytes")
+        }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if stats.loop_lags and statistics.mean(stats.loop_lags) > 0.05:
+        print("Warning: the harness event loop was lagging; results are limited by the client side")
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="WebSocket load harness")
+    parser.add_argument("--ws-url", default="ws://localhost:8000", help="WebSocket base URL")
+    parser.add_argument("--http-url", default="http://localhost:8000", help="HTTP base URL for /ws/metrics")
+    parser.add_argument("--clients", type=int, default=1000, help="Concurrent clients")
+    parser.add_argument("--groups", type=int, default=20, help="Groups the clients are spread over")
+    parser.add_argument("--connect-rate", type=float, default=500, help="New connections per second (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Connection handshakes in flight at once")
+    parser.add_argument("--senders", type=int, default=50, help="Clients that post group messages")
+    parser.add_argument("--rate", type=float, default=1.0, help="Messages per second per sender")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of chatting")
+    parser.add_argument("--churn", type=float, default=0.0, help="Fraction of clients reconnected every second")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds to wait after each phase")
+    parser.add_argument("--seed", type=int, default=36, help="Random seed for reproducible runs")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    random.seed(arguments.seed)
+    asyncio.run(run(arguments))
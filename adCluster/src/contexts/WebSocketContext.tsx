@@ -43,6 +43,13 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
         setIsConnected(true);
       };
 
+      // Answer the server's heartbeat; unanswered pings close the connection
+      ws.addEventListener('message', (event) => {
+        if (event.data === '{"type": "ping"}') {
+          ws.send('/pong');
+        }
+      });
+
       ws.onclose = () => {
         console.log('WebSocket disconnected');
         setIsConnected(false);